@@ -4,9 +4,12 @@ from app.api.v1.amenities import api as amenities_ns
 from app.api.v1.reviews import api as reviews_ns
 from app.api.v1.users import api as users_ns
 from app.api.v1.places import api as places_ns
+from app.services import facade
+from config import config
 
-def create_app():
+def create_app(config_name='default'):
     app = Flask(__name__)
+    app.config.from_object(config[config_name])
     api = Api(app, version='1.0', title='HBnB API', description='HBnB Application API')
     # Enregistrement du namespace pour les amenities
     api.add_namespace(amenities_ns, path='/api/v1/amenities')
@@ -15,4 +18,9 @@ def create_app():
     # Register the users namespace
     api.add_namespace(users_ns, path='/api/v1/users')
     api.add_namespace(places_ns, path='/api/v1/places')
+    if app.config['DATA_DIR']:
+        facade.enable_persistence(app.config['DATA_DIR'],
+                                  synchronous=app.config['WAL_SYNCHRONOUS'],
+                                  sync_interval=app.config['WAL_SYNC_INTERVAL'],
+                                  compact_threshold=app.config['WAL_COMPACT_THRESHOLD'])
     return app
@@ -0,0 +1,163 @@
+import threading
+from contextlib import contextmanager
+from operator import attrgetter
+
+from app.persistence.repository import InMemoryRepository
+
+_MISSING = object()
+
+
+class RWLock:
+    """
+    Lock held either by any number of sharers or by one exclusive owner.
+
+    A waiting exclusive owner blocks new sharers, so a steady stream of
+    writers cannot starve a snapshot.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._sharers = 0
+        self._exclusive = False
+        self._waiting = 0
+
+    @contextmanager
+    def shared(self):
+        with self._cond:
+            while self._exclusive or self._waiting:
+                self._cond.wait()
+            self._sharers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._sharers -= 1
+                if not self._sharers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        with self._cond:
+            self._waiting += 1
+            while self._exclusive or self._sharers:
+                self._cond.wait()
+            self._waiting -= 1
+            self._exclusive = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._exclusive = False
+                self._cond.notify_all()
+
+
+class ConcurrentInMemoryRepository(InMemoryRepository):
+    """
+    InMemoryRepository safe to share between the threads of a WSGI server.
+
+    - Writes to one object are serialized by one of `stripes` locks chosen
+      from its id, so writes to different objects run side by side.
+    - The secondary indexes have their own short lock; an update that
+      touches an indexed attribute holds it until the index is relinked,
+      so two objects cannot claim the same unique value.
+    - Writers hold the snapshot lock shared and get_all() holds it
+      exclusively, so get_all() returns a point-in-time copy.
+    """
+
+    def __init__(self, stripes=64):
+        super().__init__()
+        self._stripes = [threading.RLock() for _ in range(stripes)]
+        self._index_lock = threading.RLock()
+        self._snapshot_lock = RWLock()
+
+    def _stripe(self, obj_id):
+        return self._stripes[hash(obj_id) % len(self._stripes)]
+
+    @contextmanager
+    def _writing(self, obj_id):
+        with self._snapshot_lock.shared():
+            with self._stripe(obj_id):
+                yield
+
+    # Points d'extension appelés sous le verrou de l'objet (voir DurableInMemoryRepository)
+    def _changed(self, obj_id):
+        return None
+
+    def _deleted(self, obj_id):
+        return None
+
+    def _settle(self, token):
+        pass
+
+    def add_index(self, attr_name, unique=False):
+        with self._snapshot_lock.exclusive():
+            super().add_index(attr_name, unique)
+
+    def add(self, obj):
+        with self._writing(obj.id):
+            with self._index_lock:
+                super().add(obj)
+            token = self._changed(obj.id)
+        self._settle(token)
+
+    def _update_locked(self, obj_id, data):
+        obj = self._storage[obj_id]
+        if self._prospective_values(obj, data):
+            with self._index_lock:
+                super().update(obj_id, data)
+        else:
+            obj.update(data)
+
+    def update(self, obj_id, data):
+        with self._writing(obj_id):
+            if obj_id not in self._storage:
+                return
+            try:
+                self._update_locked(obj_id, data)
+            finally:
+                token = self._changed(obj_id)
+        self._settle(token)
+
+    def compare_and_set(self, obj_id, expected, data):
+        """
+        Apply data only if every attribute in expected still has that value.
+
+        Returns False, leaving the object untouched, when the object is
+        missing or another thread changed one of the expected attributes.
+        """
+        with self._writing(obj_id):
+            obj = self._storage.get(obj_id)
+            if obj is None or any(getattr(obj, name, _MISSING) != value for name, value in expected.items()):
+                return False
+            try:
+                self._update_locked(obj_id, data)
+            finally:
+                token = self._changed(obj_id)
+        self._settle(token)
+        return True
+
+    def delete(self, obj_id):
+        with self._writing(obj_id):
+            if obj_id not in self._storage:
+                return
+            with self._index_lock:
+                super().delete(obj_id)
+            token = self._deleted(obj_id)
+        self._settle(token)
+
+    def get_all(self):
+        with self._snapshot_lock.exclusive():
+            return list(self._storage.values())
+
+    def get_by_attribute(self, attr_name, attr_value):
+        if attr_name not in self._indexes:
+            return next((obj for obj in self.get_all() if getattr(obj, attr_name) == attr_value), None)
+        with self._index_lock:
+            return super().get_by_attribute(attr_name, attr_value)
+
+    def find_all_by_attribute(self, attr_name, attr_value):
+        if attr_name not in self._indexes:
+            getter = attrgetter(attr_name)
+            return [obj for obj in self.get_all() if self._key(getter, obj) == attr_value]
+        with self._index_lock:
+            return super().find_all_by_attribute(attr_name, attr_value)
@@ -0,0 +1,336 @@
+import io
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+from contextlib import ExitStack
+
+from app.models.base_model import BaseModel
+from app.persistence.concurrent_repository import ConcurrentInMemoryRepository
+from app.persistence.repository import InMemoryRepository
+
+SNAPSHOT_FILE = 'snapshot.pkl'
+LOG_FILE = 'wal.log'
+# En-tête de chaque enregistrement du journal : longueur et CRC32 du pickle qui suit
+_HEADER = struct.Struct('>II')
+
+
+class _RecordPickler(pickle.Pickler):
+    """Pickles other stored entities as (repository, id) references instead of copies."""
+
+    def __init__(self, file, store):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.store = store
+
+    def persistent_id(self, obj):
+        if isinstance(obj, BaseModel):
+            return self.store._reference(obj)
+        return None
+
+
+class _RecordUnpickler(pickle.Unpickler):
+    def __init__(self, file, store):
+        super().__init__(file)
+        self.store = store
+
+    def persistent_load(self, pid):
+        name, obj_id = pid
+        obj = self.store._repositories[name]._storage.get(obj_id)
+        if obj is None:
+            raise pickle.UnpicklingError("{} {} is not loaded".format(name, obj_id))
+        return obj
+
+
+class DurableStore:
+    """
+    Append-only log plus snapshot behind a set of in-memory repositories.
+
+    Every add/update/delete appends one record (the full state of the
+    object, or its deletion) to wal.log. A background thread fsyncs the
+    log; with `synchronous=True` a write returns once its record is on
+    disk, and writers arriving during the same `sync_interval` share one
+    fsync (group commit). With `synchronous=False` writes return at once
+    and at most `sync_interval` seconds of writes can be lost.
+
+    After `compact_threshold` records the background thread writes the
+    whole state to snapshot.pkl and the log starts over. open() loads the
+    snapshot then replays the log, dropping a torn record at its end.
+    """
+
+    def __init__(self, directory, synchronous=True, sync_interval=0.002, compact_threshold=100000):
+        self.directory = directory
+        self.synchronous = synchronous
+        self.sync_interval = sync_interval
+        self.compact_threshold = compact_threshold
+        self._repositories = {}
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._file = None
+        self._flusher = None
+        self._written = 0
+        self._synced = 0
+        self._since_compaction = 0
+        self._error = None
+        self._closed = False
+        self._fsyncing = False
+
+    @property
+    def snapshot_path(self):
+        return os.path.join(self.directory, SNAPSHOT_FILE)
+
+    @property
+    def log_path(self):
+        return os.path.join(self.directory, LOG_FILE)
+
+    def register(self, name, repository):
+        self._repositories[name] = repository
+
+    def _reference(self, obj):
+        for name, repository in self._repositories.items():
+            if repository._storage.get(obj.id) is obj:
+                return (name, obj.id)
+        return None
+
+    # --- démarrage ---
+
+    def open(self):
+        """Load the snapshot, replay the log and start the background fsync."""
+        if self._file is not None:
+            raise RuntimeError("DurableStore is already open")
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'rb') as f:
+                snapshot = pickle.load(f)
+            for name, objs in snapshot.items():
+                repository = self._repositories.get(name)
+                if repository is not None:
+                    repository._load(objs)
+        replayed, valid_end = self._replay()
+        self._file = open(self.log_path, 'ab')
+        if self._file.tell() != valid_end:
+            # Enregistrement incomplet en fin de journal (crash pendant l'écriture)
+            self._file.truncate(valid_end)
+        self._since_compaction = replayed
+        self._closed = False
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True, name='hbnb-wal-flusher')
+        self._flusher.start()
+        return replayed
+
+    def _replay(self):
+        if not os.path.exists(self.log_path):
+            return 0, 0
+        count, valid_end = 0, 0
+        with open(self.log_path, 'rb') as f:
+            while True:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    break
+                length, checksum = _HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    break
+                self._apply(_RecordUnpickler(io.BytesIO(payload), self).load())
+                valid_end = f.tell()
+                count += 1
+        return count, valid_end
+
+    def _apply(self, record):
+        op, name, obj_id = record[:3]
+        repository = self._repositories[name]
+        if op == 'put':
+            repository._apply_put(obj_id, record[3], record[4])
+        elif op == 'delete':
+            InMemoryRepository.delete(repository, obj_id)
+
+    # --- écriture ---
+
+    def log_put(self, name, obj):
+        """Append the state of obj; returns the sequence number to pass to wait()."""
+        return self._append(('put', name, obj.id, type(obj), obj.__dict__))
+
+    def log_delete(self, name, obj_id):
+        return self._append(('delete', name, obj_id))
+
+    def _append(self, record):
+        buffer = io.BytesIO()
+        _RecordPickler(buffer, self).dump(record)
+        payload = buffer.getvalue()
+        with self._cond:
+            if self._error is not None:
+                raise self._error
+            if self._file is None:
+                raise RuntimeError("DurableStore is not open")
+            self._file.write(_HEADER.pack(len(payload), zlib.crc32(payload)))
+            self._file.write(payload)
+            self._written += 1
+            self._since_compaction += 1
+            self._cond.notify_all()
+            return self._written
+
+    def wait(self, sequence):
+        """Block until record `sequence` is on disk (no-op when not synchronous)."""
+        if not self.synchronous:
+            return
+        with self._cond:
+            while self._synced < sequence and self._error is None:
+                self._cond.wait()
+            if self._error is not None:
+                raise self._error
+
+    def _flush_loop(self):
+        while True:
+            with self._cond:
+                while self._synced == self._written and not self._closed:
+                    self._cond.wait()
+                if self._closed and self._synced == self._written:
+                    return
+            # Fenêtre de group commit : les écrivains qui arrivent partagent le même fsync
+            if self.sync_interval:
+                time.sleep(self.sync_interval)
+            with self._cond:
+                target = self._written
+                try:
+                    self._file.flush()
+                    fd = self._file.fileno()
+                except (OSError, ValueError) as e:
+                    self._fail(e)
+                    return
+                # compact() attend la fin du fsync avant de fermer le fichier
+                self._fsyncing = True
+            try:
+                os.fsync(fd)
+            except OSError as e:
+                with self._cond:
+                    self._fsyncing = False
+                    self._fail(e)
+                return
+            with self._cond:
+                self._fsyncing = False
+                self._synced = max(self._synced, target)
+                self._cond.notify_all()
+                compact = self._since_compaction >= self.compact_threshold
+            if compact:
+                try:
+                    self.compact()
+                except OSError as e:
+                    with self._cond:
+                        self._fail(e)
+                    return
+
+    def _fail(self, error):
+        self._error = OSError("Write-ahead log failed: {}".format(error))
+        self._cond.notify_all()
+
+    def sync(self):
+        """Block until every record written so far is on disk."""
+        with self._cond:
+            target = self._written
+            self._cond.notify_all()
+            while self._synced < target and self._error is None:
+                self._cond.wait()
+            if self._error is not None:
+                raise self._error
+
+    # --- compaction ---
+
+    def compact(self):
+        """Write the whole state to a new snapshot and start an empty log."""
+        with ExitStack() as stack:
+            # Plus aucune écriture en cours dans les dépôts : le snapshot est cohérent
+            for repository in self._repositories.values():
+                stack.enter_context(repository._snapshot_lock.exclusive())
+            self._write_snapshot()
+
+    def _write_snapshot(self):
+        with self._cond:
+            while self._fsyncing:
+                self._cond.wait()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._synced = self._written
+            state = {name: list(repository._storage.values())
+                     for name, repository in self._repositories.items()}
+            tmp_path = self.snapshot_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+            self._fsync_directory()
+            self._file.close()
+            self._file = open(self.log_path, 'wb')
+            self._fsync_directory()
+            self._since_compaction = 0
+            self._cond.notify_all()
+
+    def _fsync_directory(self):
+        if hasattr(os, 'O_DIRECTORY'):
+            fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def close(self):
+        """Flush the log to disk and stop the background thread."""
+        if self._file is None:
+            return
+        self.sync()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._flusher.join()
+        self._file.close()
+        self._file = None
+
+
+class DurableInMemoryRepository(ConcurrentInMemoryRepository):
+    """
+    Thread-safe in-memory repository whose writes are logged to a DurableStore.
+
+    Records are appended under the object's lock, so the log keeps the
+    order of the writes; the wait for the fsync happens after the locks
+    are released.
+    """
+
+    def __init__(self, store, name, stripes=64):
+        super().__init__(stripes)
+        self.store = store
+        self.name = name
+        store.register(name, self)
+
+    def _load(self, objs):
+        # Chargement en bloc du snapshot, les index sont reconstruits une seule fois
+        self._storage.update((obj.id, obj) for obj in objs)
+        for attr_name in list(self._getters):
+            self.add_index(attr_name, unique=attr_name in self._unique)
+
+    def _apply_put(self, obj_id, cls, state):
+        # Rejouer dans l'objet existant garde valides les références des autres entités
+        obj = self._storage.get(obj_id)
+        if obj is None:
+            obj = cls.__new__(cls)
+            obj.__dict__.update(state)
+            InMemoryRepository.add(self, obj)
+            return
+        old_values = self._index_values(obj)
+        obj.__dict__.clear()
+        obj.__dict__.update(state)
+        self._unlink(obj_id, old_values)
+        self._link(obj_id, self._index_values(obj))
+
+    def _changed(self, obj_id):
+        # Aussi après un setter qui a échoué en cours de route : le journal suit la mémoire
+        obj = self._storage.get(obj_id)
+        if obj is not None:
+            return self.store.log_put(self.name, obj)
+        return None
+
+    def _deleted(self, obj_id):
+        return self.store.log_delete(self.name, obj_id)
+
+    def _settle(self, token):
+        if token is not None:
+            self.store.wait(token)
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from operator import attrgetter
 
 class Repository(ABC):
     @abstractmethod
@@ -29,9 +30,92 @@ class Repository(ABC):
 class InMemoryRepository(Repository):
     def __init__(self):
         self._storage = {}
+        # Index secondaires : nom d'attribut -> {valeur: id} (unique) ou {valeur: {id: None}}
+        self._indexes = {}
+        self._unique = set()
+        self._getters = {}
+
+    def add_index(self, attr_name, unique=False):
+        """
+        Index attr_name (dotted names like 'owner.id' allowed) for O(1) lookups.
+
+        Indexed attributes must only change through update(), which keeps
+        the index in sync; a unique index rejects a second object with the
+        same value with a ValueError.
+        """
+        getter = attrgetter(attr_name)
+        index = {}
+        for obj in self._storage.values():
+            value = self._key(getter, obj)
+            if unique:
+                if value is None:
+                    continue
+                if value in index:
+                    raise ValueError("{} '{}' already exists".format(attr_name, value))
+                index[value] = obj.id
+            else:
+                index.setdefault(value, {})[obj.id] = None
+        self._indexes[attr_name] = index
+        self._getters[attr_name] = getter
+        if unique:
+            self._unique.add(attr_name)
+
+    @staticmethod
+    def _key(getter, obj):
+        try:
+            return getter(obj)
+        except AttributeError:
+            return None
+
+    def _check_unique(self, obj_id, values):
+        for attr_name, value in values.items():
+            if attr_name in self._unique and value is not None:
+                owner = self._indexes[attr_name].get(value)
+                if owner is not None and owner != obj_id:
+                    raise ValueError("{} '{}' already exists".format(attr_name, value))
+
+    def _index_values(self, obj):
+        return {attr_name: self._key(getter, obj) for attr_name, getter in self._getters.items()}
+
+    def _link(self, obj_id, values):
+        for attr_name, value in values.items():
+            if attr_name in self._unique:
+                if value is not None:
+                    self._indexes[attr_name][value] = obj_id
+            else:
+                self._indexes[attr_name].setdefault(value, {})[obj_id] = None
+
+    def _unlink(self, obj_id, values):
+        for attr_name, value in values.items():
+            index = self._indexes[attr_name]
+            if attr_name in self._unique:
+                if index.get(value) == obj_id:
+                    del index[value]
+            else:
+                ids = index.get(value)
+                if ids is not None:
+                    ids.pop(obj_id, None)
+                    if not ids:
+                        del index[value]
+
+    def _prospective_values(self, obj, data):
+        """Index values obj will have once data is applied, without touching obj."""
+        values = {}
+        for attr_name, getter in self._getters.items():
+            head, _, rest = attr_name.partition('.')
+            if head not in data or not hasattr(obj, head):
+                continue
+            values[attr_name] = self._key(attrgetter(rest), data[head]) if rest else data[head]
+        return values
 
     def add(self, obj):
+        values = self._index_values(obj)
+        self._check_unique(obj.id, values)
+        previous = self._storage.get(obj.id)
+        if previous is not None:
+            self._unlink(obj.id, self._index_values(previous))
         self._storage[obj.id] = obj
+        self._link(obj.id, values)
 
     def get(self, obj_id):
         return self._storage.get(obj_id)
@@ -42,11 +126,37 @@ class InMemoryRepository(Repository):
     def update(self, obj_id, data):
         obj = self.get(obj_id)
         if obj:
-            obj.update(data)
+            self._check_unique(obj_id, self._prospective_values(obj, data))
+            old_values = self._index_values(obj)
+            try:
+                obj.update(data)
+            finally:
+                # Même si la validation d'un setter échoue, l'objet a pu changer en partie
+                self._unlink(obj_id, old_values)
+                self._link(obj_id, self._index_values(obj))
 
     def delete(self, obj_id):
         if obj_id in self._storage:
+            self._unlink(obj_id, self._index_values(self._storage[obj_id]))
             del self._storage[obj_id]
 
     def get_by_attribute(self, attr_name, attr_value):
-        return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
+        index = self._indexes.get(attr_name)
+        if index is None:
+            return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
+        if attr_name in self._unique:
+            obj_id = index.get(attr_value)
+            return self._storage.get(obj_id) if obj_id is not None else None
+        ids = index.get(attr_value)
+        return self._storage[next(iter(ids))] if ids else None
+
+    def find_all_by_attribute(self, attr_name, attr_value):
+        """Every object whose attr_name equals attr_value, in insertion order."""
+        index = self._indexes.get(attr_name)
+        if index is None:
+            getter = attrgetter(attr_name)
+            return [obj for obj in self._storage.values() if self._key(getter, obj) == attr_value]
+        if attr_name in self._unique:
+            obj = self.get_by_attribute(attr_name, attr_value)
+            return [obj] if obj is not None else []
+        return [self._storage[obj_id] for obj_id in index.get(attr_value, ())]
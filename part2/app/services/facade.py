@@ -1,15 +1,49 @@
 from app.models.amenity import Amenity
-from app.persistence.repository import InMemoryRepository
+from app.persistence.concurrent_repository import ConcurrentInMemoryRepository
+from app.persistence.durable import DurableInMemoryRepository, DurableStore
 from app.models.user import User
 from app.models.place import Place
 from app.models.review import Review
 
+REPOSITORIES = ('user', 'place', 'review', 'amenity')
+
+
 class HBnBFacade:
     def __init__(self):
-        self.user_repo = InMemoryRepository()
-        self.place_repo = InMemoryRepository()
-        self.review_repo = InMemoryRepository()
-        self.amenity_repo = InMemoryRepository()  # dépôt spécifique aux amenities
+        self.store = None
+        # Dépôts partagés par les threads du serveur WSGI
+        self._set_repositories(lambda name: ConcurrentInMemoryRepository())
+
+    def _set_repositories(self, factory):
+        self.user_repo = factory('user')
+        self.place_repo = factory('place')
+        self.review_repo = factory('review')
+        self.amenity_repo = factory('amenity')  # dépôt spécifique aux amenities
+        # Recherches fréquentes en O(1) : email au login/à la création, lieux d'un hôte
+        self.user_repo.add_index('email', unique=True)
+        self.place_repo.add_index('owner.id')
+
+    def enable_persistence(self, directory, **options):
+        """
+        Keep the repositories in memory but log every write to `directory`
+        (see DurableStore) and reload them from there on startup.
+        """
+        if self.store is not None:
+            if self.store.directory == directory:
+                return self.store
+            self.store.close()
+        current = {name: getattr(self, f'{name}_repo').get_all() for name in REPOSITORIES}
+        store = DurableStore(directory, **options)
+        self._set_repositories(lambda name: DurableInMemoryRepository(store, name))
+        store.open()
+        # Ce qui était déjà en mémoire est journalisé à son tour
+        for name in REPOSITORIES:
+            repo = getattr(self, f'{name}_repo')
+            for obj in current[name]:
+                if repo.get(obj.id) is None:
+                    repo.add(obj)
+        self.store = store
+        return store
 
     def create_amenity(self, amenity_data):
         # Création d'une instance d'amenity avec les données reçues
@@ -58,6 +92,9 @@ class HBnBFacade:
     def get_all_places(self):
         return self.place_repo.get_all()
 
+    def get_places_by_owner(self, owner_id):
+        return self.place_repo.find_all_by_attribute('owner.id', owner_id)
+
     def update_place(self, place_id, place_data):
         return self.place_repo.update(place_id, place_data)
 
@@ -0,0 +1,85 @@
+"""Multi-threaded stress test of the in-memory repositories.
+
+    python -m benchmarks.bench_concurrent_repository --threads 1 2 4 8 16
+
+Run from part2/. Each thread runs a mix of reads, updates and
+read-modify-write increments on a shared set of users for `duration`
+seconds. Reports operations per second and how many increments were lost:
+the plain InMemoryRepository increments with get + update, the concurrent
+one with a compare_and_set retry loop.
+"""
+import argparse
+import sys
+import threading
+import time
+
+from app.models.user import User
+from app.persistence.concurrent_repository import ConcurrentInMemoryRepository
+from app.persistence.repository import InMemoryRepository
+
+
+def stress(repo_class, threads, duration, objects):
+    repo = repo_class()
+    repo.add_index('email', unique=True)
+    users = [User("Stress", "0", "stress{}@example.com".format(i)) for i in range(objects)]
+    for user in users:
+        repo.add(user)
+    ops, increments = [0] * threads, [0] * threads
+    deadline = time.perf_counter() + duration
+    use_cas = hasattr(repo, 'compare_and_set')
+
+    def worker(slot):
+        n = slot
+        while time.perf_counter() < deadline:
+            user = users[n % objects]
+            kind = n % 4
+            if kind == 0:
+                repo.get_by_attribute('email', user.email)
+            elif kind == 1:
+                repo.update(user.id, {"first_name": "S{}".format(n % 7)})
+            else:
+                while True:
+                    current = repo.get(user.id).last_name
+                    new = {"last_name": str(int(current) + 1)}
+                    if not use_cas:
+                        repo.update(user.id, new)
+                        break
+                    if repo.compare_and_set(user.id, {"last_name": current}, new):
+                        break
+                increments[slot] += 1
+            ops[slot] += 1
+            n += threads
+
+    workers = [threading.Thread(target=worker, args=(slot,)) for slot in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    lost = sum(increments) - sum(int(user.last_name) for user in users)
+    return sum(ops) / duration, lost
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--duration', type=float, default=2.0)
+    parser.add_argument('--objects', type=int, default=64)
+    parser.add_argument('--switch-interval', type=float,
+                        help='GIL switch interval in seconds; lower it to force more interleavings')
+    args = parser.parse_args()
+    if args.switch_interval:
+        sys.setswitchinterval(args.switch_interval)
+    headers = ['threads', 'plain ops/s', 'plain lost', 'concurrent ops/s', 'concurrent lost']
+    rows = []
+    for threads in args.threads:
+        plain = stress(InMemoryRepository, threads, args.duration, args.objects)
+        concurrent = stress(ConcurrentInMemoryRepository, threads, args.duration, args.objects)
+        rows.append([threads, '%.0f' % plain[0], plain[1], '%.0f' % concurrent[0], concurrent[1]])
+    widths = [max(len(h), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print('  '.join(h.rjust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print('  '.join(str(c).rjust(w) for c, w in zip(row, widths)))
+
+
+if __name__ == '__main__':
+    main()
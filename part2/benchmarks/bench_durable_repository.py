@@ -0,0 +1,84 @@
+"""Write throughput and startup time of the durable in-memory repository.
+
+    python -m benchmarks.bench_durable_repository --size 1000000 --threads 1 8 32
+
+Run from part2/. Loads `size` users with asynchronous fsync, then measures
+synchronous (group commit) writes for a few seconds at each thread count,
+and finally the startup time from the log alone and from a snapshot.
+"""
+import argparse
+import shutil
+import tempfile
+import threading
+import time
+
+from app.models.user import User
+from app.persistence.durable import DurableInMemoryRepository, DurableStore
+
+
+def open_store(directory, **options):
+    store = DurableStore(directory, **options)
+    users = DurableInMemoryRepository(store, 'user')
+    users.add_index('email', unique=True)
+    start = time.perf_counter()
+    store.open()
+    return store, users, time.perf_counter() - start
+
+
+def load(users, size):
+    start = time.perf_counter()
+    for i in range(size):
+        users.add(User("Bench", "User", "user{}@example.com".format(i)))
+    return size / (time.perf_counter() - start)
+
+
+def group_commit(users, threads, duration):
+    """Synchronous writes per second with `threads` concurrent writers."""
+    counts = [0] * threads
+    deadline = time.perf_counter() + duration
+    user_ids = [user.id for user in users.get_all()[:threads]]
+
+    def writer(slot):
+        while time.perf_counter() < deadline:
+            users.update(user_ids[slot], {"first_name": "W{}".format(counts[slot] % 10)})
+            counts[slot] += 1
+
+    workers = [threading.Thread(target=writer, args=(slot,)) for slot in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sum(counts) / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=1000000)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--duration', type=float, default=3.0)
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp(prefix='hbnb-wal-bench-')
+    try:
+        # Pas de compaction pendant le chargement : le démarrage rejoue tout le journal
+        store, users, _ = open_store(directory, synchronous=False, compact_threshold=10 ** 12)
+        print('bulk load (async fsync): %.0f writes/s' % load(users, args.size))
+        store.close()
+
+        store, users, replay_time = open_store(directory, compact_threshold=10 ** 12)
+        print('startup from log (%d records): %.2f s' % (args.size, replay_time))
+        for threads in args.threads:
+            print('sync writes, %2d thread(s): %.0f writes/s' % (threads, group_commit(users, threads, args.duration)))
+        start = time.perf_counter()
+        store.compact()
+        print('compaction: %.2f s' % (time.perf_counter() - start))
+        store.close()
+
+        store, users, snapshot_time = open_store(directory)
+        print('startup from snapshot (%d users): %.2f s' % (len(users.get_all()), snapshot_time))
+        store.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Secondary indexes of InMemoryRepository versus the former linear scan.
+
+    python -m benchmarks.bench_repository_indexes --sizes 1000 10000 100000 1000000
+
+Run from part2/. For each number of users (and as many places) it reports
+the median time of an email lookup and of an owner-to-places lookup with
+and without the indexes.
+"""
+import argparse
+import statistics
+import time
+
+from app.models.place import Place
+from app.models.user import User
+from app.persistence.repository import InMemoryRepository
+
+
+def timed(fn, repeat=5):
+    """Median wall time of fn in microseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(samples)
+
+
+def build(size, indexed):
+    users, places = InMemoryRepository(), InMemoryRepository()
+    if indexed:
+        users.add_index('email', unique=True)
+        places.add_index('owner.id')
+    owners = []
+    for i in range(size):
+        user = User("Bench", "User", "user{}@example.com".format(i))
+        users.add(user)
+        owners.append(user)
+        places.add(Place(title="Place {}".format(i), price=10.0, latitude=0.0, longitude=0.0,
+                         owner=owners[i // 2], amenities=[]))
+    return users, places, owners
+
+
+def run(size):
+    row = [size]
+    for indexed in (False, True):
+        users, places, owners = build(size, indexed)
+        # La recherche la plus défavorable pour un parcours : le dernier inséré
+        email = "user{}@example.com".format(size - 1)
+        owner_id = owners[(size - 1) // 2].id
+        repeat = 1 if size >= 1000000 and not indexed else 5
+        row.append('%.1f' % timed(lambda: users.get_by_attribute('email', email), repeat))
+        row.append('%.1f' % timed(lambda: places.find_all_by_attribute('owner.id', owner_id), repeat))
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    args = parser.parse_args()
+    rows = [run(size) for size in args.sizes]
+    headers = ['objects', 'scan email us', 'scan owner us', 'index email us', 'index owner us']
+    widths = [max(len(h), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print('  '.join(h.rjust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print('  '.join(str(c).rjust(w) for c, w in zip(row, widths)))
+
+
+if __name__ == '__main__':
+    main()
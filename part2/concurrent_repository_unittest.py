@@ -0,0 +1,86 @@
+from app.models.user import User
+from app.persistence.concurrent_repository import ConcurrentInMemoryRepository, RWLock
+import threading
+import unittest
+
+class TestConcurrentInMemoryRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.users = ConcurrentInMemoryRepository(stripes=4)
+        self.users.add_index('email', unique=True)
+        self.jane = User("Jane", "Doe", "jane.doe@example.com")
+        self.users.add(self.jane)
+
+    def run_threads(self, target, count=8):
+        threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    #------------- compare-and-set -------------
+    def test_compare_and_set(self):
+        self.assertTrue(self.users.compare_and_set(self.jane.id, {"first_name": "Jane"}, {"first_name": "Janet"}))
+        self.assertFalse(self.users.compare_and_set(self.jane.id, {"first_name": "Jane"}, {"first_name": "Jo"}))
+        self.assertEqual(self.jane.first_name, "Janet")
+        self.assertFalse(self.users.compare_and_set("nope", {}, {"first_name": "Jo"}))
+
+    def test_compare_and_set_loses_no_update(self):
+        self.jane.last_name = "0"
+
+        def increment(_):
+            for _ in range(200):
+                while True:
+                    current = self.jane.last_name
+                    if self.users.compare_and_set(self.jane.id, {"last_name": current},
+                                                  {"last_name": str(int(current) + 1)}):
+                        break
+
+        self.run_threads(increment)
+        self.assertEqual(self.jane.last_name, "1600")
+
+    #------------- unique index under contention -------------
+    def test_unique_email_race(self):
+        winners = []
+
+        def register(i):
+            try:
+                self.users.add(User("Twin", str(i), "twin@example.com"))
+                winners.append(i)
+            except ValueError:
+                pass
+
+        self.run_threads(register, count=16)
+        self.assertEqual(len(winners), 1)
+        self.assertEqual(self.users.get_by_attribute('email', "twin@example.com").last_name, str(winners[0]))
+
+    #------------- snapshots while writing -------------
+    def test_get_all_during_writes(self):
+        sizes = []
+
+        def write(i):
+            for n in range(100):
+                user = User("Load", str(i), "load{}.{}@example.com".format(i, n))
+                self.users.add(user)
+                self.users.delete(user.id)
+                sizes.append(len(self.users.get_all()))
+
+        self.run_threads(write)
+        self.assertEqual([user.id for user in self.users.get_all()], [self.jane.id])
+        self.assertTrue(all(1 <= size <= 9 for size in sizes))
+
+    def test_rwlock_exclusive(self):
+        lock, inside, overlaps = RWLock(), [0], []
+
+        def exclusive(_):
+            for _ in range(200):
+                with lock.exclusive():
+                    inside[0] += 1
+                    overlaps.append(inside[0])
+                    inside[0] -= 1
+
+        self.run_threads(exclusive, count=4)
+        self.assertEqual(set(overlaps), {1})
+
+if __name__ == '__main__':
+    unittest.main()
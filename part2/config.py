@@ -3,6 +3,12 @@ import os
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
     DEBUG = False
+    # Dossier du snapshot et du journal des dépôts en mémoire (None : rien n'est écrit sur disque)
+    DATA_DIR = os.getenv('HBNB_DATA_DIR')
+    # False : l'écriture n'attend pas le fsync (au plus WAL_SYNC_INTERVAL secondes perdues en cas de crash)
+    WAL_SYNCHRONOUS = os.getenv('HBNB_WAL_SYNCHRONOUS', '1') != '0'
+    WAL_SYNC_INTERVAL = 0.002
+    WAL_COMPACT_THRESHOLD = 100000
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -0,0 +1,90 @@
+from app.models.user import User
+from app.models.place import Place
+from app.models.amenity import Amenity
+from app.persistence.durable import DurableInMemoryRepository, DurableStore
+import os
+import shutil
+import tempfile
+import unittest
+
+class TestDurableRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='hbnb-durable-')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def open_store(self, **options):
+        store = DurableStore(self.directory, **options)
+        repos = {name: DurableInMemoryRepository(store, name) for name in ('user', 'place', 'amenity')}
+        repos['user'].add_index('email', unique=True)
+        repos['place'].add_index('owner.id')
+        store.open()
+        return store, repos
+
+    def fill(self, repos):
+        user = User("Jane", "Doe", "jane.doe@example.com")
+        wifi = Amenity("Wifi")
+        repos['user'].add(user)
+        repos['amenity'].add(wifi)
+        place = Place(title="Loft", price=80.0, latitude=1.0, longitude=2.0, owner=user, amenities=[wifi])
+        repos['place'].add(place)
+        repos['user'].update(user.id, {"email": "jane@example.com"})
+        gone = User("John", "Doe", "john.doe@example.com")
+        repos['user'].add(gone)
+        repos['user'].delete(gone.id)
+        return user, place
+
+    def check(self, repos, user, place):
+        loaded = repos['place'].get(place.id)
+        self.assertEqual(loaded.title, "Loft")
+        # ----- references point to the objects of the other repositories -----
+        self.assertIs(loaded.owner, repos['user'].get(user.id))
+        self.assertIs(loaded.amenities[0], repos['amenity'].get(loaded.amenities[0].id))
+        self.assertEqual(repos['user'].get_by_attribute('email', "jane@example.com").id, user.id)
+        self.assertIsNone(repos['user'].get_by_attribute('email', "john.doe@example.com"))
+        self.assertEqual(len(repos['user'].get_all()), 1)
+        self.assertEqual(repos['place'].find_all_by_attribute('owner.id', user.id), [loaded])
+
+    #------------- replay of the log -------------
+    def test_reload_from_log(self):
+        store, repos = self.open_store()
+        user, place = self.fill(repos)
+        store.close()
+        store, repos = self.open_store()
+        self.check(repos, user, place)
+        # ----- an update after the reload is also replayed into the shared object -----
+        repos['user'].update(user.id, {"first_name": "Janet"})
+        store.close()
+        store, repos = self.open_store()
+        self.assertEqual(repos['place'].get(place.id).owner.first_name, "Janet")
+        store.close()
+
+    #------------- snapshot then log -------------
+    def test_reload_after_compaction(self):
+        store, repos = self.open_store(compact_threshold=4)
+        user, place = self.fill(repos)
+        store.close()
+        self.assertTrue(os.path.exists(os.path.join(self.directory, 'snapshot.pkl')))
+        store, repos = self.open_store()
+        self.check(repos, user, place)
+        store.close()
+
+    #------------- a torn record at the end of the log is dropped -------------
+    def test_torn_tail(self):
+        store, repos = self.open_store(synchronous=False)
+        user, place = self.fill(repos)
+        store.close()
+        with open(os.path.join(self.directory, 'wal.log'), 'ab') as f:
+            f.write(b'\x00\x00\x01\x00garbage')
+        store, repos = self.open_store()
+        self.check(repos, user, place)
+        repos['user'].add(User("Ann", "Lee", "ann.lee@example.com"))
+        store.close()
+        store, repos = self.open_store()
+        self.assertIsNotNone(repos['user'].get_by_attribute('email', "ann.lee@example.com"))
+        store.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+from app.models.user import User
+from app.models.place import Place
+from app.persistence.repository import InMemoryRepository
+import unittest
+
+class TestInMemoryRepositoryIndexes(unittest.TestCase):
+
+    def setUp(self):
+        self.users = InMemoryRepository()
+        self.users.add_index('email', unique=True)
+        self.places = InMemoryRepository()
+        self.places.add_index('owner.id')
+        self.jane = User("Jane", "Doe", "jane.doe@example.com")
+        self.john = User("John", "Doe", "john.doe@example.com")
+        self.users.add(self.jane)
+        self.users.add(self.john)
+
+    def make_place(self, title, owner):
+        return Place(title=title, price=10.0, latitude=0.0, longitude=0.0, owner=owner, amenities=[])
+
+    #------------- unique index -------------
+    def test_unique_lookup(self):
+        self.assertIs(self.users.get_by_attribute('email', "jane.doe@example.com"), self.jane)
+        self.assertIsNone(self.users.get_by_attribute('email', "nobody@example.com"))
+        with self.assertRaises(ValueError):
+            self.users.add(User("Jane", "Twin", "jane.doe@example.com"))
+
+    def test_unique_update_and_delete(self):
+        self.users.update(self.jane.id, {"email": "jane@example.com"})
+        self.assertIsNone(self.users.get_by_attribute('email', "jane.doe@example.com"))
+        self.assertIs(self.users.get_by_attribute('email', "jane@example.com"), self.jane)
+        # ----- conflicting update leaves the object and the index untouched -----
+        with self.assertRaises(ValueError):
+            self.users.update(self.john.id, {"email": "jane@example.com"})
+        self.assertEqual(self.john.email, "john.doe@example.com")
+        self.assertIs(self.users.get_by_attribute('email', "john.doe@example.com"), self.john)
+        self.users.delete(self.jane.id)
+        self.assertIsNone(self.users.get_by_attribute('email', "jane@example.com"))
+        # ----- the email is free again -----
+        self.users.add(User("Jane", "Again", "jane@example.com"))
+
+    #------------- non-unique index on a dotted attribute -------------
+    def test_find_all_by_owner(self):
+        first = self.make_place("First", self.jane)
+        second = self.make_place("Second", self.jane)
+        other = self.make_place("Other", self.john)
+        for place in (first, second, other):
+            self.places.add(place)
+        self.assertEqual(self.places.find_all_by_attribute('owner.id', self.jane.id), [first, second])
+        self.places.update(second.id, {"owner": self.john})
+        self.assertEqual(self.places.find_all_by_attribute('owner.id', self.jane.id), [first])
+        self.assertEqual(self.places.find_all_by_attribute('owner.id', self.john.id), [other, second])
+        self.places.delete(first.id)
+        self.assertEqual(self.places.find_all_by_attribute('owner.id', self.jane.id), [])
+        # ----- attributes without an index still work, by scanning -----
+        self.assertEqual(self.places.find_all_by_attribute('title', "Other"), [other])
+
+    def test_index_built_on_existing_objects(self):
+        repo = InMemoryRepository()
+        repo.add(self.jane)
+        repo.add(User("Jane", "Twin", "jane.doe@example.com"))
+        with self.assertRaises(ValueError):
+            repo.add_index('email', unique=True)
+        repo.add_index('last_name')
+        self.assertEqual(len(repo.find_all_by_attribute('last_name', "Twin")), 1)
+
+if __name__ == '__main__':
+    unittest.main()
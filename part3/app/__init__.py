@@ -5,7 +5,6 @@ from flask_restx import Api
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_bcrypt import Bcrypt
-<<<<<<< HEAD
 import os
 
 
@@ -15,17 +14,6 @@ bcrypt = Bcrypt()
 jwt = JWTManager()
 
 
-bcrypt = Bcrypt()
-jwt = JWTManager()
-db = SQLAlchemy()
-
-from app.api.v1.auth import api as auth_ns
-from app.api.v1.users import api as users_ns
-from app.api.v1.places import api as places_ns
-from app.api.v1.reviews import api as reviews_ns
-from app.api.v1.amenities import api as amenities_ns
-
-
 def create_app(config_class="config.DevelopmentConfig"):
     """
     Crée et configure l'application Flask.
@@ -33,6 +21,10 @@ def create_app(config_class="config.DevelopmentConfig"):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # Profil du pool de connexions, avant la création du moteur
+    from app.persistence.engine import engine_options
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+
     # Initialisation des extensions avec l'application Flask
     db.init_app(app)
     bcrypt.init_app(app)
@@ -47,6 +39,19 @@ def create_app(config_class="config.DevelopmentConfig"):
         doc='/', # Rend la documentation Swagger accessible à la racine /
     )
 
+    # Pool bcrypt plein (voir app/services/password_pool.py) : 429 sur toutes les routes
+    from app.services.password_pool import PasswordPoolSaturated
+
+    @api.errorhandler(PasswordPoolSaturated)
+    def password_pool_saturated(e):
+        return {'error': str(e)}, 429, {'Retry-After': '1'}
+
+    # Latence, SQL et sérialisation par route (voir /api/v1/admin/metrics)
+    from app.services.metrics import request_metrics
+    request_metrics.init_app(app, api)
+    from app.services.profiler import request_profiler
+    request_profiler.init_app(app)
+
     # Importation et ajout des Namespaces (vos modules d'API)
     # Assurez-vous que ces imports sont corrects par rapport à votre structure de fichiers
     from app.api.v1.auth import api as auth_ns
@@ -64,41 +69,43 @@ def create_app(config_class="config.DevelopmentConfig"):
     api.add_namespace(admin_ns, path='/api/v1/admin') # <-- Ajouté pour Admin
 
 
-    # --- DÉBUT DE LA SECTION CRUCIALE POUR LA CRÉATION DES TABLES ---
     # Importez TOUS vos modèles ici pour que SQLAlchemy puisse les "voir"
-    # et créer les tables correspondantes dans la base de données.
     from app.models.user import User
     from app.models.amenity import Amenity
     from app.models.city import City
     from app.models.place import Place
     from app.models.review import Review
+    from app.models.place_rating_stats import PlaceRatingStats
 
-    # Créez les tables de la base de données DANS le contexte de l'application.
-    with app.app_context():
-        print("DEBUG: TENTATIVE DE CRÉATION DES TABLES...")
-        try:
-            db.create_all()
-            print("DEBUG: db.create_all() EXÉCUTÉ SANS ERREUR.")
-
-            from sqlalchemy import inspect
-            inspector = inspect(db.engine)
-            tables_in_db = inspector.get_table_names()
-            print(f"DEBUG: Tables trouvées par SQLAlchemy APRES création: {tables_in_db}")
-
-        except Exception as e:
-            print(f"ERREUR LORS DE db.create_all(): {e}")
-            import traceback
-            traceback.print_exc()
-
-        print("DEBUG: FIN DU BLOC DE CRÉATION DES TABLES.")
-    # --- FIN DE LA SECTION CRUCIALE POUR LA CRÉATION DES TABLES ---
-
-    db.init_app(app)
-    bcrypt.init_app(app)
-    jwt.init_app(app)
-
-    from app.models.user import create_first_admin
-
+    # Aucune connexion ici : le moteur reçoit seulement ses événements.
+    # Le schéma se crée avec `flask db-upgrade`, l'admin avec `flask create-admin`.
     with app.app_context():
-        create_first_admin()
+        from app.persistence.engine import configure_engine
+        configure_engine(db.engine, app.config)
+        if app.config.get('METRICS_ENABLED', True):
+            request_metrics.instrument_engine(db.engine)
+        from app.persistence.slow_queries import slow_query_log
+        slow_query_log.configure(app.config.get('SLOW_QUERY_MS'), app.config.get('SLOW_QUERY_LOG_SIZE', 100),
+                                 app.config.get('SLOW_QUERY_EXPLAIN', True))
+        if slow_query_log.enabled:
+            slow_query_log.instrument_engine(db.engine)
+        if app.config.get('AUTO_CREATE_SCHEMA'):
+            from app import migrations
+            migrations.upgrade(db.engine)
+
+    from app.services import facade
+    from app.persistence.cache import cache_backend_from_url
+    for name, params in app.config.get('REPOSITORY_CACHE', {}).items():
+        facade.enable_cache(name, **params)
+    facade.set_cache_backend(cache_backend_from_url(app.config.get('CACHE_BACKEND_URL'),
+                                                    ttl=app.config.get('CACHE_PAYLOAD_TTL')))
+
+    from app.services.password_pool import password_pool
+    password_pool.configure(workers=app.config.get('PASSWORD_POOL_SIZE', 0),
+                            max_pending=app.config.get('PASSWORD_POOL_MAX_PENDING', 64),
+                            rounds=app.config.get('BCRYPT_LOG_ROUNDS', 12),
+                            timeout=app.config.get('PASSWORD_POOL_TIMEOUT', 10.0))
+
+    from app.cli import register_commands
+    register_commands(app)
     return app
@@ -0,0 +1,76 @@
+import hashlib
+
+from flask import current_app, request
+from flask_jwt_extended import get_jwt, get_jwt_identity
+
+from app.services.metrics import request_metrics
+
+
+def json_response(body, status=200, etag=None):
+    """Response for an already serialized JSON body (e.g. a cached payload)."""
+    response = current_app.response_class(body, status=status, mimetype='application/json')
+    if etag is not None:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def version_tag(*parts):
+    """Opaque ETag value of a version: ids, updated_at timestamps, counters..."""
+    return hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+
+
+def entity_tag(obj, *extra):
+    """Version of one entity, from its id and updated_at plus what else its body embeds."""
+    return version_tag(obj.id, obj.updated_at, *extra)
+
+
+def collection_tag(tags, *extra):
+    """Version of a collection body from the versions of its members, in order."""
+    return version_tag(len(tags), *tags, *extra)
+
+
+def conditional_response(etag, serialize):
+    """
+    304 when the If-None-Match of the request names etag, otherwise the
+    JSON text returned by serialize(), sent with a weak ETag.
+
+    serialize only runs when the client has no current copy.
+    """
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag, weak=True)
+        return response
+    return json_response(request_metrics.measure_serialization(serialize), etag=etag)
+
+
+def current_identity():
+    """
+    Identity of the request's JWT as {'id': ..., 'is_admin': ...}, or None without one.
+
+    The token subject is the user id alone (PyJWT 2.10+ only accepts a
+    string 'sub'); the admin flag travels in the is_admin claim.
+    """
+    user_id = get_jwt_identity()
+    if user_id is None:
+        return None
+    return {'id': user_id, 'is_admin': bool(get_jwt().get('is_admin'))}
+
+
+MAX_BULK_ITEMS = 5000
+
+
+def bulk_items(payload):
+    """Check the body of a /bulk endpoint: a non-empty JSON array of objects."""
+    if not isinstance(payload, list) or not payload:
+        raise ValueError("Expected a non-empty JSON array")
+    if len(payload) > MAX_BULK_ITEMS:
+        raise ValueError(f"At most {MAX_BULK_ITEMS} items per request")
+    if not all(isinstance(item, dict) for item in payload):
+        raise ValueError("Every item must be a JSON object")
+    return payload
+
+
+def bulk_response(created, errors):
+    """Ids of the inserted items and per-item errors (index in the request array)."""
+    status = 201 if created else 400
+    return {'created': [obj.id for obj in created], 'errors': errors}, status
@@ -1,9 +1,16 @@
 # app/api/v1/admin.py
 
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import current_app
+from flask_jwt_extended import jwt_required
+from app.api.v1 import current_identity
 from flask_restx import Namespace, Resource, fields
 from app.models.user import User # Pour les opérations sur les utilisateurs
 from app import db # Importez l'instance de db (si vous l'utilisez directement)
+from app.services.password_pool import password_pool
+from app.persistence.engine import pool_metrics
+from app.persistence.slow_queries import slow_query_log
+from app.services.metrics import request_metrics
+from app.services.profiler import request_profiler
 
 api = Namespace('admin', description='Admin operations')
 
@@ -24,7 +31,7 @@ class AdminUsersList(Resource):
     @api.response(400, 'Invalid input data or email already registered')
     def post(self):
         """Register a new user as an admin."""
-        # current_user = get_jwt_identity()
+        # current_user = current_identity()
         # if not current_user.get('is_admin'):
         #     return {'error': 'Admin privileges required'}, 403
 
@@ -52,7 +59,7 @@ class AdminUsersList(Resource):
     @api.response(200, 'User details retrieved successfully')
     def get(self):
         """Get all users (admin view)."""
-        # current_user = get_jwt_identity()
+        # current_user = current_identity()
         # if not current_user.get('is_admin'):
         #     return {'error': 'Admin privileges required'}, 403
 
@@ -66,7 +73,7 @@ class AdminUserResource(Resource):
     @api.response(404, 'User not found')
     def get(self, user_id):
         """Get user details by ID (admin view)."""
-        # current_user = get_jwt_identity()
+        # current_user = current_identity()
         # if not current_user.get('is_admin'):
         #     return {'error': 'Admin privileges required'}, 403
 
@@ -82,7 +89,7 @@ class AdminUserResource(Resource):
     @api.response(404, 'User not found')
     def put(self, user_id):
         """Update user details by ID (admin view)."""
-        # current_user = get_jwt_identity()
+        # current_user = current_identity()
         # if not current_user.get('is_admin'):
         #     return {'error': 'Admin privileges required'}, 403
 
@@ -114,7 +121,7 @@ class AdminUserResource(Resource):
     @api.response(404, 'User not found')
     def delete(self, user_id):
         """Delete user by ID (admin view)."""
-        # current_user = get_jwt_identity()
+        # current_user = current_identity()
         # if not current_user.get('is_admin'):
         #     return {'error': 'Admin privileges required'}, 403
 
@@ -124,3 +131,100 @@ class AdminUserResource(Resource):
 
         user.delete()
         return '', 204
+
+
+@api.route('/password-pool')
+class AdminPasswordPool(Resource):
+    @jwt_required()
+    @api.response(200, 'Password pool queue depth and counters')
+    @api.response(403, 'Admin privileges required')
+    def get(self):
+        """Queue depth of the bcrypt worker pool (pending, completed, rejected)."""
+        current_user = current_identity()
+        if not current_user.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+        return password_pool.stats(), 200
+
+
+@api.route('/db-pool')
+class AdminDbPool(Resource):
+    @jwt_required()
+    @api.response(200, 'Connection pool usage and checkout wait')
+    @api.response(403, 'Admin privileges required')
+    def get(self):
+        """Database connection pool usage (checked out, overflow) and checkout wait times."""
+        current_user = current_identity()
+        if not current_user.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+        return pool_metrics.stats(db.engine), 200
+
+
+@api.route('/metrics')
+class AdminMetrics(Resource):
+    @jwt_required()
+    @api.response(200, 'Request, SQL and pool metrics in the Prometheus text format')
+    @api.response(403, 'Admin privileges required')
+    def get(self):
+        """Per-route latency histograms, SQL and serialization time, pool gauges (Prometheus)."""
+        current_user = current_identity()
+        if not current_user.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+        body = request_metrics.render({
+            'hbnb_db_pool': pool_metrics.stats(db.engine),
+            'hbnb_password_pool': password_pool.stats(),
+        })
+        return current_app.response_class(body, mimetype='text/plain; version=0.0.4')
+
+
+@api.route('/slow-queries')
+class AdminSlowQueries(Resource):
+    @jwt_required()
+    @api.response(200, 'Statements over SLOW_QUERY_MS, newest first, with their query plan')
+    @api.response(403, 'Admin privileges required')
+    def get(self):
+        """Slow-query log: SQL, parameter types, endpoint, calling frames and EXPLAIN output."""
+        current_user = current_identity()
+        if not current_user.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+        return {'stats': slow_query_log.stats(), 'queries': slow_query_log.entries()[::-1]}, 200
+
+    @jwt_required()
+    @api.response(204, 'Slow-query log emptied')
+    @api.response(403, 'Admin privileges required')
+    def delete(self):
+        """Empty the slow-query log."""
+        current_user = current_identity()
+        if not current_user.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+        slow_query_log.clear()
+        return '', 204
+
+
+@api.route('/profiles')
+class AdminProfiles(Resource):
+    @jwt_required()
+    @api.response(200, 'Stored request profiles, newest first')
+    @api.response(403, 'Admin privileges required')
+    def get(self):
+        """Profiles stored by requests sent with the X-HBnB-Profile header."""
+        current_user = current_identity()
+        if not current_user.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+        return {'profiles': request_profiler.stored()}, 200
+
+
+@api.route('/profiles/<string:name>')
+class AdminProfile(Resource):
+    @jwt_required()
+    @api.response(200, 'Collapsed stacks, ready for flamegraph.pl or speedscope')
+    @api.response(403, 'Admin privileges required')
+    @api.response(404, 'Profile not found')
+    def get(self, name):
+        """One stored profile in the collapsed-stack format."""
+        current_user = current_identity()
+        if not current_user.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+        body = request_profiler.read(name)
+        if body is None:
+            return {'error': 'Profile not found'}, 404
+        return current_app.response_class(body, mimetype='text/plain')
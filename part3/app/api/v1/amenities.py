@@ -1,6 +1,9 @@
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
+from app.api.v1 import current_identity
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
+from app.api.v1 import bulk_items, bulk_response, collection_tag, conditional_response, entity_tag
+from app.api.v1.serializers import dumps, serialize_amenity
 
 api = Namespace('amenities', description='Amenity operations')
 
@@ -17,7 +20,7 @@ class AmenityList(Resource):
     def post(self):
         """Create a new amenity"""
         data = api.payload
-        current_user = get_jwt_identity()
+        current_user = current_identity()
         if not current_user.get('is_admin'):
             return {'error': 'Admin privileges required'}, 403
         if not data.get('name'):
@@ -32,7 +35,29 @@ class AmenityList(Resource):
     def get(self):
         """Lister toutes les amenities"""
         amenities = facade.get_all_amenities()
-        return [{'id': a.id, 'name': a.name} for a in amenities], 200
+        return conditional_response(collection_tag([entity_tag(a) for a in amenities]),
+                                    lambda: dumps([serialize_amenity(a) for a in amenities]))
+
+@api.route('/bulk')
+class AmenityBulk(Resource):
+    @api.expect([amenity_model])
+    @api.response(201, 'Amenities created, with per-item errors')
+    @api.response(400, 'Invalid input data')
+    @jwt_required()
+    def post(self):
+        """Create many amenities in batched transactions"""
+        current_user = current_identity()
+        if not current_user.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+        try:
+            items = bulk_items(api.payload)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return bulk_response(*facade.create_amenities(items))
+
+def _amenity_payload(amenity_id):
+    amenity = facade.get_amenity(amenity_id)
+    return (entity_tag(amenity), dumps(serialize_amenity(amenity))) if amenity else None
 
 @api.route('/<string:amenity_id>')
 class AmenityResource(Resource):
@@ -40,10 +65,11 @@ class AmenityResource(Resource):
     @api.response(404, 'Amenity not found')
     def get(self, amenity_id):
         """amenity ID"""
-        amenity = facade.get_amenity(amenity_id)
-        if not amenity:
+        cached = facade.get_payload('amenity', amenity_id, _amenity_payload)
+        if cached is None:
             return {'error': 'Amenity not found'}, 404
-        return {'id': amenity.id, 'name': amenity.name}, 200
+        etag, payload = cached
+        return conditional_response(etag, lambda: payload)
 
     @api.expect(amenity_model, validate=True)
     @api.response(200, 'Amenity updated successfully')
@@ -51,7 +77,7 @@ class AmenityResource(Resource):
     @jwt_required()
     def put(self, amenity_id):
         """Update amenity by ID"""
-        current_user = get_jwt_identity()
+        current_user = current_identity()
         if not current_user.get('is_admin'):
             return {'error': 'Admin privileges required'}, 403
         data = api.payload
@@ -1,7 +1,7 @@
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import create_access_token
 from app.services import facade
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 
 api = Namespace('auth', description='Authentication operations')
 
@@ -22,11 +22,12 @@ class Login(Resource):
         user = facade.get_user_by_email(credentials['email'])
         
         # Step 2: Check if the user exists and the password is correct
+        # (bcrypt runs in the password pool; a full pool answers 429, see create_app)
         if not user or not user.verify_password(credentials['password']):
             return {'error': 'Invalid credentials'}, 401
 
-        # Step 3: Create a JWT token with the user's id and is_admin flag
-        access_token = create_access_token(identity={'id': str(user.id), 'is_admin': user.is_admin})
+        # Step 3: Create a JWT token with the user's id as subject and the is_admin flag as a claim
+        access_token = create_access_token(identity=str(user.id), additional_claims={'is_admin': user.is_admin})
         
         # Step 4: Return the JWT token to the client
         return {'access_token': access_token}, 200
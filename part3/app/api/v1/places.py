@@ -1,12 +1,19 @@
 # app/api/v1/places.py
 
-from flask_restx import Namespace, Resource, fields
+from flask_restx import Namespace, Resource, fields, inputs
 from flask import request, abort
+from flask_jwt_extended import jwt_required
+from app.api.v1 import current_identity
 from app.models.place import Place # Importez le modèle Place
 from app.models.user import User # Pour valider user_id et afficher l'hôte
 from app.models.city import City # Pour valider city_id et afficher la ville
 from app.models.amenity import Amenity # Pour gérer les amenities
 from app import db # Importez l'instance de db
+from app.services import facade
+from app.api.v1 import bulk_items, bulk_response, collection_tag, conditional_response, entity_tag
+from app.api.v1.serializers import compile_model, dumps
+from app.persistence.pagination import DEFAULT_PAGE_SIZE
+from app.services.repositories.place_repository import PLACE_SORTS
 
 api = Namespace('places', description='Opérations liées aux lieux (places)')
 
@@ -32,6 +39,13 @@ amenity_summary_model = api.model('AmenitySummary', {
     'name': fields.String
 })
 
+# Modèle imbriqué pour les agrégats des notes (PlaceRatingStats)
+rating_summary_model = api.model('RatingSummary', {
+    'count': fields.Integer(attribute='review_count'),
+    'average': fields.Float,
+    'histogram': fields.Raw(description='Nombre de reviews par note, de 1 à 5')
+})
+
 # Modèle principal pour la sérialisation d'un Place
 place_model = api.model('Place', {
     'id': fields.String(readOnly=True, description='Identifiant unique du lieu'),
@@ -57,9 +71,38 @@ place_model = api.model('Place', {
     # amenities = db.relationship('Amenity', secondary=place_amenity, backref=db.backref('places', lazy=True), lazy='dynamic')
     'host': fields.Nested(user_summary_model, description='Détails de l\'hôte', attribute='host', skip_none=True),
     'city': fields.Nested(city_summary_model, description='Détails de la ville', attribute='city', skip_none=True),
-    'amenities': fields.List(fields.Nested(amenity_summary_model), description='Liste des équipements associés', attribute='amenities', skip_none=True)
+    'amenities': fields.List(fields.Nested(amenity_summary_model), description='Liste des équipements associés', attribute='amenities', skip_none=True),
+    'rating': fields.Nested(rating_summary_model, description='Agrégats des notes', attribute='rating_stats', allow_null=True)
 })
 
+# Sérialiseur généré une fois pour place_model, même sortie que marshal(place, place_model)
+serialize_place = compile_model(place_model)
+
+
+def place_tag(place):
+    """ETag value of a place body: the place, its rating aggregates and its amenities."""
+    stats = place.rating_stats
+    return entity_tag(place, stats and (stats.review_count, stats.rating_sum),
+                      [(amenity.id, amenity.updated_at) for amenity in place.amenities])
+
+
+def place_payload(place):
+    """(ETag, JSON text) of a place detail."""
+    return place_tag(place), dumps(serialize_place(place))
+
+
+def place_page_tag(places, next_cursor, facets):
+    # Version de la page : celle de chacun de ses lieux, le curseur suivant et les facettes
+    return collection_tag([place_tag(place) for place in places], next_cursor, facets)
+
+
+def place_page_payload(places, next_cursor, facets):
+    """JSON text of a page of the places listing."""
+    result = {'places': [serialize_place(place) for place in places], 'next_cursor': next_cursor}
+    if facets is not None:
+        result['facets'] = facets
+    return dumps(result)
+
 # --- Parsers pour la validation des entrées (payload des requêtes) ---
 
 # Parser pour la création d'un Place (tous les champs non-nullables requis)
@@ -90,6 +133,31 @@ place_update_parser.add_argument('latitude', type=float, help='Latitude géograp
 place_update_parser.add_argument('longitude', type=float, help='Longitude géographique', location='json')
 place_update_parser.add_argument('amenity_ids', type=list, help='Liste des IDs des équipements à (re)associer', location='json')
 
+# Parser pour la pagination par curseur de la liste des lieux
+place_list_parser = api.parser()
+place_list_parser.add_argument('limit', type=int, default=DEFAULT_PAGE_SIZE, help='Nombre de lieux par page', location='args')
+place_list_parser.add_argument('cursor', type=str, help='Curseur opaque renvoyé dans next_cursor', location='args')
+place_list_parser.add_argument('min_price', type=float, help='Prix minimum', location='args')
+place_list_parser.add_argument('max_price', type=float, help='Prix maximum', location='args')
+place_list_parser.add_argument('amenity_ids', type=str, help='IDs des équipements, séparés par des virgules (tous requis)', location='args')
+place_list_parser.add_argument('min_rating', type=float, help='Note moyenne minimum', location='args')
+place_list_parser.add_argument('sort', type=str, default='created', choices=PLACE_SORTS, help='Ordre de la liste', location='args')
+place_list_parser.add_argument('facets', type=inputs.boolean, default=False, help='Renvoyer les facettes (amenities, tranches de prix)', location='args')
+
+# Parsers pour la recherche géographique
+place_radius_parser = api.parser()
+place_radius_parser.add_argument('lat', type=float, required=True, help='Latitude du centre', location='args')
+place_radius_parser.add_argument('lng', type=float, required=True, help='Longitude du centre', location='args')
+place_radius_parser.add_argument('radius_km', type=float, required=True, help='Rayon de recherche en km', location='args')
+place_radius_parser.add_argument('limit', type=int, default=DEFAULT_PAGE_SIZE, help='Nombre maximum de lieux', location='args')
+
+place_bbox_parser = api.parser()
+place_bbox_parser.add_argument('min_lat', type=float, required=True, help='Latitude sud', location='args')
+place_bbox_parser.add_argument('min_lng', type=float, required=True, help='Longitude ouest', location='args')
+place_bbox_parser.add_argument('max_lat', type=float, required=True, help='Latitude nord', location='args')
+place_bbox_parser.add_argument('max_lng', type=float, required=True, help='Longitude est (< min_lng si la boîte traverse l\'antiméridien)', location='args')
+place_bbox_parser.add_argument('limit', type=int, default=DEFAULT_PAGE_SIZE, help='Nombre maximum de lieux', location='args')
+
 
 # --- Ressources de l'API ---
 
@@ -106,7 +174,7 @@ class PlaceList(Resource):
         place_data = api.payload
         if not place_data:
             return {'error': 'empty data'}, 400
-        current_user = get_jwt_identity()
+        current_user = current_identity()
         place_data["owner_id"] = current_user["id"]
         try:
             new_place = facade.create_place(place_data)
@@ -122,11 +190,21 @@ class PlaceList(Resource):
         except ValueError as e:
             return  {'error': str(e)}, 400
 
+    @api.expect(place_list_parser)
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(400, 'Invalid pagination parameters')
     def get(self):
-        """Récupère la liste de tous les lieux."""
-        places = Place.query.all()
-        return places
+        """Récupère une page de lieux filtrés et triés (pagination par curseur)."""
+        args = place_list_parser.parse_args()
+        amenity_ids = [a for a in (args['amenity_ids'] or '').split(',') if a]
+        try:
+            places, next_cursor, facets = facade.search_places(
+                args['limit'], args['cursor'], args['sort'], args['min_price'], args['max_price'],
+                amenity_ids, args['min_rating'], args['facets'])
+        except ValueError as e:
+            api.abort(400, message=str(e))
+        return conditional_response(place_page_tag(places, next_cursor, facets),
+                                    lambda: place_page_payload(places, next_cursor, facets))
 
     @api.doc('create_place')
     @api.expect(place_create_parser)
@@ -143,14 +221,11 @@ class PlaceList(Resource):
         if not city:
             api.abort(400, message=f"City with ID {data['city_id']} not found.")
 
-        # Récupération des objets Amenity
-        amenities = []
-        if data['amenity_ids']:
-            for amenity_id in data['amenity_ids']:
-                amenity = Amenity.query.get(amenity_id)
-                if not amenity:
-                    api.abort(400, message=f"Amenity with ID {amenity_id} not found.")
-                amenities.append(amenity)
+        # Récupération des objets Amenity, en une seule requête
+        try:
+            amenities = facade.resolve_amenities(data['amenity_ids'])
+        except ValueError as e:
+            api.abort(400, message=str(e))
 
         try:
             new_place = Place(
@@ -179,18 +254,84 @@ class PlaceList(Resource):
             api.abort(500, message=f"Une erreur interne est survenue: {str(e)}")
 
 
+@api.route('/search')
+class PlaceRadiusSearch(Resource):
+    @api.doc('search_places_radius')
+    @api.expect(place_radius_parser)
+    @api.response(200, 'Lieux dans le rayon, du plus proche au plus lointain')
+    @api.response(400, 'Invalid search parameters')
+    def get(self):
+        """Recherche les lieux à moins de radius_km d'un point."""
+        args = place_radius_parser.parse_args()
+        try:
+            matches = facade.search_places_radius(args['lat'], args['lng'], args['radius_km'], args['limit'])
+        except ValueError as e:
+            api.abort(400, message=str(e))
+
+        def serialize():
+            places = []
+            for place, distance in matches:
+                payload = serialize_place(place)
+                payload['distance_km'] = round(distance, 3)
+                places.append(payload)
+            return dumps({'places': places})
+
+        return conditional_response(collection_tag([place_tag(place) for place, _ in matches]), serialize)
+
+
+@api.route('/search/bbox')
+class PlaceBoxSearch(Resource):
+    @api.doc('search_places_bbox')
+    @api.expect(place_bbox_parser)
+    @api.response(200, 'Lieux dans la boîte')
+    @api.response(400, 'Invalid search parameters')
+    def get(self):
+        """Recherche les lieux dans une boîte englobante."""
+        args = place_bbox_parser.parse_args()
+        try:
+            places = facade.search_places_bbox(args['min_lat'], args['min_lng'],
+                                               args['max_lat'], args['max_lng'], args['limit'])
+        except ValueError as e:
+            api.abort(400, message=str(e))
+        return conditional_response(collection_tag([place_tag(place) for place in places]),
+                                    lambda: dumps({'places': [serialize_place(place) for place in places]}))
+
+
+@api.route('/bulk')
+class PlaceBulk(Resource):
+    @api.doc('bulk_create_places')
+    @api.response(201, 'Lieux créés, avec les erreurs par élément')
+    @api.response(400, 'Invalid input data')
+    @jwt_required()
+    def post(self):
+        """Crée plusieurs lieux en transactions groupées."""
+        current_user = current_identity()
+        try:
+            items = bulk_items(api.payload)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return bulk_response(*facade.create_places(items, current_user["id"]))
+
+
+def _place_payload(place_id):
+    place = facade.get_place(place_id, endpoint='detail')
+    return place_payload(place) if place else None
+
+
 @api.route('/<string:place_id>')
 @api.response(404, 'Lieu non trouvé')
 @api.param('place_id', 'L\'identifiant du lieu')
 class PlaceResource(Resource):
     @api.doc('get_place')
-    @api.marshal_with(place_model)
+    @api.response(200, 'Success', place_model)
     def get(self, place_id):
         """Récupère les détails d'un lieu spécifique."""
-        place = Place.query.get(place_id)
-        if not place:
+        # Payload sérialisé (et son ETag) servi depuis le cache partagé quand il y est
+        cached = facade.get_payload('place', place_id, _place_payload)
+        if cached is None:
             api.abort(404, message="Lieu non trouvé")
-        return place
+        etag, payload = cached
+        return conditional_response(etag, lambda: payload)
 
     @api.doc('update_place')
     @api.expect(place_update_parser)
@@ -233,18 +374,16 @@ class PlaceResource(Resource):
         if 'longitude' in data and data['longitude'] is not None:
             place.longitude = data['longitude']
 
-        # Gestion des amenities (relation Many-to-Many)
+        # Gestion des amenities (relation Many-to-Many) : seuls les liens qui changent sont écrits
         if 'amenity_ids' in data and data['amenity_ids'] is not None:
-            new_amenities = []
-            for amenity_id in data['amenity_ids']:
-                amenity = Amenity.query.get(amenity_id)
-                if not amenity:
-                    api.abort(400, message=f"Amenity with ID {amenity_id} not found.")
-                new_amenities.append(amenity)
-            place.amenities = new_amenities # Met à jour la liste des amenities
+            try:
+                facade.set_place_amenities(place, data['amenity_ids'])
+            except ValueError as e:
+                api.abort(400, message=str(e))
 
         try:
             place.save()
+            facade.invalidate('place', place_id)
             return place
         except ValueError as e:
             api.abort(400, message=str(e))
@@ -262,6 +401,7 @@ class PlaceResource(Resource):
 
         try:
             place.delete()
+            facade.invalidate('place', place_id)
             return '', 204
         except Exception as e:
             db.session.rollback()
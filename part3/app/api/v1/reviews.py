@@ -1,6 +1,11 @@
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from flask_restx import Namespace, Resource, fields
+from flask import Response, stream_with_context
+from flask_jwt_extended import jwt_required
+from app.api.v1 import current_identity
+from flask_restx import Namespace, Resource, fields, inputs
 from app.services import facade
+from app.api.v1 import bulk_items, bulk_response, collection_tag, conditional_response, entity_tag
+from app.api.v1.serializers import dumps, serialize_review
+from app.persistence.pagination import DEFAULT_PAGE_SIZE
 
 api = Namespace('reviews', description='Review operations')
 
@@ -20,7 +25,7 @@ class ReviewList(Resource):
     def post(self):
         """Create a new review"""
         review_data = api.payload
-        current_user = get_jwt_identity()
+        current_user = current_identity()
         place = facade.get_place(review_data["place_id"])
         if not place: 
             return {'error': 'wrong place id'}, 400
@@ -40,7 +45,27 @@ class ReviewList(Resource):
     def get(self):
         """Retrieve all reviews"""
         reviews = facade.get_all_reviews()
-        return [review.to_dict() for review in reviews], 200
+        return conditional_response(collection_tag([entity_tag(review) for review in reviews]),
+                                    lambda: dumps([serialize_review(review) for review in reviews]))
+
+@api.route('/bulk')
+class ReviewBulk(Resource):
+    @api.expect([review_model])
+    @api.response(201, 'Reviews created, with per-item errors')
+    @api.response(400, 'Invalid input data')
+    @jwt_required()
+    def post(self):
+        """Create many reviews in batched transactions"""
+        current_user = current_identity()
+        try:
+            items = bulk_items(api.payload)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return bulk_response(*facade.create_reviews(items, current_user["id"]))
+
+def _review_payload(review_id):
+    review = facade.get_review(review_id)
+    return (entity_tag(review), dumps(serialize_review(review))) if review else None
 
 @api.route('/<review_id>')
 class ReviewResource(Resource):
@@ -48,9 +73,10 @@ class ReviewResource(Resource):
     @api.response(404, 'Review not found')
     def get(self, review_id):
         """Retrieve review details by ID"""
-        review = facade.get_review(review_id)
-        if review:
-            return review.to_dict(), 200
+        cached = facade.get_payload('review', review_id, _review_payload)
+        if cached:
+            etag, payload = cached
+            return conditional_response(etag, lambda: payload)
         else:
             return {'error': 'Review not found'}, 404
         
@@ -63,7 +89,7 @@ class ReviewResource(Resource):
     def put(self, review_id):
         """Update review information"""
         review_data = api.payload
-        current_user = get_jwt_identity()
+        current_user = current_identity()
         review = facade.get_review(review_id)
         if not review:
             return {'error': 'Review not found'}, 404
@@ -80,7 +106,7 @@ class ReviewResource(Resource):
     @jwt_required()
     def delete(self, review_id):
         """Delete a review"""
-        current_user = get_jwt_identity()
+        current_user = current_identity()
         review = facade.get_review(review_id)
         if not review:
             return {'error': 'Review not found'}, 404
@@ -92,16 +118,49 @@ class ReviewResource(Resource):
         except (TypeError, ValueError) as e:
             return {'error': str(e)}, 400
 
+place_reviews_parser = api.parser()
+place_reviews_parser.add_argument('limit', type=int, default=DEFAULT_PAGE_SIZE, help='Number of reviews per page', location='args')
+place_reviews_parser.add_argument('cursor', type=str, help='Opaque cursor returned in next_cursor', location='args')
+place_reviews_parser.add_argument('stream', type=inputs.boolean, default=False, help='Stream every review as one chunked JSON array', location='args')
+
+
+def review_page_tag(reviews, next_cursor):
+    return collection_tag([entity_tag(review) for review in reviews], next_cursor)
+
+
+def review_page_payload(reviews, next_cursor):
+    """JSON text of a page of the reviews of a place."""
+    return dumps({'reviews': [serialize_review(review) for review in reviews], 'next_cursor': next_cursor})
+
+
+def _stream_reviews(reviews):
+    # Tableau JSON envoyé morceau par morceau, une review à la fois
+    yield '['
+    for index, review in enumerate(reviews):
+        yield (',' if index else '') + dumps(serialize_review(review))
+    yield ']'
+
+
 @api.route('/places/<place_id>/reviews')
 class PlaceReviewList(Resource):
+    @api.expect(place_reviews_parser)
     @api.response(200, 'List of reviews for the place retrieved successfully')
+    @api.response(400, 'Invalid cursor or page size')
     @api.response(404, 'Place not found')
     def get(self, place_id):
-        """Retrieve all reviews for a specific place"""
-        output = []
-        place_reviews = facade.get_reviews_by_place(place_id)
-        if place_reviews is None:
+        """Retrieve the reviews of a place, one page at a time or streamed"""
+        args = place_reviews_parser.parse_args()
+        if args['stream']:
+            reviews = facade.iter_reviews_by_place(place_id)
+            if reviews is None:
+                return {'error': 'Place not found'}, 404
+            return Response(stream_with_context(_stream_reviews(reviews)), mimetype='application/json')
+        try:
+            page = facade.get_reviews_by_place(place_id, args['limit'], args['cursor'])
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        if page is None:
             return {'error': 'Place not found'}, 404
-        for element in place_reviews:
-            output.append(element.to_dict())
-        return output, 200
+        reviews, next_cursor = page
+        return conditional_response(review_page_tag(reviews, next_cursor),
+                                    lambda: review_page_payload(reviews, next_cursor))
@@ -0,0 +1,111 @@
+"""
+Precompiled response serializers.
+
+compile_model() turns a flask_restx model (or a plain dict of fields)
+into a function generated once, at import: one attribute read and one
+formatting call per field, no per-object field resolution. Its output
+is the same as marshal(obj, model). dumps() encodes with orjson when it
+is installed and falls back to the json module.
+"""
+import json
+from datetime import datetime
+
+from flask_restx import fields
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle
+    orjson = None
+
+
+def dumps(data):
+    """JSON text of data (dicts, lists, str, numbers, None)."""
+    if orjson is not None:
+        # Les histogrammes des notes ont des clés entières, comme json.dumps les accepte
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data, separators=(',', ':'))
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, datetime) else fields.DateTime().format(value)
+
+
+# Formatage par type de champ ; un type absent passe par field.output (même résultat, plus lent)
+_FORMATTERS = (
+    (fields.DateTime, lambda field: _iso if field.dt_format == 'iso8601' else field.format),
+    (fields.Boolean, lambda field: bool),
+    (fields.Integer, lambda field: int),
+    (fields.Float, lambda field: float),
+    (fields.String, lambda field: str),
+)
+
+
+def _formatter(field):
+    if type(field) is fields.Raw:
+        return None
+    for cls, build in _FORMATTERS:
+        if type(field) is cls:
+            return build(field)
+    return False
+
+
+def compile_model(model, skip_none=False):
+    """obj -> dict function equivalent to marshal(obj, model, skip_none=skip_none)."""
+    model = getattr(model, 'resolved', model)
+    namespace = {'_getattr': getattr}
+    lines = ['def serialize(obj):']
+    items = []
+    for index, (key, field) in enumerate(model.items()):
+        field = field() if isinstance(field, type) else field
+        attribute = field.attribute if field.attribute is not None else key
+        value = f'v{index}'
+        if not isinstance(attribute, str) or '.' in attribute or getattr(field, 'mask', None):
+            namespace[f'f{index}'] = field
+            items.append((key, f'f{index}.output({key!r}, obj)'))
+            continue
+        lines.append(f'    {value} = _getattr(obj, {attribute!r}, None)')
+        namespace[f'd{index}'] = field.default
+        if isinstance(field, fields.Nested):
+            namespace[f's{index}'] = compile_model(field.nested, field.skip_none)
+            # Comme Nested.output : None seulement avec allow_null, sinon le modèle imbriqué de None
+            empty = 'None' if field.allow_null else (f'd{index}' if field.default is not None else f's{index}(None)')
+            items.append((key, f'(s{index}({value}) if {value} is not None else {empty})'))
+        elif isinstance(field, fields.List) and isinstance(field.container, fields.Nested):
+            namespace[f's{index}'] = compile_model(field.container.nested, field.container.skip_none)
+            items.append((key, f'([s{index}(x) for x in {value}] if {value} is not None else d{index})'))
+        else:
+            formatter = _formatter(field)
+            if formatter is False or isinstance(field, fields.List):
+                namespace[f'f{index}'] = field
+                items.append((key, f'f{index}.output({key!r}, obj)'))
+                continue
+            if field.default:
+                namespace[f'd{index}'] = field.format(field.default)
+            if formatter is None:
+                items.append((key, f'({value} if {value} is not None else d{index})'))
+            else:
+                namespace[f'c{index}'] = formatter
+                items.append((key, f'(c{index}({value}) if {value} is not None else d{index})'))
+    lines.append('    out = {')
+    lines.extend(f'        {key!r}: {expression},' for key, expression in items)
+    lines.append('    }')
+    if skip_none:
+        lines.append('    return {k: v for k, v in out.items() if v is not None and v != {}}')
+    else:
+        lines.append('    return out')
+    exec(compile('\n'.join(lines), f'<serializer {getattr(model, "name", "fields")}>', 'exec'), namespace)
+    return namespace['serialize']
+
+
+# Mêmes clés que les to_dict() des modèles
+amenity_fields = {'id': fields.Raw, 'name': fields.Raw}
+review_fields = {
+    'id': fields.Raw,
+    'place': fields.Raw(attribute='place_id'),
+    'user': fields.Raw(attribute='user_id'),
+    'rating': fields.Raw,
+    'text': fields.Raw,
+}
+
+serialize_amenity = compile_model(amenity_fields)
+serialize_review = compile_model(review_fields)
@@ -1,9 +1,14 @@
 # app/api/v1/users.py
 
 from flask_restx import Namespace, Resource, fields, abort
+from flask_jwt_extended import jwt_required
+from app.api.v1 import current_identity
 from flask import request # Importez request au cas où vous en auriez besoin pour d'autres debugs, ou pour des requêtes complexes
 from app.models.user import User
 from app import db, bcrypt # Assurez-vous que db et bcrypt sont bien importés depuis app/__init__.py
+from app.services import facade
+from app.api.v1 import collection_tag, conditional_response, entity_tag
+from app.api.v1.serializers import compile_model, dumps
 
 print("DEBUG: Fichier users.py CHARGÉ ET EXÉCUTÉ !!!") # <--- PREMIER POINT DE DEBUG - POUR VÉRIFIER LE CHARGEMENT DU FICHIER
 
@@ -20,6 +25,9 @@ user_model = api.model('User', {
     'updated_at': fields.DateTime(readOnly=True, description='Date de dernière mise à jour')
 })
 
+# Sérialiseur généré une fois pour user_model, même sortie que marshal(user, user_model)
+serialize_user = compile_model(user_model)
+
 # Ce modèle sera utilisé pour valider l'entrée (payload) lors de la création d'un utilisateur
 # Il est crucial d'inclure 'password' car il est envoyé dans le payload d'entrée
 user_create_input_model = api.model('UserCreateInput', {
@@ -45,11 +53,12 @@ user_update_input_model = api.model('UserUpdateInput', {
 @api.route('/')
 class UserList(Resource):
     @api.doc('list_users')
-    @api.marshal_list_with(user_model, code=200)
+    @api.response(200, 'Success', [user_model])
     def get(self):
         """Récupère la liste de tous les utilisateurs."""
         users = User.query.all()
-        return users
+        return conditional_response(collection_tag([entity_tag(user) for user in users]),
+                                    lambda: dumps([serialize_user(user) for user in users]))
 
     @api.doc('create_user')
     # Utilisation du modèle d'entrée spécifique pour la création (avec mot de passe)
@@ -70,7 +79,7 @@ class AdminUserCreate(Resource):
         """Register a new user"""
         user_data = api.payload
         existing_user = facade.get_user_by_email(user_data['email'])
-        current_user = get_jwt_identity()
+        current_user = current_identity()
         if existing_user:
             return {'error': 'Email already registered'}, 400
         if user_data.get("is_admin") and not current_user:
@@ -112,7 +121,7 @@ class UserResource(Resource):
         """Get user details by ID"""
         new_data = api.payload
         user = facade.get_user(user_id)
-        current_user = get_jwt_identity()
+        current_user = current_identity()
         is_admin = current_user.get('is_admin')
         if not user:
             return {'error': 'User not found'}, 404
@@ -151,11 +160,11 @@ class UserResource(Resource):
 @api.response(404, 'Utilisateur non trouvé')
 class UserResource(Resource):
     @api.doc('get_user')
-    @api.marshal_with(user_model)
+    @api.response(200, 'Success', user_model)
     def get(self, user_id):
         """Récupère les informations d'un utilisateur spécifique."""
         user = User.query.get_or_404(user_id)
-        return user
+        return conditional_response(entity_tag(user), lambda: dumps(serialize_user(user)))
 
     @api.doc('update_user')
     @api.expect(user_update_input_model, validate=True) # Utilise le modèle d'entrée pour la mise à jour
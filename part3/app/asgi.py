@@ -0,0 +1,284 @@
+"""
+ASGI entry point: the place reads on asyncio, every other request on the Flask app.
+
+    uvicorn asgi:app --workers 4
+
+GET /api/v1/places/, /api/v1/places/<place_id> and
+/api/v1/reviews/places/<place_id>/reviews are answered by coroutines on
+an AsyncEngine (app/services/async_reads.py), so a worker keeps serving
+other connections while one of them waits on the database. They use the
+routing, reqparse parsers, SQL statements, compiled serializers and
+ETags of the sync handlers, and return the same bodies and status codes
+(except the URL suggestions flask-restx adds to a 404 message).
+
+Every other request (writes, auth, admin, docs, streamed reviews,
+requests profiled with X-HBnB-Profile) goes to the Flask app, which runs
+on a pool of ASGI_WSGI_THREADS threads as under a threaded WSGI server.
+The async handlers skip the shared payload cache, whose backends block.
+"""
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from urllib.parse import parse_qsl
+
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import parse_etags, quote_etag
+
+from app import create_app
+from app.api.v1.serializers import dumps
+from app.services.metrics import request_metrics
+from app.services.profiler import HEADER as PROFILE_HEADER
+
+
+def _environ(scope, body):
+    """WSGI environ of an ASGI http scope."""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': '',
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'REMOTE_ADDR': client[0],
+        'SERVER_PROTOCOL': 'HTTP/' + scope.get('http_version', '1.1'),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1')
+        if name == 'content-type':
+            key = 'CONTENT_TYPE'
+        elif name == 'content-length':
+            key = 'CONTENT_LENGTH'
+        else:
+            key = 'HTTP_' + name.upper().replace('-', '_')
+        value = value.decode('latin-1')
+        environ[key] = environ[key] + ',' + value if key in environ else value
+    return environ
+
+
+class WSGIBridge:
+    """Serves a WSGI app from ASGI, each request on a thread of a pool."""
+
+    def __init__(self, wsgi_app, threads):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(threads, thread_name_prefix='hbnb-wsgi')
+
+    async def __call__(self, scope, receive, send):
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self._run, _environ(scope, bytes(body)), loop, send)
+
+    def _run(self, environ, loop, send):
+        # Le thread envoie la réponse au fil de l'itération, comme un serveur WSGI
+        # (le contexte de stream_with_context reste dans ce thread)
+        def call(message):
+            asyncio.run_coroutine_threadsafe(send(message), loop).result()
+
+        response = {}
+
+        def write(data):
+            if not response.get('sent'):
+                call(response['start'])
+                response['sent'] = True
+            if data:
+                call({'type': 'http.response.body', 'body': data, 'more_body': True})
+
+        def start_response(status, headers, exc_info=None):
+            response['start'] = {
+                'type': 'http.response.start',
+                'status': int(status.split(' ', 1)[0]),
+                'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+            }
+            return write
+
+        chunks = self.wsgi_app(environ, start_response)
+        try:
+            for chunk in chunks:
+                write(chunk)
+            write(b'')
+            call({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+class _Request:
+    __slots__ = ('headers', 'args')
+
+    def __init__(self, scope):
+        self.headers = dict(scope['headers'])
+        self.args = MultiDict(parse_qsl(scope['query_string'].decode('utf-8', 'replace'), keep_blank_values=True))
+
+
+def _json(status, data):
+    return status, [(b'content-type', b'application/json')], dumps(data).encode()
+
+
+class HBnBASGI:
+    """ASGI app serving the place reads of a Flask app on asyncio, the rest on the Flask app itself."""
+
+    def __init__(self, flask_app, engine=None):
+        from app.api.v1.places import place_list_parser
+        from app.api.v1.reviews import place_reviews_parser
+        from app.persistence.engine import create_async_engine_from_config
+        from app.persistence.loading import place_load_options
+        from app.persistence.slow_queries import slow_query_log
+        from app.services.async_reads import AsyncReads
+
+        self.flask_app = flask_app
+        self.engine = engine if engine is not None else create_async_engine_from_config(flask_app.config)
+        self.metrics = flask_app.config.get('METRICS_ENABLED', True)
+        if self.metrics:
+            request_metrics.instrument_engine(self.engine.sync_engine)
+        if slow_query_log.enabled:
+            slow_query_log.instrument_engine(self.engine.sync_engine)
+        with flask_app.app_context():
+            self.reads = AsyncReads(self.engine, place_load_options('list'))
+        self.wsgi = WSGIBridge(flask_app, flask_app.config.get('ASGI_WSGI_THREADS', 8))
+        self.place_list_parser = place_list_parser
+        self.place_reviews_parser = place_reviews_parser
+
+        # Routage de Flask : mêmes règles, mêmes redirections (barre finale) que l'API synchrone
+        self.urls = flask_app.url_map.bind('localhost')
+        handlers = {
+            '/api/v1/places/': self._list_places,
+            '/api/v1/places/<string:place_id>': self._get_place,
+            '/api/v1/reviews/places/<place_id>/reviews': self._list_place_reviews,
+        }
+        self.handlers = {rule.endpoint: (rule.rule, handlers[rule.rule])
+                         for rule in flask_app.url_map.iter_rules() if rule.rule in handlers}
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] != 'http':
+            return
+        if scope['method'] == 'GET':
+            route = self._match(scope)
+            if route is not None:
+                return await self._serve(send, *route)
+        await self.wsgi(scope, receive, send)
+
+    def _match(self, scope):
+        if any(name == PROFILE_HEADER.lower().encode() for name, _ in scope['headers']):
+            return None
+        try:
+            endpoint, view_args = self.urls.match(scope['path'], method='GET')
+        except HTTPException:
+            return None
+        if endpoint not in self.handlers:
+            return None
+        rule, handler = self.handlers[endpoint]
+        request = _Request(scope)
+        if handler == self._list_place_reviews and 'stream' in request.args:
+            # Le flux chunked des reviews reste servi par Flask
+            return None
+        return request, rule, handler, view_args
+
+    async def _serve(self, send, request, rule, handler, view_args):
+        status = 500
+        if self.metrics:
+            request_metrics.begin()
+        try:
+            try:
+                status, headers, body = await handler(request, **view_args)
+            except HTTPException as e:
+                status, headers, body = _json(e.code, getattr(e, 'data', None) or {'message': e.description})
+        finally:
+            if self.metrics:
+                request_metrics.end('GET', rule, status)
+        headers.append((b'content-length', str(len(body)).encode()))
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+    def _args(self, parser, request):
+        # Parsers reqparse des handlers synchrones : mêmes valeurs par défaut et mêmes erreurs 400
+        with self.flask_app.app_context():
+            return parser.parse_args(req=SimpleNamespace(args=request.args))
+
+    def _conditional(self, request, etag, serialize):
+        """Same 304 / 200 with a weak ETag as app.api.v1.conditional_response."""
+        header = request.headers.get(b'if-none-match')
+        if header and parse_etags(header.decode('latin-1')).contains_weak(etag):
+            return 304, [(b'etag', quote_etag(etag, weak=True).encode())], b''
+        body = request_metrics.measure_serialization(serialize)
+        return 200, [(b'content-type', b'application/json'), (b'etag', quote_etag(etag, weak=True).encode())], body.encode()
+
+    async def _list_places(self, request):
+        from app.api.v1.places import place_page_payload, place_page_tag
+
+        args = self._args(self.place_list_parser, request)
+        amenity_ids = [a for a in (args['amenity_ids'] or '').split(',') if a]
+        try:
+            places, next_cursor, facets = await self.reads.search_places(
+                args['limit'], args['cursor'], args['sort'], args['min_price'], args['max_price'],
+                amenity_ids, args['min_rating'], args['facets'])
+        except ValueError as e:
+            return _json(400, {'message': str(e)})
+        return self._conditional(request, place_page_tag(places, next_cursor, facets),
+                                 lambda: place_page_payload(places, next_cursor, facets))
+
+    async def _get_place(self, request, place_id):
+        from app.api.v1.places import place_payload
+
+        place = await self.reads.get_place(place_id)
+        if place is None:
+            return _json(404, {'message': "Lieu non trouvé"})
+        etag, payload = place_payload(place)
+        return self._conditional(request, etag, lambda: payload)
+
+    async def _list_place_reviews(self, request, place_id):
+        from app.api.v1.reviews import review_page_payload, review_page_tag
+
+        args = self._args(self.place_reviews_parser, request)
+        try:
+            page = await self.reads.get_reviews_by_place(place_id, args['limit'], args['cursor'])
+        except ValueError as e:
+            return _json(400, {'error': str(e)})
+        if page is None:
+            return _json(404, {'error': 'Place not found'})
+        reviews, next_cursor = page
+        return self._conditional(request, review_page_tag(reviews, next_cursor),
+                                 lambda: review_page_payload(reviews, next_cursor))
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                self.wsgi.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def close(self):
+        """Release the async engine and the WSGI threads (what lifespan.shutdown does)."""
+        await self.engine.dispose()
+        self.wsgi.close()
+
+
+def create_asgi_app(config_class="config.DevelopmentConfig"):
+    """The app of create_app(config_class) behind HBnBASGI."""
+    return HBnBASGI(create_app(config_class))
@@ -0,0 +1,61 @@
+import click
+
+
+def register_commands(app):
+    """Add the maintenance commands to `flask` (run with FLASK_APP=run.py)."""
+
+    @app.cli.command('db-upgrade')
+    @click.option('--to', 'target', type=int, help='Stop at this version.')
+    def db_upgrade(target):
+        """Apply the pending schema migrations (app/migrations)."""
+        from app import db
+        from app import migrations
+
+        applied = migrations.upgrade(db.engine, target, echo=click.echo)
+        click.echo(f"Database schema at version {migrations.current_version(db.engine)} "
+                   f"({len(applied)} migration(s) applied).")
+
+    @app.cli.command('init-db')
+    @click.pass_context
+    def init_db(ctx):
+        """Create the schema of a new database (same as db-upgrade)."""
+        ctx.invoke(db_upgrade)
+
+    @app.cli.command('check-schema')
+    @click.option('--sql', 'sql_path', type=click.Path(exists=True, dir_okay=False),
+                  help='SQL schema to compare with (default: part4/sql/schema.sql).')
+    def check_schema(sql_path):
+        """Check that the models and the SQL schema define the same tables, columns and indexes."""
+        from app import db
+        from app.migrations import schema_check
+
+        with open(sql_path or schema_check.SQL_SCHEMA_PATH) as f:
+            problems = schema_check.compare(db.metadata, f.read())
+        for problem in problems:
+            click.echo(problem)
+        if problems:
+            raise click.exceptions.Exit(1)
+        click.echo("Models and SQL schema agree.")
+
+    @app.cli.command('create-admin')
+    @click.option('--email', default='admin@root.com', show_default=True)
+    @click.option('--first-name', default='Admin', show_default=True)
+    @click.option('--last-name', default='root', show_default=True)
+    @click.password_option(help='Prompted for when not given.')
+    def create_admin(email, first_name, last_name, password):
+        """Create the administrator account if the email is not taken."""
+        from app.models.user import create_first_admin
+
+        _, created = create_first_admin(password, email, first_name, last_name)
+        click.echo(f"Admin {email} created." if created else f"{email} already exists, nothing done.")
+
+    @app.cli.command('rebuild-rating-stats')
+    def rebuild_rating_stats():
+        """Recompute the per-place rating aggregates from the reviews."""
+        from app.services import facade
+
+        repo = facade.rating_stats_repo
+        before = {stats.place_id for stats in repo.get_all()}
+        count = repo.rebuild()
+        facade.invalidate('place', *(before | {stats.place_id for stats in repo.get_all()}))
+        click.echo(f"Rating aggregates rebuilt for {count} place(s).")
@@ -0,0 +1,154 @@
+"""
+Versioned schema migrations.
+
+Each module vNNNN_<name>.py of this package is one migration: it defines
+upgrade(op) and, when it builds indexes on live tables, TRANSACTIONAL =
+False so PostgreSQL can run CREATE INDEX CONCURRENTLY outside a
+transaction. The applied versions are recorded in the schema_version
+table. Run them with `flask db-upgrade`.
+"""
+import importlib
+import pkgutil
+import re
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+
+_MODULE = re.compile(r'^v(\d{4})_(\w+)$')
+
+version_metadata = MetaData()
+schema_version = Table(
+    'schema_version', version_metadata,
+    Column('version', Integer, primary_key=True),
+    Column('name', String(128), nullable=False),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+
+class Migration:
+    def __init__(self, version, name, module):
+        self.version = version
+        self.name = name
+        self.module = module
+
+    @property
+    def transactional(self):
+        return getattr(self.module, 'TRANSACTIONAL', True)
+
+    def __repr__(self):
+        return f"<Migration {self.version:04d} {self.name}>"
+
+
+def load_migrations():
+    """Every migration of the package, in version order."""
+    migrations = []
+    for info in pkgutil.iter_modules(__path__):
+        match = _MODULE.match(info.name)
+        if match:
+            module = importlib.import_module(f'{__name__}.{info.name}')
+            migrations.append(Migration(int(match.group(1)), match.group(2), module))
+    migrations.sort(key=lambda migration: migration.version)
+    versions = [migration.version for migration in migrations]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError("Two migrations share the same version number")
+    return migrations
+
+
+class Operations:
+    """What a migration's upgrade(op) works with: the connection plus online-aware DDL helpers."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.dialect = connection.dialect
+
+    def execute(self, statement, parameters=None):
+        if isinstance(statement, str):
+            statement = text(statement)
+        return self.connection.execute(statement, parameters or {})
+
+    def quote(self, name):
+        return self.dialect.identifier_preparer.quote(name)
+
+    def has_table(self, table):
+        return inspect(self.connection).has_table(table)
+
+    def has_column(self, table, column):
+        return any(info['name'] == column for info in inspect(self.connection).get_columns(table))
+
+    def add_column(self, table, column, type_sql):
+        if not self.has_column(table, column):
+            self.execute(f"ALTER TABLE {self.quote(table)} ADD COLUMN {self.quote(column)} {type_sql}")
+
+    def create_tables(self, metadata, names):
+        metadata.create_all(self.connection, tables=[metadata.tables[name] for name in names], checkfirst=True)
+
+    def create_index(self, name, table, columns, unique=False):
+        """
+        Build an index without blocking writes where the backend allows it.
+
+        PostgreSQL: CREATE INDEX CONCURRENTLY (the migration must not be
+        transactional); an invalid index left by an interrupted build is
+        dropped and rebuilt. MySQL: ALGORITHM=INPLACE, LOCK=NONE. SQLite
+        and others: a plain CREATE INDEX. Existing indexes are kept.
+        """
+        unique_sql = 'UNIQUE ' if unique else ''
+        target = f"{self.quote(table)} ({', '.join(self.quote(column) for column in columns)})"
+        backend = self.dialect.name
+        if backend == 'postgresql':
+            invalid = self.execute(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid", {'name': name}).first()
+            if invalid:
+                self.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {self.quote(name)}")
+            self.execute(f"CREATE {unique_sql}INDEX CONCURRENTLY IF NOT EXISTS {self.quote(name)} ON {target}")
+        elif backend == 'sqlite':
+            self.execute(f"CREATE {unique_sql}INDEX IF NOT EXISTS {self.quote(name)} ON {target}")
+        elif any(index['name'] == name for index in inspect(self.connection).get_indexes(table)):
+            return
+        elif backend in ('mysql', 'mariadb'):
+            self.execute(f"CREATE {unique_sql}INDEX {self.quote(name)} ON {target} ALGORITHM=INPLACE LOCK=NONE")
+        else:
+            self.execute(f"CREATE {unique_sql}INDEX {self.quote(name)} ON {target}")
+
+
+def current_version(engine):
+    """Highest applied version, 0 on a database never migrated."""
+    with engine.connect() as connection:
+        if not inspect(connection).has_table(schema_version.name):
+            return 0
+        return connection.execute(select(schema_version.c.version).order_by(
+            schema_version.c.version.desc()).limit(1)).scalar() or 0
+
+
+def upgrade(engine, target=None, echo=None):
+    """Apply the pending migrations up to target (all by default). Returns the applied ones."""
+    version_metadata.create_all(engine, checkfirst=True)
+    current = current_version(engine)
+    applied = []
+    for migration in load_migrations():
+        if migration.version <= current or (target is not None and migration.version > target):
+            continue
+        if echo is not None:
+            echo(f"Applying {migration.version:04d} {migration.name}...")
+        if migration.transactional:
+            with engine.begin() as connection:
+                migration.module.upgrade(Operations(connection))
+                _record(connection, migration)
+        else:
+            # Index construits en ligne : chaque instruction est validée aussitôt
+            with engine.connect() as connection:
+                if engine.dialect.name == 'postgresql':
+                    connection = connection.execution_options(isolation_level='AUTOCOMMIT')
+                migration.module.upgrade(Operations(connection))
+                if connection.in_transaction():
+                    connection.commit()
+            with engine.begin() as connection:
+                _record(connection, migration)
+        applied.append(migration)
+    return applied
+
+
+def _record(connection, migration):
+    connection.execute(schema_version.insert().values(
+        version=migration.version, name=migration.name,
+        applied_at=datetime.now(timezone.utc).replace(tzinfo=None)))
@@ -0,0 +1,110 @@
+"""Compare the SQLAlchemy models with the hand-written SQL schema of part4."""
+import os
+import re
+
+from sqlalchemy import UniqueConstraint
+
+SQL_SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'part4', 'sql', 'schema.sql')
+# Les scripts SQL de part4 nomment les tables au pluriel
+SQL_TABLE_NAMES = {'user': 'users', 'place': 'places', 'review': 'reviews'}
+
+_CREATE_TABLE = re.compile(r'CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?\s*\((.*?)\)\s*;', re.I | re.S)
+_CREATE_INDEX = re.compile(r'CREATE\s+(UNIQUE\s+)?INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?\w+\s+ON\s+`?(\w+)`?\s*\(([^)]*)\)', re.I)
+_COLUMNS = re.compile(r'\(([^)]*)\)')
+
+
+class TableShape:
+    """Columns, foreign-key columns and index column lists of one table."""
+
+    def __init__(self):
+        self.columns = set()
+        self.foreign_keys = set()
+        self.indexes = set()
+
+    def unindexed_foreign_keys(self):
+        return sorted(column for column in self.foreign_keys
+                      if not any(index[0] == column for index in self.indexes))
+
+
+def _names(group):
+    return tuple(name.strip().strip('`"') for name in group.split(','))
+
+
+def _split_items(body):
+    items, depth, current = [], 0, ''
+    for char in body:
+        depth += char == '('
+        depth -= char == ')'
+        if char == ',' and depth == 0:
+            items.append(current.strip())
+            current = ''
+        else:
+            current += char
+    if current.strip():
+        items.append(current.strip())
+    return items
+
+
+def sql_shapes(sql):
+    """{table: TableShape} parsed from CREATE TABLE / CREATE INDEX statements."""
+    sql = re.sub(r'--[^\n]*', '', sql)
+    shapes = {}
+    for name, body in _CREATE_TABLE.findall(sql):
+        shape = shapes.setdefault(name, TableShape())
+        for item in _split_items(body):
+            keyword = item.split()[0].upper()
+            columns = _COLUMNS.search(item)
+            if re.search(r'\bFOREIGN\s+KEY\b', item, re.I):
+                shape.foreign_keys.add(_names(columns.group(1))[0])
+            elif keyword in ('PRIMARY', 'INDEX', 'KEY', 'UNIQUE', 'CONSTRAINT'):
+                if not re.search(r'\bCHECK\b', item, re.I):
+                    shape.indexes.add(_names(columns.group(1)))
+            elif keyword != 'CHECK':
+                column = item.split()[0].strip('`"')
+                shape.columns.add(column)
+                if re.search(r'\b(PRIMARY\s+KEY|UNIQUE)\b', item, re.I):
+                    shape.indexes.add((column,))
+    for unique, table, columns in _CREATE_INDEX.findall(sql):
+        shapes.setdefault(table, TableShape()).indexes.add(_names(columns))
+    return shapes
+
+
+def model_shapes(metadata):
+    """{table: TableShape} of the mapped tables, under their SQL schema names."""
+    shapes = {}
+    for table in metadata.sorted_tables:
+        shape = shapes[SQL_TABLE_NAMES.get(table.name, table.name)] = TableShape()
+        shape.columns = {column.name for column in table.columns}
+        shape.foreign_keys = {fk.parent.name for fk in table.foreign_keys}
+        shape.indexes = {tuple(column.name for column in index.columns) for index in table.indexes}
+        shape.indexes.add(tuple(column.name for column in table.primary_key.columns))
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint):
+                shape.indexes.add(tuple(column.name for column in constraint.columns))
+        shape.indexes.update((column.name,) for column in table.columns if column.unique)
+    return shapes
+
+
+def compare(metadata, sql):
+    """Differences between the models and the SQL schema, as readable lines (empty when they agree)."""
+    models, schema = model_shapes(metadata), sql_shapes(sql)
+    problems = []
+    for table in sorted(models.keys() | schema.keys()):
+        if table not in schema:
+            problems.append(f"{table}: missing from the SQL schema")
+            continue
+        if table not in models:
+            problems.append(f"{table}: no model for this SQL table")
+            continue
+        model, script = models[table], schema[table]
+        for label, attribute in (('columns', 'columns'), ('foreign keys', 'foreign_keys'), ('indexes', 'indexes')):
+            only_model = getattr(model, attribute) - getattr(script, attribute)
+            only_sql = getattr(script, attribute) - getattr(model, attribute)
+            if only_model:
+                problems.append(f"{table}: {label} only in the models: {sorted(only_model)}")
+            if only_sql:
+                problems.append(f"{table}: {label} only in the SQL schema: {sorted(only_sql)}")
+        for side, shape in (('models', model), ('SQL schema', script)):
+            for column in shape.unindexed_foreign_keys():
+                problems.append(f"{table}: foreign key {column} has no index in the {side}")
+    return problems
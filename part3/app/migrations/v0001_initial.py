@@ -0,0 +1,51 @@
+"""Tables of the first release: users, amenities, cities, places, their amenities, reviews."""
+from sqlalchemy import (Boolean, Column, DateTime, Float, ForeignKey, Integer, MetaData, String, Table, Text,
+                        UniqueConstraint)
+
+# Schéma figé de la version 1 : les modèles peuvent évoluer, cette migration non
+metadata = MetaData()
+
+
+def _entity(name, *columns):
+    return Table(
+        name, metadata,
+        Column('id', String(36), primary_key=True),
+        Column('created_at', DateTime),
+        Column('updated_at', DateTime),
+        *columns,
+    )
+
+
+_entity('user',
+        Column('first_name', String(255), nullable=False),
+        Column('last_name', String(255), nullable=False),
+        Column('email', String(255), nullable=False, unique=True),
+        Column('password', String(255), nullable=False),
+        Column('is_admin', Boolean))
+_entity('amenities',
+        Column('name', String(50), nullable=False))
+_entity('cities',
+        Column('name', String(128), nullable=False))
+_entity('place',
+        Column('title', String(255), nullable=False),
+        Column('description', Text),
+        Column('price', Float, nullable=False),
+        Column('latitude', Float, nullable=False),
+        Column('longitude', Float, nullable=False),
+        Column('owner_id', String(36), ForeignKey('user.id'), nullable=False))
+Table('place_amenity', metadata,
+      Column('place_id', String(36), ForeignKey('place.id'), primary_key=True),
+      Column('amenity_id', String(36), ForeignKey('amenities.id'), primary_key=True))
+_entity('review',
+        Column('text', Text, nullable=False),
+        Column('rating', Integer, nullable=False),
+        Column('user_id', String(36), ForeignKey('user.id'), nullable=False),
+        Column('place_id', String(36), ForeignKey('place.id'), nullable=False),
+        UniqueConstraint('user_id', 'place_id', name='uq_user_place_review'))
+
+TABLES = ('user', 'amenities', 'cities', 'place', 'place_amenity', 'review')
+
+
+def upgrade(op):
+    # Sans effet sur une base déjà créée par db.create_all()
+    op.create_tables(metadata, TABLES)
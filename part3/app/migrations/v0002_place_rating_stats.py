@@ -0,0 +1,29 @@
+"""Per-place rating aggregates, filled from the existing reviews."""
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, String, Table, case, func, insert, select
+from sqlalchemy.sql import column, table
+
+metadata = MetaData()
+# Cible de la clé étrangère, créée par la version 1
+Table('place', metadata, Column('id', String(36), primary_key=True))
+stats = Table(
+    'place_rating_stats', metadata,
+    Column('place_id', String(36), ForeignKey('place.id', ondelete='CASCADE'), primary_key=True),
+    Column('review_count', Integer, nullable=False),
+    Column('rating_sum', Integer, nullable=False),
+    *(Column(f'rating_{rating}', Integer, nullable=False) for rating in range(1, 6)),
+)
+review = table('review', column('place_id'), column('rating'))
+
+
+def upgrade(op):
+    op.create_tables(metadata, ['place_rating_stats'])
+    aggregates = select(
+        review.c.place_id,
+        func.count(),
+        func.sum(review.c.rating),
+        *(func.sum(case((review.c.rating == rating, 1), else_=0)) for rating in range(1, 6))
+    ).group_by(review.c.place_id)
+    op.execute(stats.delete())
+    op.execute(insert(stats).from_select(
+        ['place_id', 'review_count', 'rating_sum'] + [f'rating_{rating}' for rating in range(1, 6)],
+        aggregates))
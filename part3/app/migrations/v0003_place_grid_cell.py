@@ -0,0 +1,21 @@
+"""Geographic grid cell of the places (radius and bounding-box search), backfilled."""
+from sqlalchemy import bindparam, select
+from sqlalchemy.sql import column, table
+
+from app.persistence.geo import grid_cell
+
+BATCH_SIZE = 5000
+
+place = table('place', column('id'), column('latitude'), column('longitude'), column('grid_cell'))
+
+
+def upgrade(op):
+    op.add_column('place', 'grid_cell', 'INTEGER')
+    update = place.update().where(place.c.id == bindparam('place_id')).values(grid_cell=bindparam('cell'))
+    while True:
+        rows = op.execute(select(place.c.id, place.c.latitude, place.c.longitude)
+                          .where(place.c.grid_cell.is_(None)).limit(BATCH_SIZE)).all()
+        if not rows:
+            break
+        op.connection.execute(update, [{'place_id': place_id, 'cell': grid_cell(latitude, longitude)}
+                                       for place_id, latitude, longitude in rows])
@@ -0,0 +1,22 @@
+"""
+Indexes of the foreign-key lookups, listings and searches, built online.
+
+place_amenity.amenity_id and review.place_id lead a composite index;
+review.user_id leads the uq_user_place_review constraint.
+"""
+TRANSACTIONAL = False
+
+INDEXES = (
+    ('ix_place_owner_id', 'place', ('owner_id',)),
+    ('ix_place_created_at_id', 'place', ('created_at', 'id')),
+    ('ix_place_price_created_at_id', 'place', ('price', 'created_at', 'id')),
+    ('ix_place_grid_cell', 'place', ('grid_cell',)),
+    ('ix_place_amenity_amenity_id', 'place_amenity', ('amenity_id', 'place_id')),
+    ('ix_review_place_id_rating', 'review', ('place_id', 'rating')),
+    ('ix_review_place_id_created_at_id', 'review', ('place_id', 'created_at', 'id')),
+)
+
+
+def upgrade(op):
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
@@ -1,35 +1,3 @@
-import uuid
-from datetime import datetime
-from app.models.__init__ import db
-
-
-class Amenity(db.Model):
-
-    __tablename__ = 'amenities'
-
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    name = db.Column(db.String(50), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-
-    def __init__(self, name):
-        if not name or len(name) > 50:
-            raise ValueError("Amenity name is required and must be at most 50 characters long.")
-        self.name = name
-        self.id = str(uuid.uuid4())
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
-
-    def save(self):
-        self.updated_at = datetime.now()
-
-    def dict(self):
-        return {
-            "id": self.id,
-            "name": self.name,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat()
-
 from app.models.base_model import BaseModel
 from app import db
 from sqlalchemy.orm import validates 
@@ -1,14 +1,6 @@
 from app import db
 import uuid
 from datetime import datetime
-
-class BaseModel:
-    def __init__(self):
-        __abstract__ = True
-
-        id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-        created_at = db.Column(db.DateTime, default=datetime.utcnow)
-        updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 from abc import abstractmethod
 
 class BaseModel(db.Model):
@@ -0,0 +1,32 @@
+from app import db
+
+
+class PlaceRatingStats(db.Model):
+    """Review count, rating sum and 1-5 histogram of a place, kept up to date on review writes."""
+    __tablename__ = 'place_rating_stats'
+
+    place_id = db.Column(db.String(36), db.ForeignKey('place.id', ondelete='CASCADE'), primary_key=True)
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    rating_1 = db.Column(db.Integer, nullable=False, default=0)
+    rating_2 = db.Column(db.Integer, nullable=False, default=0)
+    rating_3 = db.Column(db.Integer, nullable=False, default=0)
+    rating_4 = db.Column(db.Integer, nullable=False, default=0)
+    rating_5 = db.Column(db.Integer, nullable=False, default=0)
+
+    @property
+    def average(self):
+        if not self.review_count:
+            return None
+        return self.rating_sum / self.review_count
+
+    @property
+    def histogram(self):
+        return {rating: getattr(self, f'rating_{rating}') for rating in range(1, 6)}
+
+    def to_dict(self):
+        return {
+            'count': self.review_count,
+            'average': self.average,
+            'histogram': self.histogram
+        }
@@ -0,0 +1,335 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """Bounded least-recently-used cache with an optional time-to-live (seconds)."""
+
+    def __init__(self, maxsize=1024, ttl=None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Incrémenté par chaque delete/clear : un remplissage lu avant une invalidation est refusé
+        self._generation = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def generation(self):
+        """Invalidation counter to read before loading a value for set(..., generation=)."""
+        with self._lock:
+            return self._generation
+
+    def set(self, key, value, generation=None):
+        """Store value; with generation, only if nothing was deleted since it was read."""
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+            self._generation += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+            }
+
+
+class CacheBackendError(Exception):
+    """Error reply sent back by a cache server."""
+
+
+class CacheBackend(ABC):
+    """
+    Store of serialized payloads (str) shared by the facade.
+
+    delete() is an invalidation: it drops the keys and notifies every
+    subscriber, so per-process caches in front of the same rows can be
+    dropped as well.
+    """
+
+    @abstractmethod
+    def get(self, key):
+        pass
+
+    @abstractmethod
+    def set(self, key, value):
+        pass
+
+    @abstractmethod
+    def delete(self, *keys):
+        pass
+
+    @abstractmethod
+    def subscribe(self, callback):
+        """Call callback(keys) on every invalidation (once, however often it is subscribed)."""
+        pass
+
+    @abstractmethod
+    def unsubscribe(self, callback):
+        pass
+
+
+class InProcessCacheBackend(CacheBackend):
+    """Cache backend living in the worker process (single worker, tests)."""
+
+    def __init__(self, maxsize=4096, ttl=None):
+        self._cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._subscribers = []
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value):
+        self._cache.set(key, value)
+
+    def delete(self, *keys):
+        for key in keys:
+            self._cache.delete(key)
+        for callback in self._subscribers:
+            callback(list(keys))
+
+    def subscribe(self, callback):
+        if callback not in self._subscribers:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def stats(self):
+        return self._cache.stats()
+
+
+def _encode_command(args):
+    out = [b'*%d\r\n' % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode('utf-8')
+        out.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+    return b''.join(out)
+
+
+def _read_reply(reader):
+    line = reader.readline()
+    if not line.endswith(b'\r\n'):
+        raise ConnectionError("Cache server closed the connection")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b'+':
+        return rest.decode('utf-8')
+    if kind == b'-':
+        raise CacheBackendError(rest.decode('utf-8'))
+    if kind == b':':
+        return int(rest)
+    if kind == b'$':
+        length = int(rest)
+        if length < 0:
+            return None
+        return reader.read(length + 2)[:-2]
+    if kind == b'*':
+        length = int(rest)
+        if length < 0:
+            return None
+        return [_read_reply(reader) for _ in range(length)]
+    raise ConnectionError(f"Unexpected reply from cache server: {line!r}")
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache shared by every worker, spoken to over the Redis protocol (RESP).
+
+    Invalidations DEL the keys and PUBLISH them on `channel`; each process
+    listens on that channel from a daemon thread. A cache server that is
+    down only costs cache misses.
+    """
+
+    def __init__(self, host='localhost', port=6379, db=0, password=None,
+                 ttl=300, channel='hbnb:invalidate', key_prefix='hbnb:', timeout=0.5):
+        self.address = (host, port)
+        self.db = db
+        self.password = password
+        self.ttl = ttl
+        self.channel = channel
+        self.key_prefix = key_prefix
+        self.timeout = timeout
+        self._conn = None
+        self._lock = threading.Lock()
+        self._subscribers = []
+        # Connexion SUBSCRIBE de chaque abonné, fermée par unsubscribe pour arrêter son thread
+        self._listeners = {}
+        self._pid = os.getpid()
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        """Build the backend from a redis://[:password@]host[:port][/db] URL."""
+        parts = urlparse(url)
+        db = int(parts.path.lstrip('/') or 0)
+        return cls(parts.hostname or 'localhost', parts.port or 6379, db, parts.password, **kwargs)
+
+    def _connect(self, timeout):
+        sock = socket.create_connection(self.address, timeout=self.timeout)
+        sock.settimeout(timeout)
+        conn = (sock, sock.makefile('rb'))
+        if self.password:
+            self._call(conn, 'AUTH', self.password)
+        if self.db:
+            self._call(conn, 'SELECT', self.db)
+        return conn
+
+    @staticmethod
+    def _call(conn, *args):
+        sock, reader = conn
+        sock.sendall(_encode_command(args))
+        return _read_reply(reader)
+
+    def _close(self):
+        if self._conn is not None:
+            try:
+                self._conn[0].close()
+            except OSError:
+                pass
+            self._conn = None
+
+    def _check_fork(self):
+        # Un worker forké ne doit ni partager la socket du parent ni perdre les abonnements
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            self._conn = None
+            self._lock = threading.Lock()
+            self._listeners = {}
+            for callback in self._subscribers:
+                self._start_listener(callback)
+
+    def _execute(self, *args):
+        self._check_fork()
+        with self._lock:
+            try:
+                if self._conn is None:
+                    self._conn = self._connect(self.timeout)
+                return self._call(self._conn, *args)
+            except (OSError, CacheBackendError) as e:
+                logger.warning("Cache backend %s:%s unavailable: %s", *self.address, e)
+                self._close()
+                return None
+
+    def get(self, key):
+        value = self._execute('GET', self.key_prefix + key)
+        return value.decode('utf-8') if value is not None else None
+
+    def set(self, key, value):
+        if self.ttl:
+            self._execute('SET', self.key_prefix + key, value, 'EX', self.ttl)
+        else:
+            self._execute('SET', self.key_prefix + key, value)
+
+    def delete(self, *keys):
+        if not keys:
+            return
+        self._execute('DEL', *(self.key_prefix + key for key in keys))
+        self._execute('PUBLISH', self.channel, json.dumps(list(keys)))
+
+    def subscribe(self, callback):
+        if callback in self._subscribers:
+            return
+        self._subscribers.append(callback)
+        self._start_listener(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+        conn = self._listeners.pop(callback, None)
+        if conn is not None:
+            try:
+                conn[0].shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _start_listener(self, callback):
+        thread = threading.Thread(target=self._listen, args=(callback,), daemon=True,
+                                  name='hbnb-cache-invalidations')
+        thread.start()
+
+    def _listen(self, callback):
+        pid = os.getpid()
+        while os.getpid() == pid and callback in self._subscribers:
+            conn = None
+            try:
+                conn = self._connect(None)
+                self._listeners[callback] = conn
+                if callback not in self._subscribers:
+                    break
+                self._call(conn, 'SUBSCRIBE', self.channel)
+                while True:
+                    message = _read_reply(conn[1])
+                    if message and message[0] == b'message':
+                        try:
+                            callback(json.loads(message[2]))
+                        except Exception:
+                            logger.exception("Cache invalidation callback failed")
+            except (OSError, CacheBackendError, ValueError) as e:
+                if callback not in self._subscribers:
+                    break
+                logger.warning("Cache invalidation listener reconnecting: %s", e)
+                time.sleep(1.0)
+            finally:
+                if conn is not None:
+                    conn[0].close()
+        self._listeners.pop(callback, None)
+
+
+def cache_backend_from_url(url, ttl=None):
+    """Backend for the CACHE_BACKEND_URL setting: None, memory:// or redis://..."""
+    if not url:
+        return None
+    scheme = urlparse(url).scheme
+    if scheme == 'memory':
+        return InProcessCacheBackend(ttl=ttl)
+    if scheme == 'redis':
+        return RedisCacheBackend.from_url(url, ttl=ttl)
+    raise ValueError(f"Unsupported cache backend URL: {url}")
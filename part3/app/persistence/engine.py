@@ -0,0 +1,187 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.persistence import unit_of_work
+
+
+class PoolMetrics:
+    """Counters of the connection pools: checkouts, time spent waiting for one, timeouts."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.wait_seconds = 0.0
+            self.max_wait_seconds = 0.0
+            self.timeouts = 0
+            self.connects = 0
+            self.invalidations = 0
+
+    def observe_wait(self, seconds):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def observe_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def observe_connect(self):
+        with self._lock:
+            self.connects += 1
+
+    def observe_invalidation(self):
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self, engine=None):
+        with self._lock:
+            stats = {
+                'checkouts': self.checkouts,
+                'checkout_wait_ms_total': round(self.wait_seconds * 1000, 3),
+                'checkout_wait_ms_max': round(self.max_wait_seconds * 1000, 3),
+                'checkout_timeouts': self.timeouts,
+                'connects': self.connects,
+                'invalidations': self.invalidations,
+            }
+        pool = getattr(engine, 'pool', None)
+        if isinstance(pool, QueuePool):
+            stats.update({'pool_size': pool.size(), 'checked_out': pool.checkedout(),
+                          'overflow': max(pool.overflow(), 0), 'idle': pool.checkedin()})
+        return stats
+
+
+pool_metrics = PoolMetrics()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeout:
+            pool_metrics.observe_timeout()
+            raise
+        pool_metrics.observe_wait(time.perf_counter() - start)
+        return connection
+
+
+class TimedAsyncQueuePool(TimedQueuePool, AsyncAdaptedQueuePool):
+    """TimedQueuePool for the async engine of the ASGI reads (app/asgi.py)."""
+
+
+# Pilote asyncio de chaque base pour le moteur async
+ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite', 'postgresql': 'postgresql+asyncpg'}
+
+
+def _is_memory_sqlite(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def engine_options(config):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for the configured database.
+
+    Adds the pool profile (DB_POOL_* keys) to the options set by hand,
+    except for in-memory SQLite which always runs on a single connection.
+    """
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if _is_memory_sqlite(url):
+        return options
+    options.setdefault('poolclass', TimedQueuePool)
+    for key, value in _pool_profile(config).items():
+        options.setdefault(key, value)
+    return options
+
+
+def _pool_profile(config):
+    return {
+        'pool_size': config.get('DB_POOL_SIZE', 5),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', -1),
+        'pool_pre_ping': config.get('DB_POOL_PRE_PING', False),
+    }
+
+
+def async_database_url(config):
+    """
+    URL of the async engine: ASYNC_DATABASE_URI, or SQLALCHEMY_DATABASE_URI
+    with the asyncio driver of its database (aiosqlite, asyncpg).
+    """
+    url = make_url(config.get('ASYNC_DATABASE_URI') or config['SQLALCHEMY_DATABASE_URI'])
+    if url.get_driver_name() in ('aiosqlite', 'asyncpg'):
+        return url
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver known for {backend}, set ASYNC_DATABASE_URI")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def create_async_engine_from_config(config):
+    """
+    AsyncEngine on the database of the app, with the same pool profile and
+    per-connection settings (configure_engine) as the sync engine.
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = async_database_url(config)
+    if _is_memory_sqlite(url):
+        # Une base en mémoire n'existe que dans la connexion du moteur synchrone
+        raise ValueError("The async engine needs a database file or server, not in-memory SQLite")
+    engine = create_async_engine(url, poolclass=TimedAsyncQueuePool, **_pool_profile(config))
+    configure_engine(engine.sync_engine, config)
+    return engine
+
+
+def configure_engine(engine, config):
+    """Install the per-connection settings and the pool counters on engine."""
+    unit_of_work.configure_engine(engine)
+    if event.contains(engine, 'connect', pool_metrics_connect):
+        return
+    event.listen(engine, 'connect', pool_metrics_connect)
+    event.listen(engine, 'invalidate', pool_metrics_invalidate)
+    backend = engine.dialect.name
+    if backend == 'sqlite' and config.get('SQLITE_PRAGMAS'):
+        pragmas = list(config['SQLITE_PRAGMAS'].items())
+        if _is_memory_sqlite(engine.url):
+            # Pas de journal WAL ni de mmap pour une base en mémoire
+            pragmas = [(name, value) for name, value in pragmas if name not in ('journal_mode', 'mmap_size')]
+        event.listen(engine, 'connect', lambda dbapi_connection, record: _run(
+            dbapi_connection, ['PRAGMA {}={}'.format(name, value) for name, value in pragmas]))
+    timeout = config.get('DB_STATEMENT_TIMEOUT_MS')
+    if backend == 'postgresql' and timeout:
+        event.listen(engine, 'connect', lambda dbapi_connection, record: _run(
+            dbapi_connection, ['SET statement_timeout = {:d}'.format(int(timeout))], commit=True))
+
+
+def pool_metrics_connect(dbapi_connection, connection_record):
+    pool_metrics.observe_connect()
+
+
+def pool_metrics_invalidate(dbapi_connection, connection_record, exception):
+    pool_metrics.observe_invalidation()
+
+
+def _run(dbapi_connection, statements, commit=False):
+    cursor = dbapi_connection.cursor()
+    try:
+        for statement in statements:
+            cursor.execute(statement)
+    finally:
+        cursor.close()
+    if commit:
+        # Le SET ouvre une transaction côté psycopg : la valeur doit survivre au rollback du pool
+        dbapi_connection.commit()
@@ -0,0 +1,83 @@
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+# Places are bucketed in a fixed grid of 0.1° x 0.1° cells (~11 km at the equator)
+GRID_CELL_DEGREES = 0.1
+GRID_ROWS = int(round(180 / GRID_CELL_DEGREES))
+GRID_COLUMNS = int(round(360 / GRID_CELL_DEGREES))
+MAX_SEARCH_RADIUS_KM = 500
+# Past this many cell ranges a box is searched as one range of rows (SQLite caps expression depth at 1000)
+MAX_CELL_RANGES = 100
+
+
+def check_coordinates(latitude, longitude):
+    if not -90.0 <= latitude <= 90.0:
+        raise ValueError("latitude must be within the range of -90.0 to 90.0")
+    if not -180.0 <= longitude <= 180.0:
+        raise ValueError("longitude must be within the range of -180.0 to 180.0")
+
+
+def _grid_row(latitude):
+    return min(int((latitude + 90.0) / GRID_CELL_DEGREES), GRID_ROWS - 1)
+
+
+def _grid_column(longitude):
+    return min(int((longitude + 180.0) / GRID_CELL_DEGREES), GRID_COLUMNS - 1)
+
+
+def grid_cell(latitude, longitude):
+    """Index of the grid cell containing the point, row-major from (-90, -180)."""
+    return _grid_row(latitude) * GRID_COLUMNS + _grid_column(longitude)
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points, in kilometers."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    (min_lat, min_lng, max_lat, max_lng) enclosing the circle.
+
+    min_lng > max_lng when the box crosses the antimeridian; a box reaching
+    a pole spans every longitude.
+    """
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = latitude - dlat, latitude + dlat
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return max(min_lat, -90.0), -180.0, min(max_lat, 90.0), 180.0
+    dlng = math.degrees(math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(latitude)))))
+    if dlng >= 180.0:
+        return min_lat, -180.0, max_lat, 180.0
+    min_lng, max_lng = longitude - dlng, longitude + dlng
+    if min_lng < -180.0:
+        min_lng += 360.0
+    if max_lng > 180.0:
+        max_lng -= 360.0
+    return min_lat, min_lng, max_lat, max_lng
+
+
+def cell_ranges(min_lat, min_lng, max_lat, max_lng):
+    """
+    Contiguous [first, last] grid cell ranges covering the box.
+
+    One range per grid row (two when crossing the antimeridian); adjacent
+    ranges are merged, so full-width rows collapse into a single range.
+    """
+    if min_lng <= max_lng:
+        columns = [(_grid_column(min_lng), _grid_column(max_lng))]
+    else:
+        columns = [(_grid_column(min_lng), GRID_COLUMNS - 1), (0, _grid_column(max_lng))]
+    ranges = []
+    for row in range(_grid_row(min_lat), _grid_row(max_lat) + 1):
+        for first, last in sorted(columns):
+            start, end = row * GRID_COLUMNS + first, row * GRID_COLUMNS + last
+            if ranges and ranges[-1][1] + 1 >= start:
+                ranges[-1] = (ranges[-1][0], max(ranges[-1][1], end))
+            else:
+                ranges.append((start, end))
+    return ranges
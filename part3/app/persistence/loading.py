@@ -0,0 +1,38 @@
+from flask import current_app, has_app_context
+from sqlalchemy.orm import joinedload, lazyload, raiseload, selectinload
+
+STRATEGIES = {
+    'selectin': selectinload,
+    'joined': joinedload,
+    'lazy': lazyload,
+    'raise': raiseload,
+}
+
+# Loading plan of the Place relationships for each endpoint, can be
+# overridden with the PLACE_LOADING config key.
+# - list: place_model nests the amenities and the rating aggregates
+# - detail: place_model plus Place.to_dict (owner, amenities, reviews)
+PLACE_LOADING = {
+    'list': {'amenities': 'selectin', 'rating_stats': 'joined'},
+    'detail': {'owner': 'joined', 'amenities': 'selectin', 'reviews': 'selectin', 'rating_stats': 'joined'},
+}
+
+
+def load_options(model, plan):
+    """Turn a {relationship: strategy} plan into SQLAlchemy loader options."""
+    options = []
+    for name, strategy in plan.items():
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown loading strategy '{strategy}' for {model.__name__}.{name}")
+        options.append(STRATEGIES[strategy](getattr(model, name)))
+    return options
+
+
+def place_load_options(endpoint):
+    """Loader options of the Place query used by `endpoint`."""
+    from app.models.place import Place
+
+    plans = PLACE_LOADING
+    if has_app_context():
+        plans = current_app.config.get('PLACE_LOADING', PLACE_LOADING)
+    return load_options(Place, plans.get(endpoint, {}))
@@ -0,0 +1,101 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import DateTime, tuple_
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(values):
+    """Encode the sort key of the last row of a page as an opaque cursor."""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values],
+                     separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, columns):
+    """Decode a cursor produced by encode_cursor back into typed sort values."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Invalid cursor")
+    return [_decode_value(column, value) for column, value in zip(columns, values)]
+
+
+def _decode_value(column, value):
+    """Check that a decoded cursor value is a scalar of the column's type."""
+    if value is None:
+        return None
+    if isinstance(column.type, DateTime):
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+    try:
+        expected = column.type.python_type
+    except NotImplementedError:
+        expected = (str, int, float)
+    if expected in (float, Decimal):
+        expected = (int, float)
+    # Une liste ou un objet JSON irait jusqu'au driver : 400, pas 500
+    if (isinstance(value, bool) and expected is not bool) or not isinstance(value, expected):
+        raise ValueError("Invalid cursor")
+    return value
+
+
+def check_page_size(limit):
+    """Validate the requested page size."""
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
+
+
+def keyset_query(query, columns, limit, cursor=None, descending=False):
+    """
+    `query` ordered on `columns`, starting strictly after the row encoded in
+    `cursor`, with limit + 1 rows so keyset_rows() knows whether a next page
+    exists. Works on a legacy Query as well as on a select() statement.
+    """
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        position = tuple_(*columns)
+        query = query.filter(position < tuple_(*values) if descending else position > tuple_(*values))
+    order = [column.desc() if descending else column for column in columns]
+    return query.order_by(*order).limit(limit + 1)
+
+
+def keyset_rows(rows, columns, limit, key=None):
+    """The rows of the page and the cursor of the next one, from the rows of keyset_query()."""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        if key is None:
+            values = [getattr(rows[-1], column.key) for column in columns]
+        else:
+            values = key(rows[-1])
+        next_cursor = encode_cursor(values)
+    return rows, next_cursor
+
+
+def keyset_page(query, columns, limit, cursor=None, descending=False, key=None):
+    """
+    Return one page of `query` ordered on `columns` and the cursor of the next page.
+
+    The page starts strictly after the row encoded in `cursor`, so the database
+    seeks straight to it through an index on `columns` instead of skipping rows
+    like OFFSET does: deep pages cost the same as the first one.
+    key(row) returns the sort values of a row when they are not plain
+    attributes of it (e.g. an aggregate added with add_columns).
+    """
+    limit = check_page_size(limit)
+    rows = keyset_query(query, columns, limit, cursor, descending).all()
+    return keyset_rows(rows, columns, limit, key)
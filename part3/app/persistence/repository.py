@@ -1,12 +1,21 @@
 from abc import ABC, abstractmethod
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
 from app.models import user, place, review, amenity
 from app import db
+from app.persistence import unit_of_work
+from app.persistence.pagination import keyset_page
 
 class Repository(ABC):
     @abstractmethod
     def add(self, obj):
         pass
 
+    @abstractmethod
+    def add_many(self, objs):
+        pass
+
     @abstractmethod
     def get(self, obj_id):
         pass
@@ -34,6 +43,10 @@ class InMemoryRepository(Repository):
     def add(self, obj):
         self._storage[obj.id] = obj
 
+    def add_many(self, objs):
+        for obj in objs:
+            self.add(obj)
+
     def get(self, obj_id):
         return self._storage.get(obj_id)
 
@@ -41,7 +54,7 @@ class InMemoryRepository(Repository):
         return list(self._storage.values())
 
     def update(self, obj_id, data):
-        obj = self.get(obj_id)
+        obj = self.get(obj_id, for_update=True)
         if obj:
             obj.update(data)
 
@@ -53,32 +66,158 @@ class InMemoryRepository(Repository):
         return next((obj for obj in self._storage.values() if getattr(obj, attr_name) == attr_value), None)
 
 class SQLAlchemyRepository(Repository):
-    def __init__(self, model):
+    def __init__(self, model, cache=None):
         self.model = model
+        # Cache optionnel (LRUCache) devant get(), vidé à chaque écriture
+        self.cache = cache
+
+    def _cache_key(self, obj_id):
+        return (self.model.__name__, str(obj_id))
+
+    def _invalidate(self, obj_id):
+        if self.cache is not None:
+            key = self._cache_key(obj_id)
+            self.cache.delete(key)
+            # Une lecture concurrente a pu remettre l'ancienne ligne en cache avant le commit
+            unit_of_work.after_commit(lambda: self.cache.delete(key) if self.cache is not None else None)
+
+    def _snapshot(self, obj):
+        """Column values of obj, safe to keep across sessions."""
+        return {attr.key: getattr(obj, attr.key) for attr in inspect(self.model).column_attrs}
+
+    def _restore(self, state):
+        """Attach a cached snapshot to the current session without a SELECT."""
+        obj = inspect(self.model).class_manager.new_instance()
+        for key, value in state.items():
+            set_committed_value(obj, key, value)
+        make_transient_to_detached(obj)
+        return db.session.merge(obj, load=False)
 
     def add(self, obj):
         db.session.add(obj)
-        db.session.commit()
-
-    def get(self, obj_id):
+        unit_of_work.commit()
+        self._invalidate(obj.id)
+
+    def add_many(self, objs, chunk_size=1000, before_commit=None):
+        """
+        Insert objs with one executemany INSERT per chunk, one transaction per chunk
+        (a single one inside a unit of work).
+
+        Column defaults (id, timestamps...) are filled in on the objects
+        first so the caller gets their ids back. Rows of many-to-many
+        relationships already set on the objects (Place.amenities) are
+        inserted in the same transaction, as well as whatever
+        before_commit(chunk) writes.
+        """
+        table = self.model.__table__
+        mapper = inspect(self.model)
+        secondaries = [rel for rel in mapper.relationships if rel.secondary is not None]
+        for start in range(0, len(objs), chunk_size):
+            chunk = objs[start:start + chunk_size]
+            rows = [self._row(obj) for obj in chunk]
+            db.session.execute(table.insert(), rows)
+            for rel in secondaries:
+                links = self._secondary_rows(rel, chunk)
+                if links:
+                    db.session.execute(rel.secondary.insert(), links)
+            if before_commit is not None:
+                before_commit(chunk)
+            unit_of_work.commit()
+            for obj in chunk:
+                self._invalidate(obj.id)
+
+    def _row(self, obj):
+        row = {}
+        for column in self.model.__table__.columns:
+            value = getattr(obj, column.key, None)
+            default = column.default
+            if value is None and default is not None and not default.is_clause_element:
+                value = default.arg(None) if default.is_callable else default.arg
+                setattr(obj, column.key, value)
+            row[column.key] = value
+        return row
+
+    @staticmethod
+    def _secondary_rows(rel, objs):
+        (parent, parent_fk), = rel.synchronize_pairs
+        (child, child_fk), = rel.secondary_synchronize_pairs
+        rows = []
+        for obj in objs:
+            # Seulement les collections déjà renseignées, sans déclencher de lazy load
+            for related in obj.__dict__.get(rel.key) or []:
+                rows.append({parent_fk.key: getattr(obj, parent.key),
+                             child_fk.key: getattr(related, child.key)})
+        return rows
+
+    def missing_fields(self, obj):
+        """Required columns (NOT NULL, no default) still empty on obj."""
+        return [column.key for column in self.model.__table__.columns
+                if not column.nullable and column.default is None
+                and not column.primary_key and column.server_default is None
+                and getattr(obj, column.key, None) is None]
+
+    def get(self, obj_id, options=(), for_update=False):
+        """
+        Load obj_id, through the cache when there is one.
+
+        for_update=True skips the cache and locks the row (SELECT ... FOR
+        UPDATE) until the end of the transaction, so values read to compute
+        a write cannot change underneath it.
+        """
         obj_id = str(obj_id)
-        return self.model.query.get(obj_id)
+        if for_update:
+            query = select(self.model).where(self.model.id == obj_id).options(*options)
+            return db.session.scalars(query.with_for_update()
+                                      .execution_options(populate_existing=True)).first()
+        # Les options de chargement imposent une vraie requête
+        if self.cache is None or options:
+            return self.model.query.options(*options).get(obj_id)
+        cache, key = self.cache, self._cache_key(obj_id)
+        state = cache.get(key)
+        if state is not None:
+            return self._restore(state)
+        # Génération lue avant le SELECT : si une écriture invalide entre-temps,
+        # la ligne lue est peut-être l'ancienne et n'est pas mise en cache
+        generation = cache.generation()
+        obj = self.model.query.get(obj_id)
+        if obj is not None:
+            cache.set(key, self._snapshot(obj), generation=generation)
+        return obj
 
     def get_all(self):
         return self.model.query.all()
 
+    def get_many(self, obj_ids):
+        """{id: obj} for the given ids in one IN query; missing ids are simply absent."""
+        obj_ids = {str(obj_id) for obj_id in obj_ids}
+        if not obj_ids:
+            return {}
+        return {obj.id: obj for obj in self.model.query.filter(self.model.id.in_(obj_ids))}
+
+    def exists(self, obj_id):
+        """Whether a row with this primary key exists, without loading it."""
+        return db.session.query(self.model.query.filter(self.model.id == str(obj_id)).exists()).scalar()
+
+    def get_page(self, limit, cursor=None, options=(), **filters):
+        """Return a keyset page ordered on (created_at, id) and the next cursor."""
+        query = self.model.query.options(*options).filter_by(**filters)
+        return keyset_page(query, [self.model.created_at, self.model.id], limit, cursor)
+
     def update(self, obj_id, data):
-        obj = self.get(obj_id)
-        if obj:
-            for key, value in data.items():
-                setattr(obj, key, value)
-            db.session.commit()
+        # Lecture et écriture dans la même transaction d'écriture
+        with unit_of_work.writing():
+            obj = self.get(obj_id, for_update=True)
+            if obj:
+                for key, value in data.items():
+                    setattr(obj, key, value)
+        self._invalidate(obj_id)
 
     def delete(self, obj_id):
-        obj = self.get(obj_id)
-        if obj:
-            db.session.delete(obj)
-            db.session.commit()
+        with unit_of_work.writing():
+            obj = self.get(obj_id, for_update=True)
+            if obj:
+                db.session.delete(obj)
+        self._invalidate(obj_id)
 
     def get_by_attribute(self, attr_name, attr_value):
         return self.model.query.filter_by(**{attr_name: attr_value}).first()
@@ -0,0 +1,146 @@
+"""
+Opt-in slow-query log.
+
+Statements slower than SLOW_QUERY_MS are kept in a ring buffer with
+their SQL, the shape of their parameters (types, never values), the
+endpoint and application frames that ran them and the backend's query
+plan: EXPLAIN QUERY PLAN on SQLite, EXPLAIN elsewhere. The plan is
+read only for statements over the threshold, on the statement's own
+DBAPI connection, hence inside the request's transaction. Outside
+SQLite it runs in a SAVEPOINT: on PostgreSQL a failed EXPLAIN would
+otherwise abort that transaction, and the request with it.
+"""
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Seulement le DML : EXPLAIN ne s'applique pas au DDL ni aux commandes de transaction
+_EXPLAINABLE = re.compile(r'\s*(SELECT|WITH|INSERT|UPDATE|DELETE)\b', re.I)
+
+
+def _shape(parameters):
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def _app_frames(limit=4):
+    # Frames de l'application (pagination, dépôt, facade, namespace...) au-dessus de SQLAlchemy
+    frames = []
+    frame = sys._getframe(2)
+    while frame is not None and len(frames) < limit:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(_APP_DIR) and filename != os.path.abspath(__file__):
+            frames.append(f"{os.path.relpath(filename, _APP_DIR)}:{frame.f_lineno} in {frame.f_code.co_name}")
+        frame = frame.f_back
+    return frames
+
+
+class SlowQueryLog:
+    """Ring buffer of the statements slower than threshold_ms, newest last."""
+
+    def __init__(self, threshold_ms=None, size=100, explain=True):
+        self._lock = threading.Lock()
+        self.configure(threshold_ms, size, explain)
+
+    def configure(self, threshold_ms=None, size=100, explain=True):
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        with self._lock:
+            self.threshold_ms = threshold_ms
+            self.explain = explain
+            self.recorded = 0
+            self._entries = deque(maxlen=size)
+
+    @property
+    def enabled(self):
+        return self.threshold_ms is not None
+
+    def instrument_engine(self, engine):
+        if event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+            return
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def entries(self):
+        with self._lock:
+            return list(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'threshold_ms': self.threshold_ms, 'recorded': self.recorded,
+                    'kept': len(self._entries), 'size': self._entries.maxlen}
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_hbnb_slow_started', None)
+        if started is None or self.threshold_ms is None:
+            return
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms < self.threshold_ms:
+            return
+        entry = {
+            'at': datetime.now(timezone.utc).isoformat(),
+            'duration_ms': round(duration_ms, 3),
+            'statement': statement,
+            'parameters': ({'executemany': len(parameters), 'first': _shape(parameters[0]) if parameters else None}
+                           if executemany else _shape(parameters)),
+            'endpoint': f"{request.method} {request.url_rule.rule if request.url_rule else request.path}"
+                        if has_request_context() else None,
+            'callers': _app_frames(),
+            'plan': _explain(cursor, conn.dialect, statement, parameters)
+                    if self.explain and not executemany and _EXPLAINABLE.match(statement) else None,
+        }
+        with self._lock:
+            self.recorded += 1
+            self._entries.append(entry)
+
+
+def _explain(cursor, dialect, statement, parameters):
+    prefix = 'EXPLAIN QUERY PLAN ' if dialect.name == 'sqlite' else 'EXPLAIN '
+    # SQLite n'annule pas la transaction sur une erreur : pas besoin de savepoint
+    savepoint = dialect.name != 'sqlite'
+    plan_cursor = cursor.connection.cursor()
+    try:
+        if savepoint:
+            plan_cursor.execute('SAVEPOINT hbnb_explain')
+        try:
+            plan_cursor.execute(prefix + statement, parameters)
+            rows = plan_cursor.fetchall()
+        except Exception as e:
+            if savepoint:
+                plan_cursor.execute('ROLLBACK TO SAVEPOINT hbnb_explain')
+            # Le plan est un bonus : son échec ne doit pas casser la requête
+            return [f"EXPLAIN failed: {e}"]
+        finally:
+            if savepoint:
+                plan_cursor.execute('RELEASE SAVEPOINT hbnb_explain')
+    except Exception as e:
+        # Connexion en autocommit (pas de transaction à protéger) ou savepoint refusé
+        return [f"EXPLAIN failed: {e}"]
+    finally:
+        plan_cursor.close()
+    # SQLite : (id, parent, notused, detail) ; PostgreSQL / MySQL : une ligne par nœud du plan
+    if dialect.name == 'sqlite':
+        return [row[-1] for row in rows]
+    return [' | '.join(str(value) for value in row) for row in rows]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._hbnb_slow_started = time.perf_counter()
+
+
+slow_query_log = SlowQueryLog()
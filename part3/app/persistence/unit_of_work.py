@@ -0,0 +1,130 @@
+import threading
+from contextlib import contextmanager, nullcontext
+
+from sqlalchemy import event
+
+from app import db
+
+DEPTH_KEY = 'hbnb_uow_depth'
+CALLBACKS_KEY = 'hbnb_uow_after_commit'
+CHANGES_KEY = 'hbnb_uow_changes_at_begin'
+
+_begin = threading.local()
+
+
+def configure_engine(engine):
+    """
+    Let SQLite run the savepoints of nested transaction() blocks.
+
+    pysqlite only opens a transaction before INSERT/UPDATE/DELETE, so a
+    SAVEPOINT as first statement runs outside any transaction and its
+    RELEASE commits on the spot. The driver's own handling is turned
+    off and SQLAlchemy emits BEGIN itself; transaction() blocks start
+    with BEGIN IMMEDIATE, so a block that reads before writing waits on
+    busy_timeout for the write lock instead of failing with "database is
+    locked" when another writer commits first. A read-only transaction
+    already open when the block starts is ended first for the same
+    reason.
+    """
+    if engine.dialect.name != 'sqlite' or event.contains(engine, 'begin', _emit_begin):
+        return
+    event.listen(engine, 'connect', _disable_pysqlite_transactions)
+    event.listen(engine, 'begin', _emit_begin)
+
+
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+def _emit_begin(conn):
+    conn.exec_driver_sql('BEGIN IMMEDIATE' if getattr(_begin, 'immediate', False) else 'BEGIN')
+    # Lignes écrites par la connexion au début de la transaction (voir _begin_for_write) ;
+    # l'adaptateur aiosqlite du moteur async ne l'expose pas, il ne fait que lire
+    conn.info[CHANGES_KEY] = getattr(conn.connection.dbapi_connection, 'total_changes', None)
+
+
+def _begin_for_write(session):
+    if session.get_bind().dialect.name != 'sqlite':
+        return
+    if session().in_transaction():
+        connection = session.connection()
+        changes = connection.connection.dbapi_connection.total_changes
+        if session.new or session.dirty or session.deleted or changes != connection.info.get(CHANGES_KEY):
+            return
+        # Transaction de lecture ouverte par la requête (validations avant l'écriture) :
+        # SQLite ne peut pas la promouvoir si un autre écrivain a commité depuis.
+        # Elle n'a rien écrit, on la termine pour repartir en BEGIN IMMEDIATE.
+        session.commit()
+    _begin.immediate = True
+    try:
+        session.connection()
+    finally:
+        _begin.immediate = False
+
+
+def in_unit_of_work():
+    """Whether a transaction() block is open on the current session."""
+    return db.session.info.get(DEPTH_KEY, 0) > 0
+
+
+def commit():
+    """Commit now, or only flush when a transaction() block will commit later."""
+    if in_unit_of_work():
+        db.session.flush()
+    else:
+        db.session.commit()
+
+
+def after_commit(callback):
+    """Run callback once the data is committed: now, or after the outermost transaction()."""
+    if in_unit_of_work():
+        db.session.info.setdefault(CALLBACKS_KEY, []).append(callback)
+    else:
+        callback()
+
+
+@contextmanager
+def transaction():
+    """
+    Group every repository write of the block into one commit.
+
+    Inside the block repositories flush instead of committing. The
+    outermost block commits once on success and rolls back on error;
+    a nested block runs in a SAVEPOINT, so an error only undoes its own
+    writes when the caller catches it. Cache invalidations registered
+    with after_commit() run after the final commit.
+    """
+    session = db.session
+    depth = session.info.get(DEPTH_KEY, 0)
+    if depth:
+        savepoint = session.begin_nested()
+        session.info[DEPTH_KEY] = depth + 1
+        try:
+            yield session
+        except BaseException:
+            savepoint.rollback()
+            raise
+        else:
+            savepoint.commit()
+        finally:
+            session.info[DEPTH_KEY] = depth
+        return
+
+    session.info[DEPTH_KEY] = 1
+    try:
+        _begin_for_write(session)
+        yield session
+        session.commit()
+    except BaseException:
+        session.rollback()
+        session.info.pop(CALLBACKS_KEY, None)
+        raise
+    finally:
+        session.info[DEPTH_KEY] = 0
+    for callback in session.info.pop(CALLBACKS_KEY, []):
+        callback()
+
+
+def writing():
+    """transaction() for a single write, unless a unit of work is already open."""
+    return nullcontext(db.session) if in_unit_of_work() else transaction()
@@ -0,0 +1,63 @@
+"""
+Read queries of the ASGI read path (app/asgi.py) on an AsyncSession.
+
+The statements are the ones of the sync repositories
+(PlaceRepository.search_query, facets_query, keyset_query), run with
+await instead of through db.session. An AsyncSession cannot lazy load,
+so the place queries use the 'list' loading plan of PLACE_LOADING, which
+eagerly loads everything serialize_place and place_tag read.
+"""
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models.place import Place
+from app.models.review import Review
+from app.persistence.pagination import check_page_size, keyset_query, keyset_rows
+from app.services.repositories.place_repository import PlaceRepository, check_search_filters
+
+
+class AsyncReads:
+    """Places and reviews of a place, read through an AsyncEngine."""
+
+    def __init__(self, engine, place_options=()):
+        # Objets lus puis sérialisés après la fermeture de la session : pas d'expiration
+        self.sessions = async_sessionmaker(engine, expire_on_commit=False)
+        self.place_options = place_options
+        # Seulement pour ses constructeurs de requêtes, jamais pour db.session
+        self.place_repo = PlaceRepository()
+
+    async def search_places(self, limit, cursor=None, sort='created', min_price=None, max_price=None,
+                            amenity_ids=(), min_rating=None, with_facets=False):
+        """Same (places, next_cursor, facets) as facade.search_places."""
+        check_search_filters(min_price, max_price, min_rating)
+        limit = check_page_size(limit)
+        query, columns, descending, key, filters, ratings = self.place_repo.search_query(
+            select(Place).options(*self.place_options), sort, min_price, max_price, amenity_ids, min_rating)
+        statement = keyset_query(query, columns, limit, cursor, descending)
+        async with self.sessions() as session:
+            result = (await session.execute(statement)).unique()
+            if sort == 'rating_desc':
+                rows, next_cursor = keyset_rows(result.all(), columns, limit, key)
+                rows = [row[0] for row in rows]
+            else:
+                rows, next_cursor = keyset_rows(result.scalars().all(), columns, limit)
+            facets = None
+            if with_facets:
+                statement, labels = self.place_repo.facets_query(filters, ratings)
+                facets = self.place_repo.facet_counts(await session.execute(statement), labels)
+        return rows, next_cursor, facets
+
+    async def get_place(self, place_id):
+        async with self.sessions() as session:
+            return await session.get(Place, str(place_id), options=self.place_options)
+
+    async def get_reviews_by_place(self, place_id, limit=None, cursor=None):
+        """Same (reviews, next_cursor) page as facade.get_reviews_by_place, None if the place does not exist."""
+        limit = check_page_size(limit)
+        columns = [Review.created_at, Review.id]
+        statement = keyset_query(select(Review).filter_by(place_id=place_id), columns, limit, cursor)
+        async with self.sessions() as session:
+            if not await session.scalar(select(exists().where(Place.id == place_id))):
+                return None
+            reviews = (await session.scalars(statement)).all()
+        return keyset_rows(reviews, columns, limit)
@@ -1,22 +1,129 @@
+import json
+from sqlalchemy import select
+from sqlalchemy.orm.attributes import set_committed_value
+from app import db
+from app.persistence import unit_of_work
 from app.persistence.repository import SQLAlchemyRepository
+from app.persistence.loading import place_load_options
+from app.persistence.cache import LRUCache
+from app.persistence.geo import MAX_SEARCH_RADIUS_KM, check_coordinates
+from app.persistence.pagination import check_page_size
 from app.models.amenity import Amenity
 from app.services.repositories.user_repository import UserRepository
-from app.services.repositories.place_repository import PlaceRepository
+from app.services.repositories.place_repository import PlaceRepository, check_search_filters
 from app.services.repositories.amenity_repository import AmenityRepository
 from app.services.repositories.review_repository import ReviewRepository
->>>>>>> origin/main
+from app.services.repositories.rating_stats_repository import RatingStatsRepository
 from app.models.user import User
 from app.models.amenity import Amenity
-from app.models.place import Place
+from app.models.place import Place, place_amenity
 from app.models.review import Review
 
+# Durée de vie par défaut (secondes) des entrées des caches de dépôts
+REPOSITORY_CACHE_TTL = 60
+
 
 class HBnBFacade:
     def __init__(self):
         self.user_repo = SQLAlchemyRepository(User)
-        self.place_repo = SQLAlchemyRepository(Place)
-        self.review_repo = SQLAlchemyRepository(Review)
+        self.place_repo = PlaceRepository()
+        self.review_repo = ReviewRepository()
         self.amenity_repo = SQLAlchemyRepository(Amenity)
+        self.rating_stats_repo = RatingStatsRepository()
+        # Cache partagé des payloads sérialisés (voir set_cache_backend)
+        self.cache_backend = None
+
+    def _repo(self, name):
+        repo = getattr(self, f'{name}_repo', None)
+        if repo is None:
+            raise ValueError(f"Unknown repository '{name}'")
+        return repo
+
+    def enable_cache(self, name, maxsize=1024, ttl=REPOSITORY_CACHE_TTL):
+        """
+        Put an LRU read-through cache in front of one repository ('place', 'amenity', ...).
+
+        Entries expire after ttl seconds even without a write, which bounds
+        how long a row changed outside the repository can be served.
+        """
+        repo = self._repo(name)
+        repo.cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        return repo.cache
+
+    def disable_cache(self, name):
+        self._repo(name).cache = None
+
+    def cache_stats(self):
+        """Hit/miss/eviction counters of every cached repository."""
+        stats = {}
+        for name in ('user', 'place', 'review', 'amenity'):
+            repo = self._repo(name)
+            if repo.cache is not None:
+                stats[name] = repo.cache.stats()
+        return stats
+
+    def set_cache_backend(self, backend):
+        """Share serialized payloads through `backend` (a CacheBackend, or None to disable)."""
+        if backend is self.cache_backend:
+            return
+        # Un seul abonnement (et sur Redis un seul thread d'écoute) par backend en service
+        if self.cache_backend is not None:
+            self.cache_backend.unsubscribe(self._on_invalidate)
+        self.cache_backend = backend
+        if backend is not None:
+            backend.subscribe(self._on_invalidate)
+
+    def _on_invalidate(self, keys):
+        # Invalidation reçue (éventuellement d'un autre worker) : vider aussi les caches LRU locaux
+        for key in keys:
+            name, _, obj_id = key.partition(':')
+            repo = getattr(self, f'{name}_repo', None)
+            if repo is not None:
+                repo._invalidate(obj_id)
+
+    def get_payload(self, name, obj_id, build):
+        """
+        (ETag, JSON text) of an entity, read from the shared cache when possible.
+
+        build(obj_id) loads and serializes the entity: it returns (etag,
+        body), body being a dict or its JSON text, or None when the entity
+        does not exist. It only runs on a cache miss; the ETag is cached
+        with the body so conditional requests need no database access.
+        """
+        key = f'{name}:{obj_id}'
+        if self.cache_backend is not None:
+            cached = self.cache_backend.get(key)
+            if cached is not None:
+                etag, _, payload = cached.partition('\n')
+                return etag, payload
+        built = build(obj_id)
+        if built is None:
+            return None
+        etag, payload = built
+        if not isinstance(payload, str):
+            payload = json.dumps(payload)
+        if self.cache_backend is not None:
+            # Le JSON ne contient jamais de saut de ligne brut : il sépare l'ETag du corps
+            self.cache_backend.set(key, f'{etag}\n{payload}')
+        return etag, payload
+
+    def invalidate(self, name, *obj_ids):
+        """Drop cached payloads of entities once the write is committed, in every worker."""
+        if self.cache_backend is not None and obj_ids:
+            keys = [f'{name}:{obj_id}' for obj_id in obj_ids]
+            unit_of_work.after_commit(lambda: self.cache_backend.delete(*keys))
+
+    def transaction(self):
+        """
+        Unit of work: the writes of the block are committed once, at its end.
+
+            with facade.transaction():
+                place = facade.create_place(data)
+                facade.create_review(review_data)
+
+        Nested blocks run in savepoints. Also usable as a decorator.
+        """
+        return unit_of_work.transaction()
 
     def create_user(self, user_data):
         user = User(**user_data)
@@ -85,27 +192,153 @@ class HBnBFacade:
         return self.amenity_repo.get_all()
 
     def update_amenity(self, amenity_id, amenity_data):
-        return self.amenity_repo.update(amenity_id, amenity_data)
-
+        result = self.amenity_repo.update(amenity_id, amenity_data)
+        self.invalidate('amenity', amenity_id)
+        # Le payload (et l'ETag) d'un lieu contient ses amenities
+        linked = select(place_amenity.c.place_id).where(place_amenity.c.amenity_id == amenity_id)
+        self.invalidate('place', *db.session.scalars(linked))
+        return result
+
+
+    def _check_required(self, repo, obj):
+        missing = repo.missing_fields(obj)
+        if missing:
+            raise ValueError(f"Missing required fields: {', '.join(missing)}")
+
+    def create_amenities(self, amenities_data):
+        """Validate a batch of amenities and insert the valid ones. Returns (created, errors)."""
+        amenities, errors = [], []
+        for index, data in enumerate(amenities_data):
+            try:
+                amenity = Amenity(**data)
+                self._check_required(self.amenity_repo, amenity)
+                amenities.append(amenity)
+            except (TypeError, ValueError) as e:
+                errors.append({'index': index, 'error': str(e)})
+        self.amenity_repo.add_many(amenities)
+        return amenities, errors
+
+    def create_places(self, places_data, owner_id):
+        """Validate a batch of places owned by owner_id and insert the valid ones. Returns (created, errors)."""
+        # Toutes les amenities du lot en une requête
+        amenity_ids = {amenity_id for data in places_data for amenity_id in data.get('amenities') or []}
+        amenities = self.amenity_repo.get_many(amenity_ids)
+        places, errors = [], []
+        for index, data in enumerate(places_data):
+            try:
+                data = dict(data, owner_id=owner_id)
+                ids = data.pop('amenities', None) or []
+                missing = [amenity_id for amenity_id in ids if amenity_id not in amenities]
+                if missing:
+                    raise ValueError(f"Amenity not found: {', '.join(missing)}")
+                place = Place(**data)
+                self._check_required(self.place_repo, place)
+                # Sans événement de backref : les lignes place_amenity sont écrites par add_many
+                set_committed_value(place, 'amenities', [amenities[amenity_id] for amenity_id in ids])
+                places.append(place)
+            except (TypeError, ValueError) as e:
+                errors.append({'index': index, 'error': str(e)})
+        self.place_repo.add_many(places)
+        return places, errors
+
+    def create_reviews(self, reviews_data, user_id):
+        """Validate a batch of reviews written by user_id and insert the valid ones. Returns (created, errors)."""
+        place_ids = {data.get('place_id') for data in reviews_data}
+        owners = dict(db.session.query(Place.id, Place.owner_id).filter(Place.id.in_(place_ids)))
+        reviewed = {place_id for place_id, in db.session.query(Review.place_id).filter(
+            Review.user_id == user_id, Review.place_id.in_(place_ids))}
+        reviews, errors = [], []
+        for index, data in enumerate(reviews_data):
+            try:
+                place_id = data.get('place_id')
+                if place_id not in owners:
+                    raise ValueError('wrong place id')
+                if owners[place_id] == user_id:
+                    raise ValueError('You cannot review your own place.')
+                if place_id in reviewed:
+                    raise ValueError('You have already reviewed this place.')
+                review = Review(**dict(data, user_id=user_id))
+                self._check_required(self.review_repo, review)
+                reviewed.add(place_id)
+                reviews.append(review)
+            except (TypeError, ValueError) as e:
+                errors.append({'index': index, 'error': str(e)})
+        self.review_repo.add_many(reviews, before_commit=lambda chunk: self.rating_stats_repo.apply_many(
+            (review.place_id, review.rating) for review in chunk))
+        self.invalidate('place', *{review.place_id for review in reviews})
+        return reviews, errors
+
+    def resolve_amenities(self, amenity_ids):
+        """Amenities for amenity_ids, in order, fetched in one query; ValueError names every missing id."""
+        amenity_ids = list(dict.fromkeys(amenity_ids or []))
+        amenities = self.amenity_repo.get_many(amenity_ids)
+        missing = [amenity_id for amenity_id in amenity_ids if amenity_id not in amenities]
+        if missing:
+            raise ValueError(f"Amenity not found: {', '.join(missing)}")
+        return [amenities[amenity_id] for amenity_id in amenity_ids]
+
+    def set_place_amenities(self, place, amenity_ids):
+        """Replace the amenities of place, writing only the links that change."""
+        amenities = self.resolve_amenities(amenity_ids)
+        self.place_repo.set_amenities(place, amenities)
+        self.invalidate('place', place.id)
+        return place
 
     def create_place(self, place_data):
-        place_data["amenities"] = [self.get_amenity(amenity) for amenity in place_data["amenities"]]   
-        place = Place(**place_data)
-        self.place_repo.add(place)
+        with self.transaction():
+            place_data["amenities"] = self.resolve_amenities(place_data.get("amenities"))
+            place = Place(**place_data)
+            self.place_repo.add(place)
         return place
 
-    def get_place(self, place_id):
+    def get_place(self, place_id, endpoint=None):
         # Placeholder for logic to retrieve a place by ID, including associated owner and amenities
-        return self.place_repo.get(place_id)
+        # endpoint choisit la stratégie de chargement des relations (voir PLACE_LOADING)
+        options = place_load_options(endpoint) if endpoint else ()
+        return self.place_repo.get(place_id, options=options)
 
     def get_all_places(self):
         # Placeholder for logic to retrieve all places
         return self.place_repo.get_all()
 
+    def get_places_page(self, limit, cursor=None, endpoint='list'):
+        # Page de lieux ordonnée sur (created_at, id)
+        return self.place_repo.get_page(limit, cursor, options=place_load_options(endpoint))
+
+    def search_places(self, limit, cursor=None, sort='created', min_price=None, max_price=None,
+                      amenity_ids=(), min_rating=None, with_facets=False):
+        # Liste filtrée et triée des lieux, (places, next_cursor, facets)
+        check_search_filters(min_price, max_price, min_rating)
+        return self.place_repo.search(limit, cursor, sort, min_price, max_price, amenity_ids,
+                                      min_rating, with_facets, options=place_load_options('list'))
+
+    def search_places_radius(self, latitude, longitude, radius_km, limit):
+        # Lieux à moins de radius_km du point, du plus proche au plus lointain
+        check_coordinates(latitude, longitude)
+        if not 0 < radius_km <= MAX_SEARCH_RADIUS_KM:
+            raise ValueError(f"radius_km must be between 0 and {MAX_SEARCH_RADIUS_KM}")
+        return self.place_repo.get_within_radius(latitude, longitude, radius_km, check_page_size(limit),
+                                                 options=place_load_options('list'))
+
+    def search_places_bbox(self, min_lat, min_lng, max_lat, max_lng, limit):
+        # min_lng > max_lng : la boîte traverse l'antiméridien
+        check_coordinates(min_lat, min_lng)
+        check_coordinates(max_lat, max_lng)
+        if min_lat > max_lat:
+            raise ValueError("min_lat must not be greater than max_lat")
+        return self.place_repo.get_in_box(min_lat, min_lng, max_lat, max_lng, check_page_size(limit),
+                                          options=place_load_options('list'))
+
     def update_place(self, place_id, place_data):
         # Placeholder for logic to update a place
+        with self.transaction():
+            return self._update_place(place_id, place_data)
+
+    def _update_place(self, place_id, place_data):
         place = self.place_repo.get(place_id)
         if place:
+            place_data = dict(place_data)
+            amenity_ids = place_data.pop('amenities', None)
             if 'title' in place_data:
                 place.title = place_data['title']
             if 'description' in place_data:
@@ -118,7 +351,10 @@ class HBnBFacade:
                 place.longitude = place_data['longitude']
             if 'owner_id' in place_data:
                 place.owner_id = place_data['owner_id']
-            self.place_repo.update(place, place_data)
+            if amenity_ids is not None:
+                self.set_place_amenities(place, amenity_ids)
+            self.place_repo.update(place_id, place_data)
+            self.invalidate('place', place_id)
         return place
     
     def create_review(self, review_data):
@@ -127,7 +363,11 @@ class HBnBFacade:
         #review_data['user'] = self.get_user(review_data.pop("user_id"))
         #review_data['place'] = self.get_place(review_data.pop("place_id"))
         review = Review(**review_data)
-        self.review_repo.add(review)
+        # Les agrégats sont commités avec la review, dans la même transaction
+        with self.transaction():
+            self.rating_stats_repo.apply(review.place_id, review.rating)
+            self.review_repo.add(review)
+            self.invalidate('place', review.place_id)
         return review
 
     def get_review(self, review_id):
@@ -138,9 +378,17 @@ class HBnBFacade:
         # Placeholder for logic to retrieve all reviews
         return self.review_repo.get_all()
 
-    def get_reviews_by_place(self, place_id):
-        # Placeholder for logic to retrieve all reviews for a specific place
-        return self.review_repo.get(place_id)
+    def get_reviews_by_place(self, place_id, limit=None, cursor=None):
+        # Page des reviews d'un lieu (index place_id, created_at, id), None si le lieu n'existe pas
+        if not self.place_repo.exists(place_id):
+            return None
+        return self.review_repo.get_by_place(place_id, limit, cursor)
+
+    def iter_reviews_by_place(self, place_id):
+        # Toutes les reviews d'un lieu, lues par lots, None si le lieu n'existe pas
+        if not self.place_repo.exists(place_id):
+            return None
+        return self.review_repo.iter_by_place(place_id)
     
     def get_review_by_user_and_place(self, user_id, place_id):
         return Review.query.filter_by(user_id=user_id, place_id=place_id).first()
@@ -148,20 +396,36 @@ class HBnBFacade:
     def update_review(self, review_id, review_data):
         # Placeholder for logic to update a review
 
-        review = self.get_review(review_id)
-        if not review:
-            raise ValueError("Review not found")
-
-        self.review_repo.update(review_id, review_data)
+        with self.transaction():
+            # Ligne verrouillée jusqu'au commit : l'ancienne note lue ici ne peut
+            # pas changer avant que les agrégats soient corrigés
+            review = self.review_repo.get(review_id, for_update=True)
+            if not review:
+                raise ValueError("Review not found")
+
+            old_place_id, old_rating = review.place_id, review.rating
+            new_place_id = review_data.get('place_id', old_place_id)
+            new_rating = review_data.get('rating', old_rating)
+            if (new_place_id, new_rating) != (old_place_id, old_rating):
+                self.rating_stats_repo.apply(old_place_id, old_rating, -1)
+                self.rating_stats_repo.apply(new_place_id, new_rating)
+            self.review_repo.update(review_id, review_data)
+            self.invalidate('review', review_id)
+            self.invalidate('place', *{old_place_id, new_place_id})
         return self.get_review(review_id)
 
     def delete_review(self, review_id):
         # Placeholder for logic to delete a review
-        review = self.review_repo.get(review_id)
-        if review:
+        with self.transaction():
+            review = self.review_repo.get(review_id, for_update=True)
+            if not review:
+                return None
+            place_id = review.place_id
+            self.rating_stats_repo.apply(place_id, review.rating, -1)
             self.review_repo.delete(review_id)
-            return {'message': 'Review deleted sucessfully'}
-        self.review_repo.delete(review_id)
+            self.invalidate('review', review_id)
+            self.invalidate('place', place_id)
+        return {'message': 'Review deleted sucessfully'}
     
 
     def create_user(self, user_data):
@@ -173,9 +437,6 @@ class HBnBFacade:
     def get_user(self, user_id):
         return self.user_repo.get(user_id)
 
-    def get_user_by_email(self, email):
-        return self.user_repo.get_user_by_email(email)
-
     def get_all_user(self):
         return self.user_repo.get_all()
     
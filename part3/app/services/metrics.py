@@ -0,0 +1,206 @@
+"""
+Per-request instrumentation rendered in the Prometheus text format.
+
+For every request: latency by method and route, number and time of the
+SQL statements it ran (engine events) and time spent serializing its
+body. Everything a request measures is kept in a context variable and
+folded into the shared counters once, in after_request, so the cost per
+SQL statement is two perf_counter() calls and no lock.
+"""
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+
+from flask import request
+from sqlalchemy import event
+
+# Bornes des histogrammes, en secondes
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SQL_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram, as Prometheus expects it."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self):
+        """(le, cumulative count) pairs, '+Inf' last."""
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+
+class _RequestStats:
+    __slots__ = ('start', 'sql', 'serialization')
+
+    def __init__(self, start):
+        self.start = start
+        self.sql = []
+        self.serialization = 0.0
+
+
+_current = ContextVar('hbnb_request_stats', default=None)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+class RequestMetrics:
+    """Latency, SQL and serialization counters of the API, per method and route."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = {}
+            self.latency = {}
+            self.sql_statements = {}
+            self.sql_seconds = {}
+            self.serialization_seconds = {}
+            self.sql_latency = Histogram(SQL_BUCKETS)
+
+    def init_app(self, app, api=None):
+        """Time the requests of app and the JSON bodies rendered by api (a flask_restx Api)."""
+        if not app.config.get('METRICS_ENABLED', True):
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        if api is not None:
+            output_json = api.representations['application/json']
+            api.representations['application/json'] = (
+                lambda data, code, headers=None: self.measure_serialization(output_json, data, code, headers))
+
+    def instrument_engine(self, engine):
+        if event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+            return
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+    def measure_serialization(self, fn, *args):
+        """fn(*args), its duration counted as serialization time of the current request."""
+        stats = _current.get()
+        if stats is None:
+            return fn(*args)
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            stats.serialization += time.perf_counter() - start
+
+    def begin(self):
+        """Start measuring the current request (Flask hook, or the ASGI reads of app/asgi.py)."""
+        _current.set(_RequestStats(time.perf_counter()))
+
+    def end(self, method, route, status):
+        """Fold what the current request measured into the counters of (method, route)."""
+        stats = _current.get()
+        if stats is None:
+            return
+        _current.set(None)
+        elapsed = time.perf_counter() - stats.start
+        key = (method, route)
+        with self._lock:
+            status_key = key + (status,)
+            self.requests[status_key] = self.requests.get(status_key, 0) + 1
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(elapsed)
+            self.sql_statements[key] = self.sql_statements.get(key, 0) + len(stats.sql)
+            self.sql_seconds[key] = self.sql_seconds.get(key, 0.0) + sum(stats.sql)
+            self.serialization_seconds[key] = self.serialization_seconds.get(key, 0.0) + stats.serialization
+            for seconds in stats.sql:
+                self.sql_latency.observe(seconds)
+
+    def _before_request(self):
+        self.begin()
+
+    def _after_request(self, response):
+        self.end(request.method, request.url_rule.rule if request.url_rule else 'unmatched', response.status_code)
+        return response
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, '_hbnb_started', None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        stats = _current.get()
+        if stats is not None:
+            stats.sql.append(elapsed)
+        else:
+            # Hors requête (CLI, flux envoyé après after_request)
+            with self._lock:
+                self.sql_latency.observe(elapsed)
+
+    def render(self, gauges=None):
+        """
+        Prometheus text exposition of the counters.
+
+        gauges maps a metric prefix to a dict of numbers, e.g.
+        {'hbnb_db_pool': pool_metrics.stats(engine)}.
+        """
+        lines = []
+
+        def header(name, kind, text):
+            lines.append(f'# HELP {name} {text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        with self._lock:
+            header('hbnb_http_requests_total', 'counter', 'Requests served, by method, route and status.')
+            for (method, route, status), count in sorted(self.requests.items()):
+                lines.append(f'hbnb_http_requests_total{_labels(method=method, route=route, status=status)} {count}')
+            header('hbnb_http_request_duration_seconds', 'histogram', 'Request latency, by method and route.')
+            for (method, route), histogram in sorted(self.latency.items()):
+                for bound, count in histogram.samples():
+                    labels = _labels(method=method, route=route, le=bound)
+                    lines.append(f'hbnb_http_request_duration_seconds_bucket{labels} {count}')
+                labels = _labels(method=method, route=route)
+                lines.append(f'hbnb_http_request_duration_seconds_sum{labels} {histogram.sum!r}')
+                lines.append(f'hbnb_http_request_duration_seconds_count{labels} {histogram.count}')
+            for name, values, text in (
+                    ('hbnb_http_request_sql_statements_total', self.sql_statements, 'SQL statements run by the requests.'),
+                    ('hbnb_http_request_sql_seconds_total', self.sql_seconds, 'Time spent in SQL statements.'),
+                    ('hbnb_http_request_serialization_seconds_total', self.serialization_seconds,
+                     'Time spent serializing response bodies.')):
+                header(name, 'counter', text)
+                for (method, route), value in sorted(values.items()):
+                    lines.append(f'{name}{_labels(method=method, route=route)} {value!r}')
+            header('hbnb_sql_statement_duration_seconds', 'histogram', 'Duration of every SQL statement.')
+            for bound, count in self.sql_latency.samples():
+                lines.append(f'hbnb_sql_statement_duration_seconds_bucket{_labels(le=bound)} {count}')
+            lines.append(f'hbnb_sql_statement_duration_seconds_sum {self.sql_latency.sum!r}')
+            lines.append(f'hbnb_sql_statement_duration_seconds_count {self.sql_latency.count}')
+        for prefix, values in (gauges or {}).items():
+            for key, value in values.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    header(f'{prefix}_{key}', 'gauge', f'{key} of {prefix}.')
+                    lines.append(f'{prefix}_{key} {value!r}')
+        return '\n'.join(lines) + '\n'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._hbnb_started = time.perf_counter()
+
+
+request_metrics = RequestMetrics()
@@ -0,0 +1,121 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+import bcrypt as _bcrypt
+
+DEFAULT_LOG_ROUNDS = 12
+
+
+class PasswordPoolSaturated(Exception):
+    """Too many password hashes/checks already waiting for a worker."""
+
+
+def _hash(password, rounds):
+    return _bcrypt.hashpw(password.encode('utf-8'), _bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check(hashed, password):
+    try:
+        return _bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    except ValueError:
+        # Hash illisible (mot de passe jamais haché) : refusé comme un mauvais mot de passe
+        return False
+
+
+class PasswordPool:
+    """
+    Bounded pool of worker processes running bcrypt off the request threads.
+
+    At most `max_pending` operations wait or run at once; beyond that
+    submit raises PasswordPoolSaturated right away so the API can answer
+    429 instead of queueing logins behind each other. `workers=0` runs
+    bcrypt inline (tests, one-off scripts).
+    """
+
+    def __init__(self, workers=0, max_pending=64, rounds=DEFAULT_LOG_ROUNDS, timeout=10.0):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.configure(workers, max_pending, rounds, timeout)
+
+    def configure(self, workers=0, max_pending=64, rounds=DEFAULT_LOG_ROUNDS, timeout=10.0):
+        if workers < 0 or max_pending < 1:
+            raise ValueError("workers must be >= 0 and max_pending >= 1")
+        if not 4 <= rounds <= 31:
+            raise ValueError("rounds must be between 4 and 31")
+        self.shutdown()
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self.timeout = timeout
+
+    def _pool(self):
+        # Un worker forké (gunicorn) ne peut pas réutiliser les processus de son parent
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            self._pid = os.getpid()
+        return self._executor
+
+    def _release(self, future=None):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    def _submit(self, fn, *args):
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordPoolSaturated("Too many authentication requests in progress")
+            self.pending += 1
+        if not self.workers:
+            try:
+                return fn(*args)
+            finally:
+                self._release()
+        try:
+            with self._lock:
+                future = self._pool().submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # La place se libère quand le worker a fini, pas quand la requête abandonne
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # Encore en file : annulé ; déjà en cours : la place reste prise jusqu'à la fin du hash
+            future.cancel()
+            raise PasswordPoolSaturated("Password check timed out")
+
+    def hash(self, password):
+        """bcrypt hash of password with the configured cost factor."""
+        return self._submit(_hash, password, self.rounds)
+
+    def verify(self, hashed, password):
+        """Whether password matches the bcrypt hash."""
+        if not hashed or password is None:
+            return False
+        return self._submit(_check, hashed, password)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'pending': self.pending,
+                'max_pending': self.max_pending,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'rounds': self.rounds,
+            }
+
+    def shutdown(self):
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+
+password_pool = PasswordPool()
@@ -0,0 +1,205 @@
+"""
+Per-request sampling profiler.
+
+An admin sends the X-HBnB-Profile header and that one request is
+sampled: a background thread reads the request thread's stack every
+PROFILE_INTERVAL_MS and counts identical stacks. The result is written
+in the collapsed format of flamegraph.pl / speedscope ("a;b;c 12").
+
+- X-HBnB-Profile: store (or any value) writes the stacks to PROFILE_DIR;
+  the response keeps its body and names the file in X-HBnB-Profile-File.
+- X-HBnB-Profile: inline replaces the body with the stacks (text/plain),
+  the original status going to X-HBnB-Profile-Status.
+
+Only PROFILE_MAX_CONCURRENT requests per process are sampled at once;
+others are served normally with X-HBnB-Profile: busy.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+from flask import current_app, g, request
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+
+HEADER = 'X-HBnB-Profile'
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Intervalle de bascule du GIL pendant un profilage : sans cela (5 ms par défaut),
+# un thread de requête qui calcule ne laisse l'échantillonneur tourner que toutes les 5 ms
+_switch_lock = threading.Lock()
+_switch_users = 0
+_switch_default = None
+
+
+def _lower_switch_interval(interval):
+    global _switch_users, _switch_default
+    with _switch_lock:
+        if _switch_users == 0:
+            _switch_default = sys.getswitchinterval()
+            sys.setswitchinterval(min(_switch_default, interval))
+        _switch_users += 1
+
+
+def _restore_switch_interval():
+    global _switch_users
+    with _switch_lock:
+        _switch_users -= 1
+        if _switch_users == 0:
+            sys.setswitchinterval(_switch_default)
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_APP_ROOT):
+        filename = os.path.relpath(filename, _APP_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f"{filename}:{code.co_name}"
+
+
+class Sampler:
+    """Samples the stack of one thread from a background thread."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='hbnb-profiler', daemon=True)
+
+    def start(self):
+        _lower_switch_interval(self.interval)
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self.started
+        _restore_switch_interval()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(names))] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        """Stacks in the collapsed format, most sampled first."""
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+def _is_admin():
+    try:
+        verify_jwt_in_request(optional=True)
+        # Sans jeton, get_jwt() renvoie {} ; le drapeau admin est une claim (voir auth.py)
+        claims = get_jwt()
+    except Exception:
+        # Jeton absent ou invalide : la requête est servie sans profilage
+        return False
+    return bool(claims.get('is_admin'))
+
+
+class RequestProfiler:
+    """Wires the sampler into the app: before_request starts it, after_request reports."""
+
+    def __init__(self):
+        self._slots = None
+
+    def init_app(self, app):
+        if not app.config.get('PROFILER_ENABLED', True):
+            return
+        self._slots = threading.BoundedSemaphore(app.config.get('PROFILE_MAX_CONCURRENT', 1))
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+    def profile_dir(self):
+        return current_app.config.get('PROFILE_DIR') or os.path.join(tempfile.gettempdir(), 'hbnb-profiles')
+
+    def _before_request(self):
+        if HEADER not in request.headers or not _is_admin():
+            return
+        if not self._slots.acquire(blocking=False):
+            g.hbnb_profile = 'busy'
+            return
+        interval = current_app.config.get('PROFILE_INTERVAL_MS', 1) / 1000
+        g.hbnb_profile = Sampler(threading.get_ident(), interval).start()
+
+    def _after_request(self, response):
+        sampler = g.pop('hbnb_profile', None)
+        if sampler is None:
+            return response
+        if sampler == 'busy':
+            response.headers[HEADER] = 'busy'
+            return response
+        try:
+            sampler.stop()
+        finally:
+            self._slots.release()
+        response.headers[HEADER] = f'{sampler.samples} samples in {sampler.duration * 1000:.1f} ms'
+        if request.headers[HEADER].strip().lower() == 'inline':
+            status = response.status_code
+            response.set_data(sampler.collapsed())
+            response.mimetype = 'text/plain'
+            response.status_code = 200
+            response.headers['X-HBnB-Profile-Status'] = str(status)
+            # Le corps n'est plus celui de la ressource
+            response.headers.pop('ETag', None)
+            return response
+        name = self.store(sampler)
+        response.headers['X-HBnB-Profile-File'] = name
+        return response
+
+    def _teardown_request(self, exc):
+        # Requête terminée sans after_request (exception non gérée) : libérer l'échantillonneur
+        sampler = g.pop('hbnb_profile', None)
+        if isinstance(sampler, Sampler):
+            sampler.stop()
+            self._slots.release()
+
+    def store(self, sampler):
+        """Write the collapsed stacks under profile_dir() and return the file name."""
+        directory = self.profile_dir()
+        os.makedirs(directory, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S')
+        endpoint = (request.endpoint or 'unmatched').replace('.', '-').replace('/', '-')
+        name = f"{stamp}-{request.method}-{endpoint}-{uuid.uuid4().hex[:8]}.collapsed"
+        with open(os.path.join(directory, name), 'w') as f:
+            f.write(sampler.collapsed())
+        return name
+
+    def stored(self):
+        """Names of the stored profiles, newest first."""
+        directory = self.profile_dir()
+        if not os.path.isdir(directory):
+            return []
+        return sorted((name for name in os.listdir(directory) if name.endswith('.collapsed')), reverse=True)
+
+    def read(self, name):
+        """Content of a stored profile, None when it does not exist."""
+        if os.path.basename(name) != name or not name.endswith('.collapsed'):
+            return None
+        path = os.path.join(self.profile_dir(), name)
+        if not os.path.isfile(path):
+            return None
+        with open(path) as f:
+            return f.read()
+
+
+request_profiler = RequestProfiler()
@@ -1,6 +1,203 @@
-from app.models.place import Place
+import heapq
+
+from sqlalchemy import case, func, literal, or_, select, union_all
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app import db
+from app.models.place import Place, place_amenity
+from app.models.place_rating_stats import PlaceRatingStats
+from app.persistence import unit_of_work
+from app.persistence.geo import MAX_CELL_RANGES, bounding_box, cell_ranges, haversine_km
+from app.persistence.pagination import keyset_page
 from app.persistence.repository import SQLAlchemyRepository
 
+PLACE_SORTS = ('created', 'price_asc', 'price_desc', 'rating_desc')
+# Bornes supérieures des tranches de prix des facettes
+PRICE_BUCKETS = (50, 100, 200, 500)
+
+
+def check_search_filters(min_price=None, max_price=None, min_rating=None):
+    """Validate the filters of a place search."""
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise ValueError("min_price must not be greater than max_price")
+    if min_rating is not None and not 1 <= min_rating <= 5:
+        raise ValueError("min_rating must be between 1 and 5")
+
+
 class PlaceRepository(SQLAlchemyRepository):
     def __init__(self):
         super().__init__(Place)
+
+    def set_amenities(self, place, amenities):
+        """
+        Make place.amenities equal to amenities by writing only the difference.
+
+        Links already present are left alone: one DELETE for the removed
+        amenities, one INSERT for the added ones, in the current transaction.
+        """
+        table = place_amenity
+        if 'amenities' in place.__dict__:
+            current = {amenity.id for amenity in place.amenities}
+        else:
+            current = set(db.session.scalars(
+                select(table.c.amenity_id).where(table.c.place_id == place.id)))
+        wanted = {amenity.id for amenity in amenities}
+        removed, added = current - wanted, wanted - current
+        if removed:
+            db.session.execute(table.delete().where(
+                table.c.place_id == place.id, table.c.amenity_id.in_(removed)))
+        if added:
+            db.session.execute(table.insert(), [
+                {'place_id': place.id, 'amenity_id': amenity_id} for amenity_id in added])
+        # Collection alignée sans événement : l'ORM ne réécrit pas les liens au flush
+        set_committed_value(place, 'amenities', list(amenities))
+        unit_of_work.commit()
+        self._invalidate(place.id)
+        return added, removed
+
+    def _box_filters(self, min_lat, min_lng, max_lat, max_lng):
+        # Les plages de cellules passent par l'index ix_place_grid_cell, le reste affine la boîte
+        ranges = cell_ranges(min_lat, min_lng, max_lat, max_lng)
+        if len(ranges) <= MAX_CELL_RANGES:
+            cells = or_(*(Place.grid_cell.between(first, last) for first, last in ranges))
+        else:
+            # Boîte haute et étroite : une seule plage couvrant ses lignes, la longitude filtre le reste
+            cells = Place.grid_cell.between(ranges[0][0], ranges[-1][1])
+        if min_lng <= max_lng:
+            longitude = Place.longitude.between(min_lng, max_lng)
+        else:
+            longitude = or_(Place.longitude >= min_lng, Place.longitude <= max_lng)
+        return cells, Place.latitude.between(min_lat, max_lat), longitude
+
+    def get_in_box(self, min_lat, min_lng, max_lat, max_lng, limit, options=()):
+        """Places inside the bounding box, in grid order."""
+        # Sans ORDER BY/LIMIT en SQL : le planner garde alors les recherches d'index par plage de cellules
+        candidates = db.session.query(Place.grid_cell, Place.id).filter(
+            *self._box_filters(min_lat, min_lng, max_lat, max_lng))
+        return self._load_ordered([place_id for _, place_id in heapq.nsmallest(limit, candidates)], options)
+
+    def _load_ordered(self, place_ids, options):
+        if not place_ids:
+            return []
+        places = {place.id: place for place in self.model.query.options(*options)
+                  .filter(Place.id.in_(place_ids))}
+        return [places[place_id] for place_id in place_ids]
+
+    def get_within_radius(self, latitude, longitude, radius_km, limit, options=()):
+        """[(place, distance_km)] within radius_km of the point, nearest first."""
+        box = bounding_box(latitude, longitude, radius_km)
+        candidates = db.session.query(Place.id, Place.latitude, Place.longitude).filter(*self._box_filters(*box))
+        nearest = heapq.nsmallest(limit, (
+            (distance, place_id) for place_id, distance in (
+                (place_id, haversine_km(latitude, longitude, lat, lng)) for place_id, lat, lng in candidates)
+            if distance <= radius_km))
+        places = self._load_ordered([place_id for _, place_id in nearest], options)
+        return [(place, distance) for place, (distance, _) in zip(places, nearest)]
+
+    def _ratings(self):
+        # Moyennes lues dans les agrégats maintenus (place_rating_stats), pas recalculées
+        stats = PlaceRatingStats.__table__
+        average = stats.c.rating_sum * 1.0 / func.nullif(stats.c.review_count, 0)
+        return select(stats.c.place_id, average.label('avg_rating')).subquery('ratings')
+
+    def _search_filters(self, min_price, max_price, amenity_ids, min_rating, rating):
+        filters = []
+        if min_price is not None:
+            filters.append(Place.price >= min_price)
+        if max_price is not None:
+            filters.append(Place.price <= max_price)
+        if amenity_ids:
+            # Les lieux qui ont toutes les amenities demandées
+            with_all = (select(place_amenity.c.place_id)
+                        .where(place_amenity.c.amenity_id.in_(amenity_ids))
+                        .group_by(place_amenity.c.place_id)
+                        .having(func.count() == len(amenity_ids)))
+            filters.append(Place.id.in_(with_all))
+        if min_rating is not None:
+            filters.append(rating >= min_rating)
+        return filters
+
+    def search_query(self, query, sort='created', min_price=None, max_price=None, amenity_ids=(), min_rating=None):
+        """
+        Add the filters and the order of a search to `query`, a Place Query
+        or a select(Place) statement (the async reads of app/asgi.py).
+
+        Returns (query, columns, descending, key, filters, ratings): the
+        keyset arguments of the page and what facets_query() needs. With
+        the rating_desc sort, rows are (place, average rating) pairs.
+        """
+        if sort not in PLACE_SORTS:
+            raise ValueError(f"sort must be one of {', '.join(PLACE_SORTS)}")
+        amenity_ids = sorted(set(amenity_ids))
+        ratings = self._ratings() if min_rating is not None or sort == 'rating_desc' else None
+        rating = func.coalesce(ratings.c.avg_rating, 0.0) if ratings is not None else None
+        filters = self._search_filters(min_price, max_price, amenity_ids, min_rating, rating)
+
+        if ratings is not None:
+            query = query.outerjoin(ratings, ratings.c.place_id == Place.id)
+        query = query.filter(*filters)
+        key = None
+        if sort == 'created':
+            columns, descending = [Place.created_at, Place.id], False
+        elif sort in ('price_asc', 'price_desc'):
+            columns, descending = [Place.price, Place.created_at, Place.id], sort == 'price_desc'
+        else:
+            columns, descending = [rating, Place.created_at, Place.id], True
+            query = query.add_columns(rating)
+            key = lambda row: [row[1], row[0].created_at, row[0].id]
+        return query, columns, descending, key, filters, ratings
+
+    def search(self, limit, cursor=None, sort='created', min_price=None, max_price=None,
+               amenity_ids=(), min_rating=None, with_facets=False, options=()):
+        """
+        One keyset page of the places matching every filter, as a single query.
+
+        Returns (places, next_cursor, facets); facets is None unless asked.
+        """
+        query, columns, descending, key, filters, ratings = self.search_query(
+            self.model.query.options(*options), sort, min_price, max_price, amenity_ids, min_rating)
+        rows, next_cursor = keyset_page(query, columns, limit, cursor, descending, key)
+        if sort == 'rating_desc':
+            rows = [row[0] for row in rows]
+        facets = self._facets(filters, ratings) if with_facets else None
+        return rows, next_cursor, facets
+
+    def _facets(self, filters, ratings):
+        """Places per amenity and per price bucket among the matching places, in one statement."""
+        statement, labels = self.facets_query(filters, ratings)
+        return self.facet_counts(db.session.execute(statement), labels)
+
+    def facets_query(self, filters, ratings):
+        """
+        Statement counting the matching places per amenity and per price
+        bucket, and the labels of the buckets; see facet_counts().
+        """
+        matching = select(Place.id, Place.price)
+        if ratings is not None:
+            matching = matching.outerjoin(ratings, ratings.c.place_id == Place.id)
+        matching = matching.where(*filters).cte('matching')
+
+        labels = []
+        lower = 0
+        for upper in PRICE_BUCKETS:
+            labels.append(f'{lower}-{upper}')
+            lower = upper
+        labels.append(f'{lower}+')
+        bucket = case(*((matching.c.price < upper, label) for upper, label in zip(PRICE_BUCKETS, labels)),
+                      else_=labels[-1])
+
+        per_amenity = (select(literal('amenity').label('facet'), place_amenity.c.amenity_id.label('value'),
+                              func.count().label('count'))
+                       .where(place_amenity.c.place_id.in_(select(matching.c.id)))
+                       .group_by(place_amenity.c.amenity_id))
+        per_price = (select(literal('price').label('facet'), bucket.label('value'), func.count().label('count'))
+                     .select_from(matching).group_by(bucket))
+        return union_all(per_amenity, per_price), labels
+
+    @staticmethod
+    def facet_counts(rows, labels):
+        """Facets dict from the rows of facets_query(): {'amenities': {id: n}, 'price': {label: n}}."""
+        facets = {'amenities': {}, 'price': {label: 0 for label in labels}}
+        for facet, value, count in rows:
+            facets['amenities' if facet == 'amenity' else 'price'][value] = count
+        return facets
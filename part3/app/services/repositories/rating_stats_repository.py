@@ -0,0 +1,102 @@
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models.place_rating_stats import PlaceRatingStats
+from app.models.review import Review
+from app.persistence import unit_of_work
+from app.persistence.repository import SQLAlchemyRepository
+
+
+class RatingStatsRepository(SQLAlchemyRepository):
+    def __init__(self):
+        super().__init__(PlaceRatingStats)
+
+    def _add(self, place_id, values):
+        """
+        Add `values` ({column: increment}) to the row of a place, creating it if needed.
+
+        One INSERT ... ON CONFLICT DO UPDATE (ON DUPLICATE KEY UPDATE on
+        MySQL), so two first reviews of a place written concurrently both
+        land in the same row instead of the second INSERT failing.
+        """
+        table = PlaceRatingStats.__table__
+        row = {column.key: 0 for column in table.columns if column.key != 'place_id'}
+        row.update(values, place_id=place_id)
+        dialect = db.session.get_bind().dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            statement = (sqlite if dialect == 'sqlite' else postgresql).insert(table).values(row)
+            db.session.execute(statement.on_conflict_do_update(
+                index_elements=[table.c.place_id],
+                set_={key: table.c[key] + statement.excluded[key] for key in values}))
+        elif dialect in ('mysql', 'mariadb'):
+            statement = mysql.insert(table).values(row)
+            db.session.execute(statement.on_duplicate_key_update(
+                {key: table.c[key] + statement.inserted[key] for key in values}))
+        else:
+            increment = update(table).where(table.c.place_id == place_id).values(
+                {table.c[key]: table.c[key] + value for key, value in values.items()})
+            if db.session.execute(increment).rowcount == 0:
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(insert(table).values(row))
+                except IntegrityError:
+                    # Ligne créée entre-temps par une autre transaction
+                    db.session.execute(increment)
+        self._invalidate(place_id)
+
+    def apply(self, place_id, rating, delta=1):
+        """
+        Add (delta=1) or remove (delta=-1) one rating from the aggregates of a place.
+
+        Runs in the current transaction without committing, so the caller
+        commits it together with the review write.
+        """
+        if rating not in range(1, 6):
+            raise ValueError("rating must be between 1 and 5")
+        if delta > 0:
+            self._add(place_id, {'review_count': delta, 'rating_sum': delta * rating, f'rating_{rating}': delta})
+            return
+        table = PlaceRatingStats.__table__
+        bucket = table.c[f'rating_{rating}']
+        # UPDATE relatif : pas de lecture préalable, pas de mise à jour perdue
+        db.session.execute(
+            update(table).where(table.c.place_id == place_id).values({
+                table.c.review_count: table.c.review_count + delta,
+                table.c.rating_sum: table.c.rating_sum + delta * rating,
+                bucket: bucket + delta,
+            }))
+        self._invalidate(place_id)
+
+    def apply_many(self, ratings):
+        """Add a batch of (place_id, rating) pairs, one statement per place."""
+        per_place = {}
+        for place_id, rating in ratings:
+            if rating not in range(1, 6):
+                raise ValueError("rating must be between 1 and 5")
+            counts = per_place.setdefault(place_id, [0] * 6)
+            counts[rating] += 1
+        for place_id, counts in per_place.items():
+            values = {f'rating_{rating}': counts[rating] for rating in range(1, 6)}
+            values['review_count'] = sum(counts)
+            values['rating_sum'] = sum(rating * count for rating, count in enumerate(counts))
+            self._add(place_id, values)
+
+    def rebuild(self):
+        """Recompute every aggregate from the review table in a single GROUP BY pass."""
+        table = PlaceRatingStats.__table__
+        aggregates = select(
+            Review.place_id,
+            func.count(),
+            func.sum(Review.rating),
+            *(func.sum(case((Review.rating == rating, 1), else_=0)) for rating in range(1, 6))
+        ).group_by(Review.place_id)
+        db.session.execute(table.delete())
+        db.session.execute(insert(table).from_select(
+            ['place_id', 'review_count', 'rating_sum'] + [f'rating_{rating}' for rating in range(1, 6)],
+            aggregates))
+        unit_of_work.commit()
+        if self.cache is not None:
+            self.cache.clear()
+        return db.session.query(func.count()).select_from(table).scalar()
@@ -1,6 +1,24 @@
+from app import db
 from app.models.review import Review
 from app.persistence.repository import SQLAlchemyRepository
 
 class ReviewRepository(SQLAlchemyRepository):
     def __init__(self):
-        super().__init__(Review)
\ No newline at end of file
+        super().__init__(Review)
+
+    def get_by_place(self, place_id, limit, cursor=None):
+        """One keyset page of the reviews of a place, oldest first, and the next cursor."""
+        return self.get_page(limit, cursor, place_id=place_id)
+
+    def iter_by_place(self, place_id, batch_size=500):
+        """
+        Yield every review of a place, fetching batch_size rows at a time.
+
+        Rows are streamed from the cursor (yield_per) instead of being
+        loaded into one list, so memory stays bounded by the batch size.
+        """
+        statement = (db.select(Review).where(Review.place_id == place_id)
+                     .order_by(Review.created_at, Review.id)
+                     .execution_options(yield_per=batch_size))
+        for review in db.session.execute(statement).scalars():
+            yield review
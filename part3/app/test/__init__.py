@@ -0,0 +1,5 @@
+import os
+
+# Les tests qui appellent create_app() sans config utilisent la base de développement :
+# son schéma y est créé au démarrage, sans passer par `flask db-upgrade`
+os.environ.setdefault('AUTO_CREATE_SCHEMA', '1')
@@ -0,0 +1,111 @@
+from app import create_app, db
+from app.asgi import HBnBASGI
+from app.models.place import Place
+from app.models.review import Review
+from app.models.user import User
+from app.services.metrics import request_metrics
+from config import TestingConfig
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+
+class TestASGIReads(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        config = type('FileConfig', (TestingConfig,), {'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + self.path})
+        self.flask_app = create_app(config)
+        self.client = self.flask_app.test_client()
+        with self.flask_app.app_context():
+            owner = User(first_name="Asgi", last_name="Owner", email="asgi.owner@example.com", password="x")
+            guests = [User(first_name="Asgi", last_name="Guest", email="asgi.guest{}@example.com".format(i),
+                           password="x") for i in range(3)]
+            db.session.add_all([owner] + guests)
+            db.session.flush()
+            places = [Place(title="Asgi {}".format(i), description="", price=float(10 + i * 7 % 50),
+                            latitude=1.0, longitude=1.0, owner_id=owner.id) for i in range(12)]
+            db.session.add_all(places)
+            db.session.flush()
+            db.session.add_all([Review(text="Review {}".format(i), rating=1 + i, user_id=guest.id,
+                                       place_id=places[0].id) for i, guest in enumerate(guests)])
+            db.session.commit()
+            self.place_id = places[0].id
+        # Une seule boucle pour tout le test : les connexions du pool async y sont liées
+        self.runner = asyncio.Runner()
+        self.app = HBnBASGI(self.flask_app)
+
+    def tearDown(self):
+        self.runner.run(self.app.close())
+        self.runner.close()
+        os.remove(self.path)
+
+    def get(self, path, query='', headers=()):
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {'type': 'http', 'method': 'GET', 'path': path, 'query_string': query.encode(),
+                 'headers': [(name.lower().encode(), value.encode()) for name, value in headers],
+                 'http_version': '1.1', 'scheme': 'http', 'server': ('testserver', 80), 'client': ('127.0.0.1', 1)}
+        self.runner.run(self.app(scope, receive, send))
+        headers = {name.decode(): value.decode() for name, value in messages[0]['headers']}
+        return messages[0]['status'], headers, b''.join(message.get('body', b'') for message in messages[1:])
+
+    def assertSameAsFlask(self, path, query=''):
+        status, headers, body = self.get(path, query)
+        response = self.client.get(path + ('?' + query if query else ''))
+        self.assertEqual(status, response.status_code)
+        self.assertEqual(json.loads(body), response.get_json())
+        self.assertEqual(headers.get('etag'), response.headers.get('ETag'))
+        return json.loads(body)
+
+    def test_places_listing(self):
+        pages = 0
+        query = 'limit=5&sort=price_desc'
+        while query:
+            body = self.assertSameAsFlask('/api/v1/places/', query)
+            pages += 1
+            query = 'limit=5&sort=price_desc&cursor=' + body['next_cursor'] if body['next_cursor'] else ''
+        self.assertEqual(pages, 3)
+        self.assertSameAsFlask('/api/v1/places/', 'sort=rating_desc&facets=true&min_price=20')
+        # ----- same validation errors as the sync handler -----
+        for query in ('limit=abc', 'sort=nope', 'cursor=nope', 'min_price=50&max_price=10'):
+            self.assertSameAsFlask('/api/v1/places/', query)
+
+    def test_place_detail(self):
+        self.assertSameAsFlask('/api/v1/places/' + self.place_id)
+        status, headers, _ = self.get('/api/v1/places/' + self.place_id)
+        status, _, body = self.get('/api/v1/places/' + self.place_id, headers=[('If-None-Match', headers['etag'])])
+        self.assertEqual((status, body), (304, b''))
+        self.assertEqual(self.get('/api/v1/places/nope')[0], 404)
+
+    def test_place_reviews(self):
+        body = self.assertSameAsFlask('/api/v1/reviews/places/{}/reviews'.format(self.place_id), 'limit=2')
+        self.assertEqual(len(body['reviews']), 2)
+        self.assertSameAsFlask('/api/v1/reviews/places/nope/reviews')
+
+    def test_other_requests_go_to_flask(self):
+        status, _, body = self.get('/api/v1/reviews/places/{}/reviews'.format(self.place_id), 'stream=true')
+        self.assertEqual(status, 200)
+        self.assertEqual(len(json.loads(body)), 3)
+        self.assertSameAsFlask('/api/v1/amenities/')
+        # ----- Flask routing: the redirect to the trailing slash -----
+        self.assertEqual(self.get('/api/v1/places')[0], 308)
+
+    def test_requests_are_measured(self):
+        request_metrics.reset()
+        self.get('/api/v1/places/' + self.place_id)
+        route = ('GET', '/api/v1/places/<string:place_id>')
+        self.assertEqual(request_metrics.requests[route + (200,)], 1)
+        self.assertGreater(request_metrics.sql_statements[route], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+from app import create_app
+from app.test.helpers import auth_headers
+from flask_jwt_extended import decode_token
+import unittest
+
+
+class TestLogin(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.client = self.app.test_client()
+
+    def test_token_subject_is_the_user_id(self):
+        headers = auth_headers(self.app, is_admin=True)
+        with self.app.app_context():
+            claims = decode_token(headers['Authorization'].split()[1])
+        self.assertIsInstance(claims["sub"], str)
+        self.assertTrue(claims["is_admin"])
+
+    def test_admin_claim_gates_admin_routes(self):
+        response = self.client.post('/api/v1/amenities/', json={"name": "Wifi"},
+                                    headers=auth_headers(self.app, is_admin=True))
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post('/api/v1/amenities/', json={"name": "Wifi"},
+                                    headers=auth_headers(self.app))
+        self.assertEqual(response.status_code, 403)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,197 @@
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.persistence.cache import InProcessCacheBackend, LRUCache, RedisCacheBackend
+from app.services import facade
+from app.test.helpers import RespStandIn, count_queries, make_place, make_user
+import threading
+import time
+import unittest
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        # ----- "b" is the least recently used -----
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_ttl_expiry(self):
+        cache = LRUCache(maxsize=2, ttl=-1)
+        cache.set("a", 1)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_fill_refused_after_invalidation(self):
+        cache = LRUCache(maxsize=2)
+        generation = cache.generation()
+        cache.delete("a")
+        self.assertFalse(cache.set("a", "stale", generation=generation))
+        self.assertIsNone(cache.get("a"))
+        self.assertTrue(cache.set("a", "fresh", generation=cache.generation()))
+        self.assertEqual(cache.get("a"), "fresh")
+
+
+class TestRepositoryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        facade.enable_cache('amenity', maxsize=16)
+
+    def tearDown(self):
+        facade.disable_cache('amenity')
+
+    def test_get_hits_cache_and_update_invalidates(self):
+        with self.app.app_context():
+            amenity = facade.create_amenity({"name": "Sauna"})
+            facade.get_amenity(amenity.id)
+            db.session.remove()
+            # ----- second read is served without SQL -----
+            with count_queries(db.engine) as statements:
+                cached = facade.get_amenity(amenity.id)
+            self.assertEqual(statements, [])
+            self.assertEqual(cached.name, "Sauna")
+            self.assertEqual(facade.cache_stats()["amenity"]["hits"], 1)
+            # ----- a write drops the entry -----
+            facade.amenity_repo.update(amenity.id, {"name": "Hammam"})
+            db.session.remove()
+            self.assertEqual(facade.get_amenity(amenity.id).name, "Hammam")
+
+    def test_default_ttl_is_finite(self):
+        self.assertIsNotNone(facade.amenity_repo.cache.ttl)
+
+    def test_read_overlapping_a_write_is_not_cached(self):
+        repo = facade.amenity_repo
+        snapshot = repo._snapshot
+
+        def snapshot_then_invalidate(obj):
+            state = snapshot(obj)
+            # ----- a writer commits after the SELECT, before the fill -----
+            repo._invalidate(obj.id)
+            return state
+
+        with self.app.app_context():
+            amenity = facade.create_amenity({"name": "Sauna"})
+            db.session.remove()
+            repo._snapshot = snapshot_then_invalidate
+            try:
+                self.assertEqual(facade.get_amenity(amenity.id).name, "Sauna")
+            finally:
+                del repo._snapshot
+            self.assertIsNone(repo.cache.get(repo._cache_key(amenity.id)))
+
+
+class TestRedisCacheBackend(unittest.TestCase):
+
+    def setUp(self):
+        self.server = RespStandIn()
+
+    def tearDown(self):
+        self.server.close()
+
+    def test_shared_between_workers(self):
+        worker_a = RedisCacheBackend(port=self.server.port)
+        worker_b = RedisCacheBackend(port=self.server.port)
+        received = []
+        done = threading.Event()
+        worker_b.subscribe(lambda keys: (received.extend(keys), done.set()))
+        time.sleep(0.2)
+        worker_a.set("place:1", '{"id": "1"}')
+        self.assertEqual(worker_b.get("place:1"), '{"id": "1"}')
+        # ----- invalidation reaches the other worker -----
+        worker_a.delete("place:1")
+        self.assertTrue(done.wait(2))
+        self.assertEqual(received, ["place:1"])
+        self.assertIsNone(worker_b.get("place:1"))
+
+    def test_subscribe_once_and_unsubscribe(self):
+        backend = RedisCacheBackend(port=self.server.port)
+        received = []
+        done = threading.Event()
+
+        def callback(keys):
+            received.extend(keys)
+            done.set()
+
+        backend.subscribe(callback)
+        backend.subscribe(callback)
+        time.sleep(0.2)
+        self.assertEqual(len(self.server.subscribers[b"hbnb:invalidate"]), 1)
+        backend.delete("place:1")
+        self.assertTrue(done.wait(2))
+        self.assertEqual(received, ["place:1"])
+        # ----- the listener closes its connection and stops -----
+        backend.unsubscribe(callback)
+        deadline = time.monotonic() + 2
+        while self.server.subscribers[b"hbnb:invalidate"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.server.subscribers[b"hbnb:invalidate"], [])
+
+    def test_server_down_is_a_miss(self):
+        backend = RedisCacheBackend(port=self.server.port)
+        self.server.close()
+        self.assertIsNone(backend.get("place:1"))
+
+
+class TestPayloadCache(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        facade.set_cache_backend(InProcessCacheBackend())
+
+    def tearDown(self):
+        facade.set_cache_backend(None)
+
+    def test_get_served_from_cache_until_update(self):
+        with self.app.app_context():
+            amenity = facade.create_amenity({"name": "Jacuzzi"})
+            engine = db.engine
+        response = self.client_get(amenity.id)
+        self.assertEqual(response.get_json()["name"], "Jacuzzi")
+        # ----- cached: no SQL -----
+        with count_queries(engine) as statements:
+            response = self.client_get(amenity.id)
+        self.assertEqual(statements, [])
+        self.assertEqual(response.get_json()["name"], "Jacuzzi")
+        # ----- update_amenity invalidates -----
+        with self.app.app_context():
+            facade.update_amenity(amenity.id, {"name": "Spa"})
+        self.assertEqual(self.client_get(amenity.id).get_json()["name"], "Spa")
+
+    def test_replaced_backend_is_unsubscribed(self):
+        first = facade.cache_backend
+        facade.set_cache_backend(first)
+        self.assertEqual(first._subscribers, [facade._on_invalidate])
+        create_app()
+        self.assertEqual(first._subscribers, [])
+
+    def test_amenity_update_invalidates_its_places(self):
+        with self.app.app_context():
+            amenity = facade.create_amenity({"name": "Piscine"})
+            place = make_place(make_user(), title="Cached")
+            place.amenities.append(amenity)
+            db.session.commit()
+            place_id, amenity_id = place.id, amenity.id
+        client = self.app.test_client()
+        first = client.get('/api/v1/places/{}'.format(place_id))
+        self.assertEqual([a["name"] for a in first.get_json()["amenities"]], ["Piscine"])
+        self.assertEqual(client.get('/api/v1/places/{}'.format(place_id)).headers["ETag"], first.headers["ETag"])
+        # ----- the place body embeds the amenity name -----
+        with self.app.app_context():
+            facade.update_amenity(amenity_id, {"name": "Piscine chauffée"})
+        response = client.get('/api/v1/places/{}'.format(place_id))
+        self.assertEqual([a["name"] for a in response.get_json()["amenities"]], ["Piscine chauffée"])
+        self.assertNotEqual(response.headers["ETag"], first.headers["ETag"])
+
+    def client_get(self, amenity_id):
+        response = self.app.test_client().get('/api/v1/amenities/{}'.format(amenity_id))
+        self.assertEqual(response.status_code, 200)
+        return response
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+from app import create_app, db
+from app.models.user import User
+from app.persistence.engine import TimedQueuePool, engine_options, pool_metrics
+from app.services import facade
+from app.test.helpers import auth_headers, make_user
+from config import ProductionConfig, TestingConfig
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+import os
+import tempfile
+import unittest
+
+
+class TestEngineProfile(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+
+    def tearDown(self):
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def file_config(self, **overrides):
+        return type('FileConfig', (TestingConfig,), dict(SQLALCHEMY_DATABASE_URI='sqlite:///' + self.path, **overrides))
+
+    def test_engine_options(self):
+        # ----- in-memory SQLite keeps its single connection -----
+        self.assertEqual(engine_options({'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:'}), {})
+        options = engine_options(vars(ProductionConfig) | {'SQLALCHEMY_DATABASE_URI': 'postgresql://u:p@db/hbnb'})
+        self.assertIs(options['poolclass'], TimedQueuePool)
+        self.assertEqual(options['pool_size'], ProductionConfig.DB_POOL_SIZE)
+        self.assertEqual(options['pool_recycle'], ProductionConfig.DB_POOL_RECYCLE)
+        self.assertTrue(options['pool_pre_ping'])
+        # ----- options set by hand win -----
+        options = engine_options({'SQLALCHEMY_DATABASE_URI': 'sqlite:///x.db', 'SQLALCHEMY_ENGINE_OPTIONS': {'pool_size': 1}})
+        self.assertEqual(options['pool_size'], 1)
+
+    def test_sqlite_pragmas(self):
+        app = create_app(self.file_config())
+        with app.app_context():
+            connection = db.session.connection()
+            self.assertEqual(connection.execute(text('PRAGMA journal_mode')).scalar(), 'wal')
+            self.assertEqual(connection.execute(text('PRAGMA synchronous')).scalar(), 1)
+            self.assertEqual(connection.execute(text('PRAGMA busy_timeout')).scalar(), 5000)
+            self.assertIsInstance(db.engine.pool, TimedQueuePool)
+            db.session.remove()
+            db.engine.dispose()
+
+    def test_pool_metrics(self):
+        app = create_app(self.file_config(DB_POOL_SIZE=1, DB_MAX_OVERFLOW=0, DB_POOL_TIMEOUT=0.05))
+        with app.app_context():
+            engine = db.engine
+            pool_metrics.reset()
+            held = engine.connect()
+            self.assertEqual(pool_metrics.stats(engine)['checked_out'], 1)
+            with self.assertRaises(PoolTimeout):
+                engine.connect()
+            held.close()
+            stats = pool_metrics.stats(engine)
+            self.assertEqual(stats['checkouts'], 1)
+            self.assertEqual(stats['checkout_timeouts'], 1)
+            self.assertEqual(stats['checked_out'], 0)
+            engine.dispose()
+
+    def test_write_after_a_read_and_a_concurrent_commit(self):
+        app = create_app(self.file_config())
+        with app.app_context():
+            user_id = make_user().id
+            db.session.commit()
+            # ----- the request reads first: a deferred transaction stays open -----
+            facade.get_user(user_id)
+            # ----- another writer commits meanwhile (WAL: readers do not block it) -----
+            with db.engine.begin() as connection:
+                connection.execute(User.__table__.update().where(User.id == user_id).values(first_name="Other"))
+            with facade.transaction():
+                facade.user_repo.update(user_id, {"last_name": "Writer"})
+            db.session.remove()
+            user = db.session.get(User, user_id)
+            self.assertEqual((user.first_name, user.last_name), ("Other", "Writer"))
+            db.session.remove()
+            db.engine.dispose()
+
+    def test_db_pool_endpoint_requires_admin(self):
+        app = create_app(self.file_config())
+        client = app.test_client()
+        response = client.get('/api/v1/admin/db-pool', headers=auth_headers(app, is_admin=True))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('checked_out', response.get_json())
+        response = client.get('/api/v1/admin/db-pool', headers=auth_headers(app))
+        self.assertEqual(response.status_code, 403)
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+    def test_startup_touches_no_database(self):
+        pool_metrics.reset()
+        app = create_app(self.file_config(AUTO_CREATE_SCHEMA=False))
+        self.assertEqual(pool_metrics.stats()['connects'], 0)
+        runner = app.test_cli_runner()
+        with app.app_context():
+            self.assertEqual(inspect(db.engine).get_table_names(), [])
+            self.assertIn("Database schema at version", runner.invoke(args=["init-db"]).output)
+            self.assertIn('place_rating_stats', inspect(db.engine).get_table_names())
+            # ----- the admin account comes from the CLI, once -----
+            result = runner.invoke(args=['create-admin', '--email', 'root@example.com', '--password', 'toto'])
+            self.assertIn("created", result.output)
+            result = runner.invoke(args=['create-admin', '--email', 'root@example.com', '--password', 'toto'])
+            self.assertIn("already exists", result.output)
+            admin = User.query.filter_by(email='root@example.com').one()
+            self.assertTrue(admin.is_admin)
+            self.assertTrue(admin.verify_password('toto'))
+            db.session.remove()
+            db.engine.dispose()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+from contextlib import contextmanager
+import uuid
+
+from sqlalchemy import event
+
+
+@contextmanager
+def count_queries(engine):
+    """Collect the SQL statements executed on `engine` inside the block."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def make_user(**fields):
+    """Add a user with a unique email (tests built on the default config share one database file)."""
+    from app import db
+    from app.models.user import User
+
+    values = {'first_name': "Test", 'last_name': "User", 'password': "x",
+              'email': "user.{}@example.com".format(uuid.uuid4().hex)}
+    values.update(fields)
+    user = User(**values)
+    db.session.add(user)
+    db.session.flush()
+    return user
+
+
+def make_place(owner, **fields):
+    """Add a place of owner; the caller commits."""
+    from app import db
+    from app.models.place import Place
+
+    values = {'title': "Place", 'description': "", 'price': 10.0, 'latitude': 0.0, 'longitude': 0.0}
+    values.update(fields)
+    place = Place(owner_id=owner.id, **values)
+    db.session.add(place)
+    return place
+
+
+def auth_headers(app, is_admin=False, password="toto"):
+    """Create a user and log it in through /api/v1/auth/login; returns the Authorization header."""
+    from app import db
+
+    with app.app_context():
+        user = make_user(is_admin=is_admin)
+        user.hash_password(password)
+        email = user.email
+        db.session.commit()
+    response = app.test_client().post('/api/v1/auth/login', json={"email": email, "password": password})
+    return {'Authorization': 'Bearer {}'.format(response.get_json()["access_token"])}
+
+
+class RespStandIn:
+    """
+    Minimal in-process Redis stand-in (GET, SET, DEL, PUBLISH, SUBSCRIBE)
+    to test RedisCacheBackend without a Redis server.
+    """
+
+    def __init__(self):
+        import socketserver
+        import threading
+        from app.persistence.cache import _encode_command, _read_reply
+
+        store = self.store = {}
+        subscribers = self.subscribers = {}
+        lock = threading.Lock()
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, data):
+                self.wfile.write(data)
+                self.wfile.flush()
+
+            def handle(self):
+                while True:
+                    try:
+                        command = _read_reply(self.rfile)
+                    except (OSError, ValueError):
+                        # Connexion fermée : plus de messages pour cet abonné
+                        with lock:
+                            for targets in subscribers.values():
+                                if self.wfile in targets:
+                                    targets.remove(self.wfile)
+                        return
+                    name, args = command[0].upper(), command[1:]
+                    with lock:
+                        if name == b'GET':
+                            value = store.get(args[0])
+                            out = b'$-1\r\n' if value is None else b'$%d\r\n%s\r\n' % (len(value), value)
+                        elif name == b'SET':
+                            store[args[0]] = args[1]
+                            out = b'+OK\r\n'
+                        elif name == b'DEL':
+                            out = b':%d\r\n' % sum(store.pop(key, None) is not None for key in args)
+                        elif name == b'PUBLISH':
+                            targets = subscribers.get(args[0], [])
+                            for wfile in targets:
+                                wfile.write(_encode_command([b'message', args[0], args[1]]))
+                                wfile.flush()
+                            out = b':%d\r\n' % len(targets)
+                        elif name == b'SUBSCRIBE':
+                            subscribers.setdefault(args[0], []).append(self.wfile)
+                            out = b'*3\r\n$9\r\nsubscribe\r\n$%d\r\n%s\r\n:1\r\n' % (len(args[0]), args[0])
+                        else:
+                            out = b'+PONG\r\n'
+                        self.reply(out)
+
+        class Server(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            daemon_threads = True
+
+        self.server = Server(('127.0.0.1', 0), Handler)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,64 @@
+from app import create_app, db
+from app.persistence.engine import pool_metrics
+from app.services.metrics import Histogram, request_metrics
+from app.services.password_pool import password_pool
+from app.test.helpers import auth_headers, make_place, make_user
+from config import TestingConfig
+import unittest
+
+
+class TestRequestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            make_place(make_user(), title="Metrics")
+            db.session.commit()
+        request_metrics.reset()
+
+    def sample(self, body, prefix):
+        for line in body.splitlines():
+            if line.startswith(prefix + ' '):
+                return float(line.rsplit(' ', 1)[1])
+        self.fail('{} not found'.format(prefix))
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        self.assertEqual(list(histogram.samples()), [(0.1, 2), (1.0, 3), ('+Inf', 4)])
+        self.assertEqual(histogram.count, 4)
+
+    def test_request_metrics(self):
+        for _ in range(2):
+            self.assertEqual(self.client.get('/api/v1/places/').status_code, 200)
+        self.assertEqual(self.client.get('/api/v1/reviews/nope').status_code, 404)
+        # ----- the endpoint is for admins only -----
+        self.assertEqual(self.client.get('/api/v1/admin/metrics').status_code, 401)
+        with self.app.app_context():
+            body = request_metrics.render({'hbnb_db_pool': pool_metrics.stats(db.engine),
+                                           'hbnb_password_pool': password_pool.stats()})
+        route = 'method="GET",route="/api/v1/places/"'
+        self.assertEqual(self.sample(body, 'hbnb_http_requests_total{%s,status="200"}' % route), 2)
+        self.assertEqual(self.sample(body, 'hbnb_http_request_duration_seconds_bucket{%s,le="+Inf"}' % route), 2)
+        self.assertEqual(self.sample(body, 'hbnb_http_request_duration_seconds_count{%s}' % route), 2)
+        self.assertGreater(self.sample(body, 'hbnb_http_request_sql_statements_total{%s}' % route), 0)
+        self.assertGreater(self.sample(body, 'hbnb_http_request_serialization_seconds_total{%s}' % route), 0)
+        self.assertIn('hbnb_http_requests_total{method="GET",route="/api/v1/reviews/<review_id>",status="404"} 1', body)
+        self.assertIn('# TYPE hbnb_sql_statement_duration_seconds histogram', body)
+        self.assertIn('hbnb_db_pool_checkouts ', body)
+        self.assertIn('hbnb_password_pool_pending 0', body)
+
+    def test_metrics_endpoint_requires_admin(self):
+        self.assertEqual(self.client.get('/api/v1/places/').status_code, 200)
+        response = self.client.get('/api/v1/admin/metrics', headers=auth_headers(self.app, is_admin=True))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        self.assertIn('hbnb_http_requests_total{method="GET",route="/api/v1/places/",status="200"} 1',
+                      response.get_data(as_text=True))
+        response = self.client.get('/api/v1/admin/metrics', headers=auth_headers(self.app))
+        self.assertEqual(response.status_code, 403)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+from app import create_app, db, migrations
+from app.migrations import schema_check
+from app.migrations.v0004_lookup_indexes import INDEXES
+from app.persistence.geo import grid_cell
+from config import TestingConfig
+from sqlalchemy import inspect, text
+import os
+import tempfile
+import unittest
+
+
+class TestMigrations(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        config = type('MigrationConfig', (TestingConfig,), {
+            'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + self.path, 'AUTO_CREATE_SCHEMA': False})
+        self.app = create_app(config)
+        self.context = self.app.app_context()
+        self.context.push()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.context.pop()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def index_names(self, table):
+        return {index['name'] for index in inspect(db.engine).get_indexes(table)}
+
+    def test_upgrade_fresh_database(self):
+        latest = migrations.load_migrations()[-1].version
+        self.assertEqual(migrations.current_version(db.engine), 0)
+        self.assertEqual(len(migrations.upgrade(db.engine)), latest)
+        self.assertEqual(migrations.current_version(db.engine), latest)
+        for name, table, _ in INDEXES:
+            self.assertIn(name, self.index_names(table))
+        # ----- nothing left to apply -----
+        self.assertEqual(migrations.upgrade(db.engine), [])
+
+    def test_upgrade_legacy_database(self):
+        # ----- a database created by the first releases: no grid_cell, no stats, no indexes -----
+        migrations.upgrade(db.engine, target=1)
+        self.assertNotIn('grid_cell', {column['name'] for column in inspect(db.engine).get_columns('place')})
+        self.assertFalse(inspect(db.engine).has_table('place_rating_stats'))
+        self.assertEqual(self.index_names('place'), set())
+        with db.engine.begin() as connection:
+            connection.execute(text("INSERT INTO user (id, first_name, last_name, email, password, is_admin) "
+                                    "VALUES ('u1', 'Old', 'Owner', 'old@example.com', 'x', 0)"))
+            connection.execute(text("INSERT INTO place (id, title, description, price, latitude, longitude, owner_id) "
+                                    "VALUES ('p1', 'Old', '', 10.0, 48.85, 2.35, 'u1')"))
+            connection.execute(text("INSERT INTO review (id, text, rating, user_id, place_id) "
+                                    "VALUES ('r1', 'Fine', 4, 'u1', 'p1')"))
+        migrations.upgrade(db.engine)
+        with db.engine.connect() as connection:
+            self.assertEqual(connection.execute(text("SELECT grid_cell FROM place")).scalar(), grid_cell(48.85, 2.35))
+            self.assertEqual(connection.execute(text("SELECT review_count, rating_4 FROM place_rating_stats")).one(), (1, 1))
+            plan = connection.execute(text("EXPLAIN QUERY PLAN SELECT id FROM place WHERE owner_id = 'u1'")).all()
+            self.assertIn('ix_place_owner_id', ' '.join(str(row[-1]) for row in plan))
+
+    def test_migrations_build_the_models_schema(self):
+        # ----- a model change without its migration fails here -----
+        migrations.upgrade(db.engine)
+        inspector = inspect(db.engine)
+        for name, table in db.metadata.tables.items():
+            self.assertEqual({column['name'] for column in inspector.get_columns(name)},
+                             {column.name for column in table.columns}, name)
+            self.assertEqual(self.index_names(name), {index.name for index in table.indexes}, name)
+
+    def test_models_match_sql_schema(self):
+        with open(schema_check.SQL_SCHEMA_PATH) as f:
+            sql = f.read()
+        self.assertEqual(schema_check.compare(db.metadata, sql), [])
+        sql = sql.replace('    INDEX ix_place_owner_id (owner_id),\n', '')
+        self.assertIn("places: foreign key owner_id has no index in the SQL schema",
+                      schema_check.compare(db.metadata, sql))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+from app import create_app, bcrypt
+from app.services import facade
+from app.models.user import User
+from app.services.password_pool import PasswordPool, PasswordPoolSaturated, password_pool
+from app.test.helpers import auth_headers
+import threading
+import time
+import unittest
+from unittest import mock
+
+
+class TestPasswordPool(unittest.TestCase):
+
+    def test_hash_and_verify_inline(self):
+        pool = PasswordPool(workers=0, rounds=4)
+        hashed = pool.hash("toto")
+        self.assertTrue(hashed.startswith("$2b$04$"))
+        self.assertTrue(pool.verify(hashed, "toto"))
+        self.assertFalse(pool.verify(hashed, "tata"))
+        # ----- not a bcrypt hash -----
+        self.assertFalse(pool.verify("plain", "plain"))
+        self.assertEqual(pool.stats()["completed"], 4)
+
+    def test_hash_and_verify_in_workers(self):
+        pool = PasswordPool(workers=1, rounds=4)
+        try:
+            hashed = pool.hash("toto")
+            self.assertTrue(pool.verify(hashed, "toto"))
+            # ----- hashes written by Flask-Bcrypt still verify -----
+            app = create_app()
+            with app.app_context():
+                self.assertTrue(pool.verify(bcrypt.generate_password_hash("toto").decode('utf-8'), "toto"))
+        finally:
+            pool.shutdown()
+
+    def test_saturation(self):
+        pool = PasswordPool(workers=0, max_pending=1, rounds=4)
+        started, release = threading.Event(), threading.Event()
+
+        def slow(password):
+            started.set()
+            release.wait()
+            return password
+
+        thread = threading.Thread(target=pool._submit, args=(slow, "x"))
+        thread.start()
+        started.wait()
+        self.assertEqual(pool.stats()["pending"], 1)
+        with self.assertRaises(PasswordPoolSaturated):
+            pool.hash("toto")
+        release.set()
+        thread.join()
+        self.assertEqual(pool.stats()["pending"], 0)
+        self.assertEqual(pool.stats()["rejected"], 1)
+
+    def test_timeout_keeps_the_slot_until_the_worker_is_done(self):
+        pool = PasswordPool(workers=1, max_pending=1, rounds=4, timeout=0.05)
+        try:
+            with self.assertRaises(PasswordPoolSaturated):
+                pool._submit(time.sleep, 1)
+            # ----- the worker is still busy: its slot is not handed out again -----
+            self.assertEqual(pool.stats()["pending"], 1)
+            with self.assertRaises(PasswordPoolSaturated):
+                pool.hash("toto")
+            deadline = time.monotonic() + 10
+            while pool.stats()["pending"] and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(pool.stats()["pending"], 0)
+            pool.timeout = 10.0
+            self.assertTrue(pool.verify(pool.hash("toto"), "toto"))
+        finally:
+            pool.shutdown()
+
+    def test_user_uses_configured_pool(self):
+        create_app()
+        user = User(first_name="Pool", last_name="User", email="pool.user@example.com", password="x")
+        user.hash_password("toto")
+        self.assertTrue(user.verify_password("toto"))
+        self.assertEqual(password_pool.rounds, int(user.password.split("$")[2]))
+
+    def test_saturated_pool_answers_429(self):
+        app = create_app("config.TestingConfig")
+        password_pool.configure(workers=0, max_pending=1, rounds=4)
+        user = User(first_name="Pool", last_name="User", email="pool.user@example.com", password="x")
+        user.hash_password("toto")
+        started, release = threading.Event(), threading.Event()
+
+        def slow():
+            started.set()
+            release.wait()
+
+        thread = threading.Thread(target=password_pool._submit, args=(slow,))
+        thread.start()
+        started.wait()
+        try:
+            with mock.patch.object(facade, 'get_user_by_email', return_value=user):
+                response = app.test_client().post('/api/v1/auth/login',
+                                                  json={"email": user.email, "password": "toto"})
+        finally:
+            release.set()
+            thread.join()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers.get('Retry-After'), '1')
+        self.assertIn('error', response.get_json())
+
+    def test_stats_endpoint_requires_admin(self):
+        app = create_app()
+        client = app.test_client()
+        response = client.get('/api/v1/admin/password-pool', headers=auth_headers(app, is_admin=True))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.get_json()), set(password_pool.stats()))
+        response = client.get('/api/v1/admin/password-pool', headers=auth_headers(app))
+        self.assertEqual(response.status_code, 403)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,10 @@
-from app import create_app
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.test.helpers import count_queries, make_place, make_user
+from app.services import facade
+import base64
+import json
 import unittest
 
 class TestUserEndpoints(unittest.TestCase):
@@ -223,5 +229,248 @@ class TestUserEndpoints(unittest.TestCase):
         })
         self.assertEqual(response.status_code, 403)
 
+    #===============================================================
+    # ----- test cursor pagination of the places list -----
+    #===============================================================
+    def test_get_places_pages(self):
+        with self.app.app_context():
+            owner = make_user()
+            for i in range(5):
+                make_place(owner, title="Page {}".format(i), price=10.0 + i)
+            db.session.commit()
+        seen = []
+        cursor = None
+        while True:
+            url = '/api/v1/places/?limit=2' + ('&cursor={}'.format(cursor) if cursor else '')
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            page = response.get_json()
+            self.assertLessEqual(len(page["places"]), 2)
+            seen.extend(place["id"] for place in page["places"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        # ----- every place exactly once -----
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertGreaterEqual(len(seen), 5)
+        # ----- invalid cursor and page size -----
+        response = self.client.get('/api/v1/places/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/v1/places/?limit=0')
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_places_tampered_cursor(self):
+        for values in (["2024-01-01T00:00:00", {"a": 1}], [["2024-01-01T00:00:00"], "x"], ["2024-01-01T00:00:00", 3]):
+            cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+            response = self.client.get('/api/v1/places/?cursor={}'.format(cursor))
+            self.assertEqual(response.status_code, 400)
+
+    #===============================================================
+    # ----- test the places list doesn't issue N+1 queries -----
+    #===============================================================
+    def test_get_places_query_count(self):
+        with self.app.app_context():
+            owner = make_user()
+            amenities = [Amenity(name="Count {}".format(i)) for i in range(3)]
+            db.session.add_all(amenities)
+            for i in range(10):
+                make_place(owner, title="Count {}".format(i)).amenities = amenities
+            db.session.commit()
+            engine = db.engine
+        counts = []
+        for limit in (2, 10):
+            with count_queries(engine) as statements:
+                response = self.client.get('/api/v1/places/?limit={}'.format(limit))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.get_json()["places"]), limit)
+            counts.append(len(statements))
+        # ----- same number of statements whatever the page size -----
+        self.assertEqual(counts[0], counts[1])
+
+    #===============================================================
+    # ----- test bulk creation with per-item errors -----
+    #===============================================================
+    def test_create_places_bulk(self):
+        with self.app.app_context():
+            owner = make_user()
+            amenity = Amenity(name="Bulk wifi")
+            db.session.add(amenity)
+            db.session.commit()
+            owner_id, amenity_id = owner.id, amenity.id
+            created, errors = facade.create_places([
+                {"title": "Bulk 1", "price": 10.0, "latitude": 1.0, "longitude": 1.0, "amenities": [amenity_id]},
+                {"title": "Bulk 2", "price": -1.0, "latitude": 1.0, "longitude": 1.0},
+                {"title": "Bulk 3", "price": 10.0, "latitude": 1.0, "longitude": 1.0, "amenities": ["nope"]},
+                {"title": "Bulk 4", "price": 10.0, "latitude": 1.0},
+                {"title": "Bulk 5", "price": 20.0, "latitude": 2.0, "longitude": 2.0},
+            ], owner_id)
+            self.assertEqual([place.title for place in created], ["Bulk 1", "Bulk 5"])
+            self.assertEqual([error["index"] for error in errors], [1, 2, 3])
+            db.session.remove()
+            place = facade.get_place(created[0].id)
+            self.assertEqual([a.id for a in place.amenities], [amenity_id])
+            self.assertEqual(place.owner_id, owner_id)
+
+    #===============================================================
+    # ----- test amenities resolved in one query, links diffed -----
+    #===============================================================
+    def test_place_amenities_query_count(self):
+        with self.app.app_context():
+            owner = make_user()
+            amenities = [Amenity(name="Amen {}".format(i)) for i in range(40)]
+            db.session.add_all(amenities)
+            db.session.commit()
+            owner_id, ids = owner.id, [a.id for a in amenities]
+            engine = db.engine
+            with count_queries(engine) as statements:
+                place = facade.create_place({"title": "Amen", "description": "", "price": 10.0, "latitude": 1.0,
+                                             "longitude": 1.0, "owner_id": owner_id, "amenities": ids})
+            selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+            self.assertEqual(len(selects), 1)
+            self.assertLess(len(statements), 6)
+            place_id = place.id
+            # ----- missing ids are all reported at once -----
+            with self.assertRaises(ValueError) as error:
+                facade.update_place(place_id, {"amenities": ids[:2] + ["nope-1", "nope-2"]})
+            self.assertIn("nope-1, nope-2", str(error.exception))
+            db.session.remove()
+            # ----- only the changed links are written -----
+            with count_queries(engine) as statements:
+                facade.update_place(place_id, {"amenities": ids[5:]})
+            writes = [s for s in statements if s.lstrip().upper().startswith(("INSERT", "DELETE"))]
+            self.assertEqual(len(writes), 1)
+            self.assertIn("DELETE FROM place_amenity", writes[0])
+            db.session.remove()
+            self.assertEqual(sorted(a.id for a in Place.query.get(place_id).amenities), sorted(ids[5:]))
+
+    #===============================================================
+    # ----- test radius and bounding-box search -----
+    #===============================================================
+    def test_search_places(self):
+        with self.app.app_context():
+            owner = make_user()
+            for title, lat, lng in (("Louvre", 48.8606, 2.3376), ("Versailles", 48.8049, 2.1204),
+                                    ("Lyon", 45.7640, 4.8357), ("Fiji", -17.0, 179.99), ("Samoa", -17.0, -179.99)):
+                make_place(owner, title=title, latitude=lat, longitude=lng)
+            db.session.commit()
+        # ----- 25 km around Notre-Dame: Louvre then Versailles -----
+        response = self.client.get('/api/v1/places/search?lat=48.853&lng=2.3499&radius_km=25&limit=100')
+        self.assertEqual(response.status_code, 200)
+        places = response.get_json()["places"]
+        distances = [p["distance_km"] for p in places]
+        self.assertEqual(distances, sorted(distances))
+        self.assertTrue(all(distance <= 25 for distance in distances))
+        latitudes = {p["latitude"] for p in places}
+        self.assertTrue({48.8606, 48.8049} <= latitudes)
+        self.assertNotIn(45.7640, latitudes)
+        # ----- a box across the antimeridian -----
+        response = self.client.get('/api/v1/places/search/bbox?min_lat=-18&min_lng=179.9&max_lat=-16&max_lng=-179.9&limit=100')
+        self.assertEqual(response.status_code, 200)
+        longitudes = {p["longitude"] for p in response.get_json()["places"]}
+        self.assertTrue({179.99, -179.99} <= longitudes)
+        # ----- invalid parameters -----
+        response = self.client.get('/api/v1/places/search?lat=95&lng=0&radius_km=10')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/v1/places/search?lat=0&lng=0&radius_km=0')
+        self.assertEqual(response.status_code, 400)
+
+    def test_search_tall_narrow_box(self):
+        with self.app.app_context():
+            owner = make_user()
+            for title, lat, lng in (("South", -79.5, 5.5), ("North", 79.5, 9.5), ("East", 0.5, 20.5)):
+                make_place(owner, title=title, latitude=lat, longitude=lng)
+            db.session.commit()
+        # ----- 1600 grid rows: one cell range, not one per row -----
+        response = self.client.get('/api/v1/places/search/bbox?min_lat=-80&min_lng=0&max_lat=80&max_lng=10&limit=100')
+        self.assertEqual(response.status_code, 200)
+        places = response.get_json()["places"]
+        self.assertTrue({(-79.5, 5.5), (79.5, 9.5)} <= {(p["latitude"], p["longitude"]) for p in places})
+        self.assertTrue(all(0 <= p["longitude"] <= 10 and -80 <= p["latitude"] <= 80 for p in places))
+
+    #===============================================================
+    # ----- test filtered, sorted and faceted places list -----
+    #===============================================================
+    def test_filter_places(self):
+        with self.app.app_context():
+            owner, guest = make_user(), make_user()
+            wifi, pool = Amenity(name="Facet wifi"), Amenity(name="Facet pool")
+            db.session.add_all([wifi, pool])
+            places, ratings = {}, []
+            for title, price, amenities, rating in (("Cheap", 40.0, [wifi], 2), ("Mid", 150.0, [wifi, pool], 5),
+                                                    ("Pool", 160.0, [pool], 4), ("Dear", 600.0, [wifi, pool], None)):
+                place = make_place(owner, title=title, price=price)
+                place.amenities = amenities
+                db.session.flush()
+                if rating:
+                    ratings.append({"text": "ok", "rating": rating, "user_id": guest.id, "place_id": place.id})
+                places[place.id] = title
+            db.session.commit()
+            for review_data in ratings:
+                facade.create_review(review_data)
+            wifi_id, pool_id = wifi.id, pool.id
+        both = '{},{}'.format(wifi_id, pool_id)
+        # ----- must have every amenity, by price descending -----
+        response = self.client.get('/api/v1/places/?amenity_ids={}&sort=price_desc&facets=true'.format(both))
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        self.assertEqual([places[p["id"]] for p in body["places"]], ["Dear", "Mid"])
+        self.assertEqual(body["facets"]["amenities"], {wifi_id: 2, pool_id: 2})
+        self.assertEqual(body["facets"]["price"]["100-200"], 1)
+        self.assertEqual(body["facets"]["price"]["500+"], 1)
+        # ----- price range and rating, pages stay in rating order -----
+        seen = []
+        cursor = None
+        while True:
+            url = '/api/v1/places/?amenity_ids={}&min_rating=3&sort=rating_desc&limit=1'.format(pool_id)
+            response = self.client.get(url + ('&cursor={}'.format(cursor) if cursor else ''))
+            self.assertEqual(response.status_code, 200)
+            seen.extend(places[p["id"]] for p in response.get_json()["places"])
+            cursor = response.get_json()["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(seen, ["Mid", "Pool"])
+        response = self.client.get('/api/v1/places/?amenity_ids={}&min_price=100&max_price=155'.format(wifi_id))
+        self.assertEqual([places[p["id"]] for p in response.get_json()["places"]], ["Mid"])
+        self.assertNotIn("facets", response.get_json())
+        # ----- invalid filters -----
+        response = self.client.get('/api/v1/places/?min_price=10&max_price=5')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/v1/places/?sort=random')
+        self.assertEqual(response.status_code, 400)
+
+    #===============================================================
+    # ----- test conditional GET with weak ETags -----
+    #===============================================================
+    def test_place_conditional_get(self):
+        with self.app.app_context():
+            owner, guest = make_user(), make_user()
+            place = make_place(owner, title="Etag", latitude=10.5, longitude=20.5)
+            db.session.commit()
+            place_id, guest_id = place.id, guest.id
+        response = self.client.get('/api/v1/places/{}'.format(place_id))
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["ETag"]
+        self.assertTrue(etag.startswith('W/"'))
+        # ----- same version: 304 without a body -----
+        response = self.client.get('/api/v1/places/{}'.format(place_id), headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(response.headers["ETag"], etag)
+        # ----- a review changes the rating aggregates, hence the version -----
+        with self.app.app_context():
+            facade.create_review({"text": "ok", "rating": 4, "user_id": guest_id, "place_id": place_id})
+        response = self.client.get('/api/v1/places/{}'.format(place_id), headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        # ----- collections -----
+        url = '/api/v1/places/search/bbox?min_lat=10&min_lng=20&max_lat=11&max_lng=21'
+        etag = self.client.get(url).headers["ETag"]
+        self.assertEqual(self.client.get(url, headers={"If-None-Match": etag}).status_code, 304)
+        with self.app.app_context():
+            facade.update_place(place_id, {"title": "Etag renamed"})
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(place_id, [p["id"] for p in response.get_json()["places"]])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
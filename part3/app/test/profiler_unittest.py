@@ -0,0 +1,78 @@
+from app import create_app
+from app.services.profiler import HEADER, Sampler, request_profiler
+from app.test.helpers import auth_headers
+from config import TestingConfig
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+
+def spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestRequestProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        config = type('ProfilerConfig', (TestingConfig,), {'PROFILE_DIR': self.directory})
+        self.app = create_app(config)
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_sampler_collapses_stacks(self):
+        sampler = Sampler(threading.get_ident(), 0.001).start()
+        spin(0.05)
+        sampler.stop()
+        self.assertGreater(sampler.samples, 0)
+        lines = sampler.collapsed().splitlines()
+        self.assertTrue(any('profiler_unittest.py:spin' in line.split(';')[-1] for line in lines))
+        self.assertEqual(sum(int(line.rsplit(' ', 1)[1]) for line in lines), sampler.samples)
+
+    def test_header_needs_an_admin(self):
+        response = self.client.get('/api/v1/amenities/', headers={HEADER: 'inline'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertNotIn(HEADER, response.headers)
+        # ----- a regular token is ignored too -----
+        headers = dict(auth_headers(self.app), **{HEADER: 'inline'})
+        response = self.client.get('/api/v1/amenities/', headers=headers)
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertEqual(self.client.get('/api/v1/admin/profiles', headers=headers).status_code, 403)
+
+    def test_admin_profiles(self):
+        admin = auth_headers(self.app, is_admin=True)
+        response = self.client.get('/api/v1/amenities/', headers=dict(admin, **{HEADER: 'inline'}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/plain')
+        self.assertEqual(response.headers['X-HBnB-Profile-Status'], '200')
+        # ----- stored, then listed and read back by an admin -----
+        response = self.client.get('/api/v1/amenities/', headers=dict(admin, **{HEADER: 'store'}))
+        self.assertEqual(response.mimetype, 'application/json')
+        name = response.headers['X-HBnB-Profile-File']
+        response = self.client.get('/api/v1/admin/profiles', headers=admin)
+        self.assertEqual(response.get_json()['profiles'], [name])
+        response = self.client.get('/api/v1/admin/profiles/{}'.format(name), headers=admin)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/plain')
+
+    def test_store_and_read(self):
+        sampler = Sampler(threading.get_ident(), 0.001).start()
+        spin(0.01)
+        sampler.stop()
+        with self.app.test_request_context('/api/v1/places/', method='PUT'):
+            name = request_profiler.store(sampler)
+            self.assertEqual(request_profiler.stored(), [name])
+            self.assertEqual(request_profiler.read(name), sampler.collapsed())
+            # ----- only file names of the profile directory -----
+            self.assertIsNone(request_profiler.read('../' + name))
+            self.assertIsNone(request_profiler.read('missing.collapsed'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,9 @@
-from app import create_app
+from app import create_app, db
+from app.models.place_rating_stats import PlaceRatingStats
+from app.models.review import Review
+from app.services import facade
+from app.test.helpers import make_place, make_user
+import threading
 import unittest
 
 class TestUserEndpoints(unittest.TestCase):
@@ -387,5 +392,123 @@ class TestUserEndpoints(unittest.TestCase):
         
         self.assertEqual(response.status_code, 200) 
 
+    #===============================================================
+    # ----- test the rating aggregates follow the review writes -----
+    #===============================================================
+    def test_rating_stats(self):
+        with self.app.app_context():
+            owner, first_writer, second_writer = (make_user() for _ in range(3))
+            place = make_place(owner, title="Rated")
+            db.session.commit()
+            place_id = place.id
+            first = facade.create_review({"text": "ok", "rating": 4, "place_id": place_id, "user_id": first_writer.id})
+            facade.create_review({"text": "meh", "rating": 2, "place_id": place_id, "user_id": second_writer.id})
+            stats = db.session.get(PlaceRatingStats, place_id)
+            self.assertEqual((stats.review_count, stats.rating_sum), (2, 6))
+            self.assertEqual(stats.histogram, {1: 0, 2: 1, 3: 0, 4: 1, 5: 0})
+            facade.update_review(first.id, {"rating": 5})
+            db.session.refresh(stats)
+            self.assertEqual(stats.average, 3.5)
+            self.assertEqual(stats.histogram[4], 0)
+            facade.delete_review(first.id)
+            db.session.refresh(stats)
+            self.assertEqual((stats.review_count, stats.rating_sum, stats.rating_5), (1, 2, 0))
+            # ----- a rebuild from the reviews gives the same aggregates -----
+            db.session.execute(PlaceRatingStats.__table__.update().values(review_count=99))
+            db.session.commit()
+        result = self.app.test_cli_runner().invoke(args=['rebuild-rating-stats'])
+        self.assertEqual(result.exit_code, 0)
+        with self.app.app_context():
+            stats = db.session.get(PlaceRatingStats, place_id)
+            self.assertEqual((stats.review_count, stats.rating_sum), (1, 2))
+            self.assertEqual(Review.query.filter_by(place_id=place_id).count(), 1)
+
+    def test_concurrent_first_reviews(self):
+        with self.app.app_context():
+            place = make_place(make_user(), title="Raced")
+            writers = [make_user() for _ in range(4)]
+            db.session.commit()
+            place_id, user_ids = place.id, [user.id for user in writers]
+        ready = threading.Barrier(len(user_ids))
+        errors = []
+
+        def write(user_id):
+            with self.app.app_context():
+                ready.wait()
+                try:
+                    facade.create_review({"text": "first", "rating": 4, "place_id": place_id, "user_id": user_id})
+                except Exception as e:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(user_id,)) for user_id in user_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # ----- every writer lands in the same aggregates row -----
+        self.assertEqual(errors, [])
+        with self.app.app_context():
+            stats = db.session.get(PlaceRatingStats, place_id)
+            self.assertEqual((stats.review_count, stats.rating_4), (4, 4))
+
+    def test_update_review_reads_the_current_rating(self):
+        with self.app.app_context():
+            owner, writer = make_user(), make_user()
+            place = make_place(owner, title="Locked")
+            db.session.commit()
+            review = facade.create_review({"text": "ok", "rating": 4, "place_id": place.id, "user_id": writer.id})
+            review_id, place_id = review.id, place.id
+            facade.enable_cache('review')
+            try:
+                facade.get_review(review_id)
+                db.session.commit()
+                # ----- another worker changes the rating: this worker's cache still says 4 -----
+                with db.engine.begin() as conn:
+                    conn.execute(Review.__table__.update().where(Review.id == review_id).values(rating=2))
+                    stats = PlaceRatingStats.__table__
+                    conn.execute(stats.update().where(stats.c.place_id == place_id).values(
+                        rating_sum=2, rating_4=0, rating_2=1))
+                facade.update_review(review_id, {"rating": 5})
+            finally:
+                facade.review_repo.cache = None
+            stats = db.session.get(PlaceRatingStats, place_id)
+            db.session.refresh(stats)
+            self.assertEqual((stats.review_count, stats.rating_sum), (1, 5))
+            self.assertEqual(stats.histogram, {1: 0, 2: 0, 3: 0, 4: 0, 5: 1})
+    #===============================================================
+    # ----- test paged and streamed reviews of a place -----
+    #===============================================================
+    def test_get_place_reviews_pages(self):
+        with self.app.app_context():
+            place = make_place(make_user(), title="Reviewed")
+            writers = [make_user() for _ in range(5)]
+            db.session.commit()
+            place_id = place.id
+            expected = [facade.create_review({"text": "review {}".format(i), "rating": 3, "place_id": place_id, "user_id": user.id}).id
+                        for i, user in enumerate(writers)]
+        seen = []
+        cursor = None
+        while True:
+            url = '/api/v1/reviews/places/{}/reviews?limit=2'.format(place_id)
+            response = self.client.get(url + ('&cursor={}'.format(cursor) if cursor else ''))
+            self.assertEqual(response.status_code, 200)
+            page = response.get_json()
+            self.assertLessEqual(len(page["reviews"]), 2)
+            seen.extend(review["id"] for review in page["reviews"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(sorted(seen), sorted(expected))
+        # ----- streamed as one JSON array -----
+        response = self.client.get('/api/v1/reviews/places/{}/reviews?stream=true'.format(place_id))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_streamed)
+        self.assertEqual([review["id"] for review in response.get_json()], seen)
+        # ----- unknown place and invalid cursor -----
+        response = self.client.get('/api/v1/reviews/places/toto/reviews?stream=true')
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get('/api/v1/reviews/places/{}/reviews?cursor=nope'.format(place_id))
+        self.assertEqual(response.status_code, 400)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,53 @@
+from app import create_app
+from app.api.v1 import serializers
+from app.api.v1.places import place_model, serialize_place
+from app.api.v1.users import serialize_user, user_model
+from datetime import datetime
+from flask_restx import fields, marshal
+from types import SimpleNamespace
+import json
+import unittest
+
+
+def make_place(**overrides):
+    place = SimpleNamespace(
+        id='p1', user_id='u1', city_id=None, name='Loft', description=None,
+        number_rooms=2, number_bathrooms='1', max_guest=4, price_by_night=80,
+        latitude=48.85, longitude='2.35',
+        created_at=datetime(2024, 5, 1, 12, 30), updated_at=None,
+        host=SimpleNamespace(id='u1', first_name='Jane', last_name='Doe', email='jane@example.com'),
+        city=None,
+        amenities=[SimpleNamespace(id='a1', name='Wifi'), SimpleNamespace(id='a2', name='Pool')],
+        rating_stats=SimpleNamespace(review_count=3, average=4.5, histogram={1: 0, 5: 2}))
+    for key, value in overrides.items():
+        setattr(place, key, value)
+    return place
+
+
+class TestSerializers(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+
+    def test_place_matches_marshal(self):
+        for place in (make_place(), make_place(amenities=[], rating_stats=None, host=None)):
+            with self.app.app_context():
+                self.assertEqual(serialize_place(place), dict(marshal(place, place_model)))
+
+    def test_user_matches_marshal(self):
+        user = SimpleNamespace(id='u1', email='jane@example.com', first_name='Jane', last_name='Doe',
+                               is_admin=0, created_at=datetime(2024, 5, 1), updated_at=None)
+        self.assertEqual(serialize_user(user), dict(marshal(user, user_model)))
+
+    def test_fields_without_fast_path(self):
+        # ----- dotted attributes and formatted strings go through field.output -----
+        model = {'city': fields.String(attribute='city.name'), 'link': fields.FormattedString('/places/{id}')}
+        place = SimpleNamespace(id='p1', city=SimpleNamespace(name='Paris'))
+        self.assertEqual(serializers.compile_model(model)(place), dict(marshal(place, model)))
+
+    def test_dumps_round_trip(self):
+        data = {'places': [serialize_place(make_place())], 'next_cursor': None}
+        self.assertEqual(json.loads(serializers.dumps(data)), json.loads(json.dumps(data)))
+
+if __name__ == '__main__':
+    unittest.main()
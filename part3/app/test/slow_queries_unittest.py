@@ -0,0 +1,85 @@
+from app import create_app, db
+from app.models.review import Review
+from app.persistence.slow_queries import _explain, slow_query_log
+from app.test.helpers import auth_headers, make_place, make_user
+from config import TestingConfig
+from sqlalchemy import text
+from types import SimpleNamespace
+import sqlite3
+import unittest
+
+
+class TestSlowQueryLog(unittest.TestCase):
+
+    def setUp(self):
+        config = type('SlowQueryConfig', (TestingConfig,), {'SLOW_QUERY_MS': 0, 'SLOW_QUERY_LOG_SIZE': 20})
+        self.app = create_app(config)
+        self.client = self.app.test_client()
+        with self.app.app_context():
+            guest = make_user()
+            place = make_place(make_user(), title="Slow")
+            db.session.flush()
+            db.session.add(Review(text="ok", rating=5, user_id=guest.id, place_id=place.id))
+            db.session.commit()
+            self.place_id = place.id
+        slow_query_log.clear()
+
+    def tearDown(self):
+        slow_query_log.configure()
+
+    def test_records_plan_and_endpoint(self):
+        response = self.client.get('/api/v1/reviews/places/{}/reviews'.format(self.place_id))
+        self.assertEqual(response.status_code, 200)
+        entries = [e for e in slow_query_log.entries() if 'FROM review' in e['statement'] and 'place_id' in e['statement']]
+        self.assertTrue(entries)
+        entry = entries[-1]
+        self.assertEqual(entry['endpoint'], 'GET /api/v1/reviews/places/<place_id>/reviews')
+        self.assertNotIn(self.place_id, repr(entry['parameters']))
+        self.assertIn('str', repr(entry['parameters']))
+        self.assertTrue(any(frame.startswith('services/facade.py') for frame in entry['callers']))
+        # ----- the lookup goes through the review.place_id index -----
+        self.assertIn('ix_review_place_id', ' '.join(entry['plan']))
+
+    def test_threshold_and_ring_buffer(self):
+        with self.app.app_context():
+            for _ in range(30):
+                db.session.execute(text('SELECT 1'))
+            self.assertEqual(len(slow_query_log.entries()), 20)
+            self.assertIsNone(slow_query_log.entries()[-1]['endpoint'])
+            slow_query_log.threshold_ms = 60 * 1000
+            slow_query_log.clear()
+            db.session.execute(text('SELECT 1'))
+            self.assertEqual(slow_query_log.entries(), [])
+            db.session.remove()
+
+    def test_failed_explain_keeps_the_transaction(self):
+        connection = sqlite3.connect(':memory:', isolation_level=None)
+        connection.execute('CREATE TABLE t (x INTEGER)')
+        connection.execute('BEGIN')
+        cursor = connection.execute('INSERT INTO t VALUES (1)')
+        statements = []
+        connection.set_trace_callback(statements.append)
+        # ----- outside SQLite the plan is read in a savepoint, rolled back on failure -----
+        plan = _explain(cursor, SimpleNamespace(name='postgresql'), 'SELECT * FROM missing', ())
+        connection.set_trace_callback(None)
+        self.assertTrue(plan[0].startswith('EXPLAIN failed'))
+        self.assertEqual(statements, ['SAVEPOINT hbnb_explain', 'ROLLBACK TO SAVEPOINT hbnb_explain',
+                                      'RELEASE SAVEPOINT hbnb_explain'])
+        self.assertTrue(connection.in_transaction)
+        self.assertEqual(connection.execute('SELECT x FROM t').fetchall(), [(1,)])
+        connection.execute('COMMIT')
+        connection.close()
+
+    def test_endpoint_requires_admin(self):
+        self.client.get('/api/v1/reviews/places/{}/reviews'.format(self.place_id))
+        admin = auth_headers(self.app, is_admin=True)
+        response = self.client.get('/api/v1/admin/slow-queries', headers=admin)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()['queries'])
+        response = self.client.get('/api/v1/admin/slow-queries', headers=auth_headers(self.app))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.client.delete('/api/v1/admin/slow-queries', headers=admin).status_code, 204)
+        self.assertEqual(slow_query_log.entries(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+from app import create_app, db
+from app.models.amenity import Amenity
+from app.models.place import Place
+from app.models.user import User
+from app.services import facade
+from sqlalchemy import event
+import unittest
+import uuid
+
+
+class TestUnitOfWork(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app()
+        self.context = self.app.app_context()
+        self.context.push()
+        self.commits = []
+        event.listen(db.engine, 'commit', self.on_commit)
+        self.owner = User(first_name="Uow", last_name="Owner", email="uow.{}@example.com".format(uuid.uuid4().hex[:8]), password="x")
+        db.session.add(self.owner)
+        db.session.commit()
+        self.commits.clear()
+
+    def tearDown(self):
+        event.remove(db.engine, 'commit', self.on_commit)
+        db.session.remove()
+        self.context.pop()
+
+    def on_commit(self, conn):
+        self.commits.append(conn)
+
+    def place_data(self, title, amenities=()):
+        return {"title": title, "description": "", "price": 10.0, "latitude": 1.0,
+                "longitude": 1.0, "owner_id": self.owner.id, "amenities": list(amenities)}
+
+    def test_one_commit_per_transaction(self):
+        with facade.transaction():
+            amenity = Amenity(name="Uow wifi")
+            facade.amenity_repo.add(amenity)
+            place = facade.create_place(self.place_data("Uow 1", [amenity.id]))
+            facade.create_review({"text": "Nice", "rating": 4, "user_id": self.owner.id, "place_id": place.id})
+            self.assertEqual(self.commits, [])
+            place_id = place.id
+        self.assertEqual(len(self.commits), 1)
+        # ----- without a transaction each write commits on its own -----
+        facade.amenity_repo.add(Amenity(name="Uow pool"))
+        self.assertEqual(len(self.commits), 2)
+        db.session.remove()
+        self.assertEqual(Place.query.get(place_id).rating_stats.review_count, 1)
+
+    def test_outer_failure_rolls_back_everything(self):
+        with self.assertRaises(ValueError):
+            with facade.transaction():
+                place_id = facade.create_place(self.place_data("Uow 2")).id
+                raise ValueError("boom")
+        self.assertEqual(self.commits, [])
+        db.session.remove()
+        self.assertIsNone(Place.query.get(place_id))
+
+    def test_nested_failure_rolls_back_savepoint_only(self):
+        with facade.transaction():
+            kept_id = facade.create_place(self.place_data("Uow 3")).id
+            try:
+                with facade.transaction():
+                    dropped_id = facade.create_place(self.place_data("Uow 4")).id
+                    raise ValueError("boom")
+            except ValueError:
+                pass
+        self.assertEqual(len(self.commits), 1)
+        db.session.remove()
+        self.assertIsNotNone(Place.query.get(kept_id))
+        self.assertIsNone(Place.query.get(dropped_id))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+"""Concurrent-connection throughput of the ASGI reads (app/asgi.py) against the sync Flask workers.
+
+    python -m benchmarks.bench_asgi --places 5000 --connections 1 8 32 128 --duration 5
+
+A dataset from benchmarks.datagen is written to one database, then each
+server runs in its own process on it:
+- sync: the Flask app on a WSGI server serving one request at a time and
+  closing every connection, as a gunicorn sync worker does.
+- threaded: the Flask app on a threaded WSGI server (one thread per
+  connection, keep-alive).
+- asgi: HBnBASGI on uvicorn, place reads on the async engine.
+For each number of concurrent keep-alive connections, an asyncio client
+sends place detail and listing GETs for --duration seconds and the table
+gives requests/s and p50/p99 latency (connection setup included).
+
+The client shares the machine with the server: compare the modes
+against each other, not against a separate load generator. With SQLite
+the database answers in microseconds; the async path pays off when each
+query waits on a database server (--database-url postgresql://...).
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from benchmarks import datagen
+from benchmarks.common import make_app, print_table
+from benchmarks.suite import percentile
+
+MODES = ('sync', 'threaded', 'asgi')
+
+
+def serve(mode, port, database_url):
+    """Run one server in this process until it is killed."""
+    app = make_app(database_url, TESTING=False, AUTO_CREATE_SCHEMA=False, PASSWORD_POOL_SIZE=0)
+    app.logger.disabled = True
+    if mode == 'asgi':
+        import uvicorn
+        from app.asgi import HBnBASGI
+
+        uvicorn.run(HBnBASGI(app), host='127.0.0.1', port=port, log_level='warning', access_log=False)
+        return
+    from benchmarks.suite import LocalServer
+
+    with LocalServer(app, port=port, threaded=mode == 'threaded') as server:
+        server.thread.join()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, database_url):
+    port = free_port()
+    process = subprocess.Popen([sys.executable, '-m', 'benchmarks.bench_asgi', '--serve', mode,
+                                '--port', str(port), '--database-url', database_url],
+                               cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'{mode} server exited with {process.returncode}')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return process, port
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f'{mode} server did not start')
+
+
+async def _get(reader, writer, path):
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n'.encode())
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError('connection closed by the server')
+    status = int(status_line.split()[1])
+    length, close = 0, status_line.startswith(b'HTTP/1.0')
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.partition(b':')
+        name = name.strip().lower()
+        if name == b'content-length':
+            length = int(value)
+        elif name == b'connection':
+            close = value.strip().lower() == b'close'
+    await reader.readexactly(length)
+    return status, close
+
+
+async def _connection(port, paths, rng, deadline, latencies, statuses, errors):
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        path = rng.choice(paths)
+        start = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            status, close = await _get(reader, writer, path)
+        except (OSError, asyncio.IncompleteReadError) as e:
+            errors[type(e).__name__] += 1
+            writer = None
+            continue
+        latencies.append(time.perf_counter() - start)
+        statuses[status] += 1
+        if close:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def load(port, paths, connections, duration, seed):
+    latencies, statuses, errors = [], Counter(), Counter()
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(_connection(port, paths, random.Random(f'{seed}:{index}'), deadline,
+                                       latencies, statuses, errors) for index in range(connections)))
+    elapsed = time.perf_counter() - started
+    samples = sorted(sample * 1000 for sample in latencies)
+    return len(samples) / elapsed, percentile(samples, 50), percentile(samples, 99), statuses, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--connections', nargs='+', type=int, default=[1, 8, 32, 128])
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds per mode and connection count')
+    parser.add_argument('--database-url', default=None, help='Empty database to fill (a temporary SQLite file by default)')
+    parser.add_argument('--serve', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    datagen.add_arguments(parser)
+    args = parser.parse_args()
+    if args.serve:
+        return serve(args.serve, args.port, args.database_url)
+
+    app = make_app(args.database_url, PASSWORD_POOL_SIZE=0)
+    with app.app_context():
+        from app import db
+
+        dataset = datagen.generate(**datagen.scale(args))
+        database_url = db.engine.url.render_as_string(hide_password=False)
+    # Moitié fiches, moitié pages de la liste (tris et filtres de prix variés)
+    rng = random.Random(args.seed)
+    paths = ['/api/v1/places/' + place_id for place_id in rng.sample(dataset.place_ids, min(500, len(dataset.place_ids)))]
+    paths += ['/api/v1/places/?limit=20&sort={}&min_price={}'.format(rng.choice(('created', 'price_asc', 'rating_desc')),
+                                                                      rng.randrange(20, 400)) for _ in range(len(paths))]
+
+    rows = []
+    for mode in args.modes:
+        process, port = start_server(mode, database_url)
+        try:
+            for connections in args.connections:
+                throughput, p50, p99, statuses, errors = asyncio.run(
+                    load(port, paths, connections, args.duration, args.seed))
+                rows.append([mode, connections, '%.1f' % throughput, '%.2f' % p50 if p50 else '-',
+                             '%.2f' % p99 if p99 else '-',
+                             ' '.join(f'{status}:{count}' for status, count in sorted(statuses.items())),
+                             ' '.join(f'{name}:{count}' for name, count in errors.items()) or '-'])
+        finally:
+            process.terminate()
+            process.wait()
+    print(dataset.summary())
+    print_table(['mode', 'connections', 'req/s', 'p50 ms', 'p99 ms', 'statuses', 'errors'], rows)
+
+
+if __name__ == '__main__':
+    main()
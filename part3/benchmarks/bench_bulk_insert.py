@@ -0,0 +1,54 @@
+"""Rows per second of the bulk insert path versus one transaction per row.
+
+    python -m benchmarks.bench_bulk_insert --rows 20000 --chunk-size 1000
+
+Compares SQLAlchemyRepository.add (session.add + commit per place) with
+add_many (one executemany INSERT and one commit per chunk).
+"""
+import argparse
+import time
+
+from benchmarks.common import make_app, print_table, seed_owner
+
+
+def make_places(count, owner_id, tag):
+    from app.models.place import Place
+
+    return [Place(title='{} {}'.format(tag, i), description='', price=float(i % 500),
+                  latitude=0.0, longitude=0.0, owner_id=owner_id) for i in range(count)]
+
+
+def rate(count, fn):
+    start = time.perf_counter()
+    fn()
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    from app.services import facade
+
+    app = make_app()
+    with app.app_context():
+        owner_id = seed_owner()
+        per_row = make_places(args.rows, owner_id, 'row')
+        bulk = make_places(args.rows, owner_id, 'bulk')
+
+        def insert_per_row():
+            for place in per_row:
+                facade.place_repo.add(place)
+
+        per_row_rate = rate(args.rows, insert_per_row)
+        bulk_rate = rate(args.rows, lambda: facade.place_repo.add_many(bulk, chunk_size=args.chunk_size))
+    print_table(['path', 'rows', 'rows/s'], [
+        ['add (per row)', args.rows, '%.0f' % per_row_rate],
+        ['add_many (chunk %d)' % args.chunk_size, args.rows, '%.0f' % bulk_rate],
+    ])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Concurrent reads and writes under each engine profile.
+
+    python -m benchmarks.bench_engine_profiles --threads 1 8 32
+    python -m benchmarks.bench_engine_profiles --database-url postgresql://user:pw@localhost/hbnb
+
+Each thread runs `--operations` operations through the facade: a page
+of the places list, or (one time in `--write-every`) a price update.
+Profiles on a SQLite file:
+- bare: no PRAGMAs (rollback journal, synchronous=FULL), default pool.
+- tuned: the SQLITE_PRAGMAS of config.Config (WAL, synchronous=NORMAL,
+  mmap, busy timeout).
+- production: tuned plus the pool sizing of ProductionConfig.
+With --database-url only the production profile runs, against that
+database. Reports throughput, p95 latency, failed operations and the
+pool checkout wait collected by app.persistence.engine.
+"""
+import argparse
+import os
+import threading
+import time
+
+from benchmarks.common import make_app, print_table, seed_owner, seed_places
+from config import Config, ProductionConfig
+
+PROFILES = {
+    'bare': {'SQLITE_PRAGMAS': {}},
+    'tuned': {},
+    'production': {key: getattr(ProductionConfig, key) for key in (
+        'DB_POOL_SIZE', 'DB_MAX_OVERFLOW', 'DB_POOL_TIMEOUT', 'DB_POOL_RECYCLE',
+        'DB_POOL_PRE_PING', 'DB_STATEMENT_TIMEOUT_MS')},
+}
+
+
+def worker(app, place_ids, operations, write_every, offset, samples, errors):
+    from app import db
+    from app.services import facade
+
+    with app.app_context():
+        for i in range(operations):
+            start = time.perf_counter()
+            try:
+                if (i + offset) % write_every == 0:
+                    place_id = place_ids[(i + offset) % len(place_ids)]
+                    facade.update_place(place_id, {'price': float(i % 500)})
+                else:
+                    facade.get_places_page(20)
+            except Exception:
+                db.session.rollback()
+                errors.append(1)
+            else:
+                samples.append((time.perf_counter() - start) * 1000)
+            db.session.remove()
+
+
+def run(profile, threads, args):
+    from app import db
+    from app.models.place import Place
+    from app.persistence.engine import pool_metrics
+
+    app = make_app(args.database_url, **PROFILES[profile])
+    with app.app_context():
+        if not Place.query.first():
+            seed_places(args.places, seed_owner())
+        place_ids = [place_id for (place_id,) in db.session.query(Place.id).limit(1000)]
+        db.session.remove()
+        engine = db.engine
+    pool_metrics.reset()
+    samples, errors = [], []
+    pool = [threading.Thread(target=worker, args=(app, place_ids, args.operations, args.write_every,
+                                                  n, samples, errors)) for n in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stats = pool_metrics.stats(engine)
+    engine.dispose()
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95)] if samples else float('nan')
+    return [profile, threads, '%.0f' % (len(samples) / elapsed), '%.1f' % p95, len(errors),
+            '%.1f' % stats['checkout_wait_ms_max'], stats['checkout_timeouts']]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--operations', type=int, default=200)
+    parser.add_argument('--write-every', type=int, default=5)
+    parser.add_argument('--places', type=int, default=5000)
+    parser.add_argument('--database-url', default=os.environ.get('DATABASE_URL'),
+                        help='defaults to a throwaway SQLite file per profile')
+    args = parser.parse_args()
+
+    profiles = ['production'] if args.database_url else list(PROFILES)
+    rows = [run(profile, threads, args) for profile in profiles for threads in args.threads]
+    print('SQLite PRAGMAs of the tuned profiles:', Config.SQLITE_PRAGMAS)
+    print_table(['profile', 'threads', 'ops/s', 'p95 ms', 'errors', 'max wait ms', 'timeouts'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Login throughput with bcrypt run inline versus in the password pool.
+
+    python -m benchmarks.bench_login_pool --pool-sizes 0 1 2 4 --clients 16
+
+`clients` threads play request workers, each checking a password in a
+loop for `duration` seconds (the bcrypt part of POST /api/v1/auth/login).
+Reports logins per second, p50/p95 latency and how many were turned away
+with a 429 because the pool queue was full.
+"""
+import argparse
+import statistics
+import threading
+import time
+
+from benchmarks.common import print_table
+
+
+def run(workers, clients, duration, rounds, max_pending):
+    from app.services.password_pool import PasswordPool, PasswordPoolSaturated
+
+    pool = PasswordPool(workers=workers, max_pending=max_pending, rounds=rounds)
+    hashed = pool.hash('benchmark-password')
+    latencies, rejected = [], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                pool.verify(hashed, 'benchmark-password')
+            except PasswordPoolSaturated:
+                with lock:
+                    rejected[0] += 1
+                time.sleep(0.01)
+                continue
+            with lock:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    pool.shutdown()
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0] * 99
+    return [workers or 'inline', '%.1f' % (len(latencies) / duration),
+            '%.1f' % quantiles[49], '%.1f' % quantiles[94], rejected[0]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pool-sizes', type=int, nargs='+', default=[0, 1, 2, 4])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--rounds', type=int, default=12)
+    parser.add_argument('--max-pending', type=int, default=64)
+    args = parser.parse_args()
+    rows = [run(size, args.clients, args.duration, args.rounds, args.max_pending) for size in args.pool_sizes]
+    print_table(['pool size', 'logins/s', 'p50 ms', 'p95 ms', '429s'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Cost of the request instrumentation (app.services.metrics).
+
+    python -m benchmarks.bench_metrics --places 1000 --requests 500
+
+Two apps on their own SQLite file with the same places, one with
+METRICS_ENABLED and one without, serve the same GET requests through
+the test client, alternating between the two. Reports the median time per request of
+each route and the difference.
+"""
+import argparse
+import statistics
+
+from benchmarks.common import make_app, print_table, seed_owner, seed_places, timed
+
+ROUTES = ('/api/v1/places/?limit=20', '/api/v1/places/{place_id}', '/api/v1/amenities/')
+
+
+def build(enabled, places):
+    from app import db
+    from app.models.place import Place
+
+    app = make_app(METRICS_ENABLED=enabled, PASSWORD_POOL_SIZE=0)
+    with app.app_context():
+        seed_places(places, seed_owner())
+        place_id = db.session.query(Place.id).first()[0]
+    return app, app.test_client(), place_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--places', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=9)
+    args = parser.parse_args()
+
+    clients = {enabled: build(enabled, args.places) for enabled in (False, True)}
+    rows = []
+    for route in ROUTES:
+        runs = {}
+        for enabled, (app, client, place_id) in clients.items():
+            url = route.format(place_id=place_id)
+            client.get(url)  # cache des payloads et moteur chauds
+            runs[enabled] = lambda client=client, url=url: [client.get(url) for _ in range(args.requests)]
+        samples = {False: [], True: []}
+        # Mesures alternées : les dérives de la machine touchent les deux apps
+        for _ in range(args.repeat):
+            for enabled in (False, True):
+                samples[enabled].append(timed(runs[enabled], 1) * 1000 / args.requests)
+        off, on = statistics.median(samples[False]), statistics.median(samples[True])
+        rows.append([route, '%.1f' % off, '%.1f' % on, '%+.1f' % (on - off), '%+.1f%%' % ((on - off) / off * 100)])
+    print_table(['route', 'off us/req', 'on us/req', 'overhead us', 'overhead'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Radius and bounding-box place search through the grid index versus a full scan.
+
+    python -m benchmarks.bench_place_geo --places 1000000 --radius-km 10 25 100
+
+Places are spread uniformly over land-like latitudes. The full scan loads
+every (id, latitude, longitude) and applies the haversine filter in Python,
+which is what a client has to do without the search endpoints.
+"""
+import argparse
+import random
+
+from benchmarks.common import make_app, print_table, seed_owner, seed_places, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--places', type=int, default=1000000)
+    parser.add_argument('--radius-km', type=float, nargs='+', default=[10.0, 25.0, 100.0])
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    from app import db
+    from app.models.place import Place
+    from app.persistence.geo import bounding_box, haversine_km
+    from app.services import facade
+
+    rng = random.Random(args.seed)
+    points = [(rng.uniform(-60, 70), rng.uniform(-180, 180)) for _ in range(args.places)]
+    centers = [points[rng.randrange(args.places)] for _ in range(args.queries)]
+
+    app = make_app()
+    rows = []
+    with app.app_context():
+        seed_places(args.places, seed_owner(), coordinates=lambda i: points[i])
+
+        def full_scan(radius_km):
+            for lat, lng in centers:
+                [place_id for place_id, plat, plng in db.session.query(Place.id, Place.latitude, Place.longitude)
+                 if haversine_km(lat, lng, plat, plng) <= radius_km]
+
+        def radius_search(radius_km):
+            for lat, lng in centers:
+                facade.search_places_radius(lat, lng, radius_km, 100)
+
+        def bbox_search(radius_km):
+            for lat, lng in centers:
+                min_lat, min_lng, max_lat, max_lng = bounding_box(lat, lng, radius_km)
+                facade.search_places_bbox(min_lat, min_lng, max_lat, max_lng, 100)
+
+        for radius_km in args.radius_km:
+            rows.append([
+                args.places, radius_km,
+                '%.1f' % (timed(lambda: full_scan(radius_km), repeat=1) / args.queries),
+                '%.2f' % (timed(lambda: radius_search(radius_km), repeat=3) / args.queries),
+                '%.2f' % (timed(lambda: bbox_search(radius_km), repeat=3) / args.queries),
+            ])
+    print_table(['places', 'radius km', 'full scan ms/query', 'radius ms/query', 'bbox ms/query'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Keyset pagination of the places listing versus the former full scan.
+
+    python -m benchmarks.bench_place_pagination --sizes 10000 100000 1000000
+
+For each catalogue size it reports the median time to load every place
+(what GET /api/v1/places used to do), the first page and a page near the end
+of the catalogue reached through its cursor.
+"""
+import argparse
+
+from benchmarks.common import make_app, print_table, seed_owner, seed_places, timed
+
+
+def run(size, limit):
+    from app.models.place import Place
+    from app.persistence.pagination import encode_cursor
+    from app.services import facade
+
+    app = make_app()
+    with app.app_context():
+        seed_places(size, seed_owner())
+        anchor = (Place.query.order_by(Place.created_at, Place.id)
+                  .offset(max(size - 2 * limit, 0)).first())
+        deep_cursor = encode_cursor([anchor.created_at, anchor.id])
+
+        full_scan = timed(lambda: Place.query.all(), repeat=1 if size > 100000 else 3)
+        first_page = timed(lambda: facade.get_places_page(limit))
+        deep_page = timed(lambda: facade.get_places_page(limit, deep_cursor))
+    return [size, '%.1f' % full_scan, '%.2f' % first_page, '%.2f' % deep_page]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+    rows = [run(size, args.limit) for size in args.sizes]
+    print_table(['places', 'full scan ms', 'first page ms', 'deep page ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
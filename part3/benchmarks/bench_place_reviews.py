@@ -0,0 +1,81 @@
+"""Reviews of a popular place: full list versus keyset pages and streaming.
+
+    python -m benchmarks.bench_place_reviews --sizes 10000 50000
+
+For each number of reviews on a single place it reports the time and the
+peak Python memory (tracemalloc) of building the whole list (what
+GET /api/v1/reviews/places/<id>/reviews used to do), of one page, and of
+streaming every review through the chunked response generator.
+"""
+import argparse
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+from benchmarks.common import make_app, print_table, seed_owner, seed_places
+
+
+def seed_reviews(count, place_id, batch=10000):
+    from app import db
+    from app.models.review import Review
+    from app.models.user import User
+
+    start = datetime(2024, 1, 1)
+    for offset in range(0, count, batch):
+        users, reviews = [], []
+        for i in range(offset, min(offset + batch, count)):
+            user_id = str(uuid.uuid4())
+            users.append({'id': user_id, 'first_name': 'Bench', 'last_name': 'Guest',
+                          'email': 'guest.{}@example.com'.format(i), 'password': 'x', 'is_admin': False})
+            reviews.append({'id': str(uuid.uuid4()), 'text': 'Review {}'.format(i), 'rating': i % 5 + 1,
+                            'user_id': user_id, 'place_id': place_id,
+                            'created_at': start + timedelta(seconds=i), 'updated_at': start + timedelta(seconds=i)})
+        db.session.execute(User.__table__.insert(), users)
+        db.session.execute(Review.__table__.insert(), reviews)
+        db.session.commit()
+
+
+def measure(fn):
+    """(milliseconds, peak KiB) of one call of fn."""
+    from app import db
+
+    db.session.expunge_all()
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = (time.perf_counter() - start) * 1000
+    peak = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def run(size, limit):
+    from app.api.v1.reviews import _stream_reviews
+    from app.models.place import Place
+    from app.models.review import Review
+    from app.services import facade
+
+    app = make_app()
+    with app.app_context():
+        seed_places(1, seed_owner())
+        place_id = Place.query.first().id
+        seed_reviews(size, place_id)
+
+        full = measure(lambda: [r.to_dict() for r in Review.query.filter_by(place_id=place_id).all()])
+        page = measure(lambda: [r.to_dict() for r in facade.get_reviews_by_place(place_id, limit)[0]])
+        stream = measure(lambda: sum(len(chunk) for chunk in _stream_reviews(facade.iter_reviews_by_place(place_id))))
+    return [size] + ['%.1f / %.0f' % result for result in (full, page, stream)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 50000])
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args()
+    rows = [run(size, args.limit) for size in args.sizes]
+    print_table(['reviews', 'full list ms / KiB', 'page ms / KiB', 'stream ms / KiB'], rows)
+
+
+if __name__ == '__main__':
+    main()
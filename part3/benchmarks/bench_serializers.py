@@ -0,0 +1,59 @@
+"""Response serialization: marshal() against the precompiled serializers.
+
+    python -m benchmarks.bench_serializers --places 10000 --amenities 5
+
+Serializes --places in-memory places, each with its nested host, rating
+aggregates and --amenities amenities, into the JSON body of GET
+/api/v1/places/. No database access: only the per-object field work
+and the encoding are measured.
+"""
+import argparse
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from flask_restx import marshal
+
+from benchmarks.common import print_table, timed
+
+
+def make_places(count, amenities_per_place):
+    host = SimpleNamespace(id='owner', first_name='Bench', last_name='Owner', email='bench@example.com')
+    amenities = [SimpleNamespace(id='amenity-{}'.format(i), name='Amenity {}'.format(i))
+                 for i in range(amenities_per_place)]
+    start = datetime(2024, 1, 1)
+    return [SimpleNamespace(
+        id='place-{}'.format(i), user_id=host.id, city_id=None, name='Place {}'.format(i),
+        description='Generated place', number_rooms=i % 5, number_bathrooms=i % 3, max_guest=i % 8,
+        price_by_night=i % 500, latitude=(i % 180) - 90.0, longitude=(i % 360) - 180.0,
+        created_at=start + timedelta(seconds=i), updated_at=start + timedelta(seconds=i),
+        host=host, city=None, amenities=amenities,
+        rating_stats=SimpleNamespace(review_count=i % 20, average=4.2, histogram={1: 0, 2: 1, 3: 2, 4: 5, 5: 9}),
+    ) for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--places', type=int, default=10000)
+    parser.add_argument('--amenities', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    from app.api.v1 import serializers
+    from app.api.v1.places import place_model, serialize_place
+
+    places = make_places(args.places, args.amenities)
+    cases = [
+        ('marshal + json.dumps', lambda: json.dumps({'places': marshal(places, place_model)})),
+        ('compiled + json.dumps', lambda: json.dumps({'places': [serialize_place(p) for p in places]})),
+    ]
+    if serializers.orjson is not None:
+        cases.append(('compiled + orjson', lambda: serializers.dumps({'places': [serialize_place(p) for p in places]})))
+    rows = []
+    for label, fn in cases:
+        rows.append([label, '%.1f' % timed(fn, args.repeat), len(fn())])
+    print_table(['serializer', 'median ms', 'bytes'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Application startup: create_app alone versus the schema and admin work it used to do.
+
+    python -m benchmarks.bench_startup --repeat 10
+
+Rows:
+- create_app: what every worker pays now (ProductionConfig profile on a
+  SQLite file, no database access).
+- + legacy boot work: create_app followed by what it used to run on
+  each boot on a fresh database: db.create_all(), the inspector dump
+  and create_first_admin() with the production bcrypt cost.
+- cold process: a new interpreter importing the app and calling
+  create_app('config.ProductionConfig'), as an unpreloaded worker does.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import make_app, print_table
+from config import ProductionConfig
+
+PROFILE = {'AUTO_CREATE_SCHEMA': False, 'PASSWORD_POOL_SIZE': 0,
+           'BCRYPT_LOG_ROUNDS': ProductionConfig.BCRYPT_LOG_ROUNDS}
+
+
+def fresh_uri():
+    fd, path = tempfile.mkstemp(prefix='hbnb-startup-', suffix='.db')
+    os.close(fd)
+    os.remove(path)
+    return 'sqlite:///' + path
+
+
+def create_only():
+    make_app(fresh_uri(), **PROFILE)
+
+
+def legacy_boot():
+    from sqlalchemy import inspect
+
+    from app import db
+    from app.models.user import create_first_admin
+
+    app = make_app(fresh_uri(), **PROFILE)
+    with app.app_context():
+        db.create_all()
+        inspect(db.engine).get_table_names()
+        create_first_admin('bench-password')
+        db.session.remove()
+        db.engine.dispose()
+
+
+def cold_process():
+    env = dict(os.environ, DATABASE_URL=fresh_uri(), PASSWORD_POOL_SIZE='0')
+    subprocess.run([sys.executable, '-c', "from app import create_app; create_app('config.ProductionConfig')"],
+                   check=True, env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                   stdout=subprocess.DEVNULL)
+
+
+def median_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+    # Premier appel hors mesure : imports des modules de l'application
+    create_only()
+    rows = [[label, '%.1f' % median_ms(fn, args.repeat)] for label, fn in (
+        ('create_app', create_only),
+        ('+ legacy boot work', legacy_boot),
+        ('cold process', cold_process),
+    )]
+    print_table(['startup', 'median ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
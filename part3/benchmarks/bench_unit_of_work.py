@@ -0,0 +1,97 @@
+"""Multi-entity writes: one commit per repository call versus one unit of work.
+
+    python -m benchmarks.bench_unit_of_work --requests 200
+    python -m benchmarks.bench_unit_of_work --database-url postgresql://user:pw@localhost/hbnb
+
+Each simulated request creates `--amenities` amenities, a place using
+them and `--reviews` reviews on it, through the facade. It reports the
+median and p95 latency of a request and the number of COMMITs it issues,
+first with every repository call committing on its own, then with the
+whole request inside facade.transaction().
+"""
+import argparse
+import os
+import statistics
+import time
+import uuid
+
+from benchmarks.common import make_app, print_table, seed_owner
+
+
+def seed_guests(count):
+    from app import db
+    from app.models.user import User
+
+    rows = [{'id': str(uuid.uuid4()), 'first_name': 'Bench', 'last_name': 'Guest',
+             'email': 'guest.{}@example.com'.format(uuid.uuid4().hex[:12]), 'password': 'x', 'is_admin': False}
+            for _ in range(count)]
+    db.session.execute(User.__table__.insert(), rows)
+    db.session.commit()
+    return [row['id'] for row in rows]
+
+
+def one_request(owner_id, guest_ids, amenities):
+    from app.models.amenity import Amenity
+    from app.services import facade
+
+    amenity_ids = []
+    for _ in range(amenities):
+        amenity = Amenity(name='Bench {}'.format(uuid.uuid4().hex[:8]))
+        facade.amenity_repo.add(amenity)
+        amenity_ids.append(amenity.id)
+    place = facade.create_place({'title': 'Bench place', 'description': '', 'price': 80.0,
+                                 'latitude': 48.85, 'longitude': 2.35, 'owner_id': owner_id,
+                                 'amenities': amenity_ids})
+    for i, guest_id in enumerate(guest_ids):
+        facade.create_review({'text': 'Review', 'rating': i % 5 + 1, 'user_id': guest_id, 'place_id': place.id})
+
+
+def run(label, requests, owner_id, guest_ids, amenities, batched):
+    from sqlalchemy import event
+
+    from app import db
+    from app.services import facade
+
+    commits = []
+    listener = lambda conn: commits.append(1)
+    event.listen(db.engine, 'commit', listener)
+    samples = []
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            if batched:
+                with facade.transaction():
+                    one_request(owner_id, guest_ids, amenities)
+            else:
+                one_request(owner_id, guest_ids, amenities)
+            samples.append((time.perf_counter() - start) * 1000)
+            db.session.expunge_all()
+    finally:
+        event.remove(db.engine, 'commit', listener)
+    samples.sort()
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return [label, '%.2f' % statistics.median(samples), '%.2f' % p95, len(commits) // requests]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--amenities', type=int, default=3)
+    parser.add_argument('--reviews', type=int, default=5)
+    parser.add_argument('--database-url', default=os.environ.get('DATABASE_URL'),
+                        help='defaults to a throwaway SQLite file')
+    args = parser.parse_args()
+
+    app = make_app(args.database_url)
+    with app.app_context():
+        owner_id = seed_owner()
+        guest_ids = seed_guests(args.reviews)
+        rows = [
+            run('commit per call', args.requests, owner_id, guest_ids, args.amenities, batched=False),
+            run('unit of work', args.requests, owner_id, guest_ids, args.amenities, batched=True),
+        ]
+    print_table(['mode', 'median ms', 'p95 ms', 'commits/request'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Shared helpers for the HBnB benchmarks.
+
+Run the scripts from part3/ as modules, e.g.
+    python -m benchmarks.bench_place_pagination
+"""
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from config import TestingConfig
+
+
+def make_app(database_uri=None, **overrides):
+    """Build the Flask app on a throwaway SQLite file (or the given URI); overrides are config keys."""
+    from app import create_app
+
+    if database_uri is None:
+        fd, path = tempfile.mkstemp(prefix='hbnb-bench-', suffix='.db')
+        os.close(fd)
+        database_uri = 'sqlite:///' + path
+    config = type('BenchmarkConfig', (TestingConfig,), dict(overrides, SQLALCHEMY_DATABASE_URI=database_uri))
+    return create_app(config)
+
+
+def timed(fn, repeat=5):
+    """Run fn `repeat` times and return the median wall time in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def seed_owner():
+    """Insert a single owner for the generated places and return its id."""
+    from app import db
+    from app.models.user import User
+
+    owner_id = str(uuid.uuid4())
+    db.session.execute(User.__table__.insert(), [{
+        'id': owner_id, 'first_name': 'Bench', 'last_name': 'Owner',
+        'email': 'bench.{}@example.com'.format(owner_id[:8]), 'password': 'x', 'is_admin': False,
+    }])
+    db.session.commit()
+    return owner_id
+
+
+def seed_places(count, owner_id, batch=10000, coordinates=None):
+    """
+    Insert `count` places with Core executemany batches.
+
+    coordinates(i) returns the (latitude, longitude) of the i-th place.
+    """
+    from app import db
+    from app.models.place import Place
+    from app.persistence.geo import grid_cell
+
+    if coordinates is None:
+        coordinates = lambda i: ((i % 180) - 90.0, (i % 360) - 180.0)
+
+    start = datetime(2024, 1, 1)
+    for offset in range(0, count, batch):
+        rows = []
+        for i in range(offset, min(offset + batch, count)):
+            latitude, longitude = coordinates(i)
+            rows.append({
+                'id': str(uuid.uuid4()),
+                'title': 'Place {}'.format(i),
+                'description': 'Generated place',
+                'price': float(i % 500),
+                'latitude': latitude,
+                'longitude': longitude,
+                'grid_cell': grid_cell(latitude, longitude),
+                'owner_id': owner_id,
+                'created_at': start + timedelta(seconds=i),
+                'updated_at': start + timedelta(seconds=i),
+            })
+        db.session.execute(Place.__table__.insert(), rows)
+        db.session.commit()
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print('  '.join(str(h).rjust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print('  '.join(str(c).rjust(w) for c, w in zip(row, widths)))
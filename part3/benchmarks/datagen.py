@@ -0,0 +1,150 @@
+"""Synthetic HBnB dataset: users, amenities, places and reviews at a given scale.
+
+    python -m benchmarks.datagen --database-url sqlite:///bench.db --users 1000 --places 10000
+
+Rows are drawn from random.Random(seed), so the same arguments always
+produce the same data (ids included). Every user has the same password
+(--password), hashed once with the configured bcrypt cost. Places get
+their grid cell and amenity links; reviews respect one review per user
+and place, never by the owner, and the place_rating_stats rows match
+them. Inserts go through Core executemany batches.
+"""
+import argparse
+import random
+import uuid
+from datetime import datetime, timedelta
+
+PASSWORD = 'bench-password'
+CITIES = ((48.8566, 2.3522), (45.7640, 4.8357), (43.2965, 5.3698), (51.5074, -0.1278),
+          (40.4168, -3.7038), (41.9028, 12.4964), (52.5200, 13.4050), (35.6762, 139.6503))
+
+
+class Dataset:
+    """What the workloads need to know about the generated rows."""
+
+    def __init__(self, users, place_ids, amenity_ids, owners, reviewed, password):
+        self.users = users              # [(id, email)], index 0 first
+        self.place_ids = place_ids
+        self.amenity_ids = amenity_ids
+        self.owners = owners            # {place_id: owner_id}
+        self.reviewed = reviewed        # {(user_id, place_id)}
+        self.password = password
+
+    def summary(self):
+        return {'users': len(self.users), 'places': len(self.place_ids),
+                'amenities': len(self.amenity_ids), 'reviews': len(self.reviewed)}
+
+
+def _uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def generate(users=100, places=1000, amenities=30, reviews_per_place=3, amenities_per_place=4,
+             seed=0, password=PASSWORD, batch=5000):
+    """Insert the dataset in the database of the current app context and return its Dataset."""
+    from app import db
+    from app.models.amenity import Amenity
+    from app.models.place import Place, place_amenity
+    from app.models.place_rating_stats import PlaceRatingStats
+    from app.models.review import Review
+    from app.models.user import User
+    from app.persistence.geo import grid_cell
+    from app.services.password_pool import password_pool
+
+    if users < 2:
+        raise ValueError("At least 2 users are needed (owners cannot review their places)")
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    hashed = password_pool.hash(password)
+
+    def insert(table, rows):
+        for offset in range(0, len(rows), batch):
+            db.session.execute(table.insert(), rows[offset:offset + batch])
+
+    user_rows = [{
+        'id': _uuid(rng), 'first_name': 'User', 'last_name': str(i), 'email': f'user{i}@bench.example.com',
+        'password': hashed, 'is_admin': i == 0, 'created_at': start, 'updated_at': start,
+    } for i in range(users)]
+    insert(User.__table__, user_rows)
+
+    amenity_rows = [{'id': _uuid(rng), 'name': f'Amenity {i}', 'created_at': start, 'updated_at': start}
+                    for i in range(amenities)]
+    insert(Amenity.__table__, amenity_rows)
+    amenity_ids = [row['id'] for row in amenity_rows]
+
+    place_rows, links, owners = [], [], {}
+    for i in range(places):
+        city_lat, city_lng = rng.choice(CITIES)
+        latitude, longitude = city_lat + rng.uniform(-0.3, 0.3), city_lng + rng.uniform(-0.3, 0.3)
+        owner_id = rng.choice(user_rows)['id']
+        created = start + timedelta(seconds=i * 60)
+        place_rows.append({
+            'id': _uuid(rng), 'title': f'Place {i}', 'description': 'Generated place',
+            'price': float(rng.randrange(20, 800)), 'latitude': latitude, 'longitude': longitude,
+            'grid_cell': grid_cell(latitude, longitude), 'owner_id': owner_id,
+            'created_at': created, 'updated_at': created,
+        })
+        owners[place_rows[-1]['id']] = owner_id
+        for amenity_id in rng.sample(amenity_ids, min(amenities_per_place, len(amenity_ids))):
+            links.append({'place_id': place_rows[-1]['id'], 'amenity_id': amenity_id})
+    insert(Place.__table__, place_rows)
+    insert(place_amenity, links)
+
+    review_rows, stats_rows, reviewed = [], [], set()
+    user_ids = [row['id'] for row in user_rows]
+    for place in place_rows:
+        authors = [user_id for user_id in rng.sample(user_ids, min(reviews_per_place + 1, len(user_ids)))
+                   if user_id != place['owner_id']][:reviews_per_place]
+        stats = {'place_id': place['id'], 'review_count': 0, 'rating_sum': 0,
+                 **{f'rating_{rating}': 0 for rating in range(1, 6)}}
+        for user_id in authors:
+            rating = rng.randint(1, 5)
+            review_rows.append({'id': _uuid(rng), 'text': 'Generated review', 'rating': rating,
+                                'user_id': user_id, 'place_id': place['id'],
+                                'created_at': place['created_at'], 'updated_at': place['created_at']})
+            reviewed.add((user_id, place['id']))
+            stats['review_count'] += 1
+            stats['rating_sum'] += rating
+            stats[f'rating_{rating}'] += 1
+        if authors:
+            stats_rows.append(stats)
+    insert(Review.__table__, review_rows)
+    insert(PlaceRatingStats.__table__, stats_rows)
+    db.session.commit()
+    return Dataset([(row['id'], row['email']) for row in user_rows], [row['id'] for row in place_rows],
+                   amenity_ids, owners, reviewed, password)
+
+
+def add_arguments(parser):
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--places', type=int, default=1000)
+    parser.add_argument('--amenities', type=int, default=30)
+    parser.add_argument('--reviews-per-place', type=int, default=3)
+    parser.add_argument('--amenities-per-place', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def scale(args):
+    """generate() keyword arguments from the parsed add_arguments() options."""
+    return {'users': args.users, 'places': args.places, 'amenities': args.amenities,
+            'reviews_per_place': args.reviews_per_place, 'amenities_per_place': args.amenities_per_place,
+            'seed': args.seed}
+
+
+def main():
+    from benchmarks.common import make_app
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', default=None, help='Target database (a temporary SQLite file by default)')
+    add_arguments(parser)
+    args = parser.parse_args()
+    app = make_app(args.database_url, PASSWORD_POOL_SIZE=0)
+    with app.app_context():
+        from app import db
+
+        dataset = generate(**scale(args))
+        print(db.engine.url.render_as_string(hide_password=True), dataset.summary())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,270 @@
+"""HBnB load-test suite: scripted workloads in-process and over a local WSGI server.
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --modes wsgi --workloads browse detail --threads 8 --duration 20 --places 20000
+
+For each mode, a fresh database is filled by benchmarks.datagen with the
+same seed, so both modes see identical data. Each workload of
+benchmarks.workloads then runs for --duration seconds (or --operations
+requests per thread) on --threads threads:
+- inprocess: one Flask test client per thread, no sockets.
+- wsgi: a threaded werkzeug server on 127.0.0.1, one keep-alive
+  http.client connection per thread.
+Per mode and workload the report gives throughput, p50/p95/p99/max
+latency and the status codes. --output writes it as JSON with the git
+commit, Python version and the whole configuration, so runs can be
+compared; --compare prints the difference with an earlier JSON report.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from benchmarks import datagen
+from benchmarks.common import make_app, print_table
+from benchmarks.workloads import WORKLOADS, Exhausted
+
+
+class InProcessClient:
+    """Flask test client: the full app stack without the network."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None, headers=None):
+        response = self.client.open(path, method=method, json=body, headers=headers)
+        return response.status_code, response.get_data()
+
+
+class HttpClient:
+    """One keep-alive HTTP/1.1 connection (reopened by http.client when the server closes it)."""
+
+    def __init__(self, host, port):
+        self.connection = http.client.HTTPConnection(host, port, timeout=60)
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        if body is not None:
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        self.connection.request(method, path, body, headers)
+        response = self.connection.getresponse()
+        return response.status, response.read()
+
+    def close(self):
+        self.connection.close()
+
+
+class LocalServer:
+    """
+    werkzeug WSGI server on 127.0.0.1 (a free port by default), in a background thread.
+
+    threaded=False serves one request at a time and closes every
+    connection (HTTP/1.0), as a gunicorn sync worker does.
+    """
+
+    def __init__(self, app, port=0, threaded=True):
+        from werkzeug.serving import WSGIRequestHandler, make_server
+
+        # HTTP/1.1 : connexions persistantes, un client garde la sienne pendant tout le run
+        handler = type('QuietHandler', (WSGIRequestHandler,), {
+            'protocol_version': 'HTTP/1.1' if threaded else 'HTTP/1.0', 'log_request': lambda *args: None})
+        self.server = make_server('127.0.0.1', port, app, threaded=threaded, request_handler=handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.thread.join()
+
+    @property
+    def port(self):
+        return self.server.server_port
+
+
+def percentile(sorted_samples, q):
+    if not sorted_samples:
+        return None
+    index = min(len(sorted_samples) - 1, max(0, round(q / 100 * len(sorted_samples) + 0.5) - 1))
+    return sorted_samples[index]
+
+
+def run_workload(name, make_client, dataset, threads, duration, operations, seed):
+    """Run one workload on `threads` workers; returns its result dict."""
+    latencies = [[] for _ in range(threads)]
+    statuses = [Counter() for _ in range(threads)]
+    errors = Counter()
+    lock = threading.Lock()
+    ready = threading.Barrier(threads + 1)
+    window = {}
+
+    def worker(index):
+        client = make_client()
+        try:
+            # Préparation (connexion, login du ReviewStorm) hors mesure
+            workload = WORKLOADS[name](dataset, client, random.Random(f'{seed}:{name}:{index}'))
+        except Exception as e:
+            with lock:
+                errors[f'setup: {type(e).__name__}: {e}'] += 1
+            workload = None
+        ready.wait()
+        sent = 0
+        while workload is not None and time.perf_counter() < window['deadline'] and (
+                operations is None or sent < operations):
+            start = time.perf_counter()
+            try:
+                status = workload.step()
+            except Exhausted:
+                break
+            except Exception as e:
+                with lock:
+                    errors[f'{type(e).__name__}: {e}'] += 1
+                continue
+            finally:
+                sent += 1
+            latencies[index].append(time.perf_counter() - start)
+            statuses[index][status] += 1
+        if hasattr(client, 'close'):
+            client.close()
+
+    pool = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in pool:
+        thread.start()
+    window['deadline'] = time.perf_counter() + (duration if duration is not None else float('inf'))
+    started = time.perf_counter()
+    ready.wait()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    samples = sorted(sample * 1000 for per_thread in latencies for sample in per_thread)
+    status_counts = sum(statuses, Counter())
+    return {
+        'workload': name,
+        'requests': len(samples),
+        'duration_s': round(elapsed, 3),
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else None,
+        'latency_ms': {
+            'p50': percentile(samples, 50), 'p95': percentile(samples, 95), 'p99': percentile(samples, 99),
+            'mean': statistics.fmean(samples) if samples else None, 'max': samples[-1] if samples else None,
+        },
+        'statuses': {str(status): count for status, count in sorted(status_counts.items())},
+        'errors': dict(errors),
+    }
+
+
+def run_mode(mode, args):
+    """Fresh database and dataset, then every workload in `mode`; returns (dataset summary, results)."""
+    app = make_app(args.database_url, TESTING=False, PASSWORD_POOL_SIZE=args.password_pool,
+                   BCRYPT_LOG_ROUNDS=args.bcrypt_rounds)
+    # Les 500 sont comptées dans le rapport : pas une trace par requête sur stderr
+    app.logger.disabled = True
+    with app.app_context():
+        dataset = datagen.generate(**datagen.scale(args))
+    results = []
+    if mode == 'inprocess':
+        for name in args.workloads:
+            results.append(run_workload(name, lambda: InProcessClient(app), dataset,
+                                        args.threads, args.duration, args.operations, args.seed))
+    else:
+        with LocalServer(app) as server:
+            for name in args.workloads:
+                results.append(run_workload(name, lambda: HttpClient('127.0.0.1', server.port), dataset,
+                                            args.threads, args.duration, args.operations, args.seed))
+    for result in results:
+        result['mode'] = mode
+    return dataset.summary(), results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def fmt(value):
+    return '-' if value is None else '%.2f' % value
+
+
+def print_report(results):
+    print_table(['mode', 'workload', 'requests', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms', 'statuses'], [[
+        r['mode'], r['workload'], r['requests'], fmt(r['throughput_rps']), fmt(r['latency_ms']['p50']),
+        fmt(r['latency_ms']['p95']), fmt(r['latency_ms']['p99']),
+        ' '.join(f'{status}:{count}' for status, count in r['statuses'].items()),
+    ] for r in results])
+    for r in results:
+        for error, count in r['errors'].items():
+            print(f"  {r['mode']}/{r['workload']}: {count} x {error}")
+
+
+def print_comparison(results, baseline):
+    before = {(r['mode'], r['workload']): r for r in baseline['results']}
+    rows = []
+    for r in results:
+        old = before.get((r['mode'], r['workload']))
+        if old is None:
+            continue
+        row = [r['mode'], r['workload']]
+        for new_value, old_value in ((r['throughput_rps'], old['throughput_rps']),
+                                     (r['latency_ms']['p95'], old['latency_ms']['p95']),
+                                     (r['latency_ms']['p99'], old['latency_ms']['p99'])):
+            row.append('%+.1f%%' % ((new_value - old_value) / old_value * 100) if new_value and old_value else '-')
+        rows.append(row)
+    if rows:
+        print_table(['mode', 'workload', 'req/s', 'p95', 'p99'], rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modes', nargs='+', choices=('inprocess', 'wsgi'), default=['inprocess', 'wsgi'])
+    parser.add_argument('--workloads', nargs='+', choices=list(WORKLOADS), default=list(WORKLOADS))
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds per workload')
+    parser.add_argument('--operations', type=int, default=None, help='Requests per thread (stops earlier than --duration)')
+    parser.add_argument('--bcrypt-rounds', type=int, default=10)
+    parser.add_argument('--password-pool', type=int, default=0, help='PASSWORD_POOL_SIZE of the app')
+    parser.add_argument('--database-url', default=None,
+                        help='Empty database to fill (one mode only); a temporary SQLite file per mode by default')
+    parser.add_argument('--output', help='Write the report as JSON to this file')
+    parser.add_argument('--compare', help='Earlier JSON report to compare with')
+    datagen.add_arguments(parser)
+    args = parser.parse_args()
+    if args.database_url and len(args.modes) > 1:
+        parser.error('--database-url needs a single --modes value (each mode generates its own data)')
+
+    report = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'git_commit': git_commit(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'results': [],
+    }
+    for mode in args.modes:
+        report['dataset'], results = run_mode(mode, args)
+        report['results'].extend(results)
+    print_report(report['results'])
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(report['results'], json.load(f))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Scripted HBnB workloads for benchmarks.suite.
+
+A workload is built once per worker thread with the dataset, an HTTP
+client and the worker's own random.Random; step() sends one request and
+returns its status. Clients only need request(method, path, body=None,
+headers=None) -> (status, body bytes).
+"""
+import json
+
+SORTS = ('created', 'price_asc', 'price_desc', 'rating_desc')
+
+
+class Exhausted(Exception):
+    """The worker has nothing left to send (e.g. every place already reviewed)."""
+
+
+class Workload:
+    name = None
+
+    def __init__(self, dataset, client, rng):
+        self.dataset = dataset
+        self.client = client
+        self.rng = rng
+
+    def step(self):
+        raise NotImplementedError
+
+
+class Browse(Workload):
+    """Listing pages: a new filtered search, or the next page of the current one (2 times in 3)."""
+    name = 'browse'
+
+    def __init__(self, dataset, client, rng):
+        super().__init__(dataset, client, rng)
+        self.cursor = None
+        self.query = None
+
+    def step(self):
+        if self.cursor is None or self.rng.random() < 1 / 3:
+            query = f'limit=20&sort={self.rng.choice(SORTS)}'
+            if self.rng.random() < 0.5:
+                low = self.rng.randrange(20, 400)
+                query += f'&min_price={low}&max_price={low + self.rng.randrange(50, 400)}'
+            if self.dataset.amenity_ids and self.rng.random() < 0.3:
+                query += f'&amenity_ids={self.rng.choice(self.dataset.amenity_ids)}'
+            self.query, self.cursor = query, None
+        path = '/api/v1/places/?' + self.query + (f'&cursor={self.cursor}' if self.cursor else '')
+        status, body = self.client.request('GET', path)
+        self.cursor = json.loads(body).get('next_cursor') if status == 200 else None
+        return status
+
+
+class PlaceDetail(Workload):
+    """GET /api/v1/places/<id> on random places, a third of them with a stale If-None-Match."""
+    name = 'detail'
+
+    def step(self):
+        headers = {'If-None-Match': 'W/"stale"'} if self.rng.random() < 1 / 3 else None
+        status, _ = self.client.request('GET', '/api/v1/places/' + self.rng.choice(self.dataset.place_ids),
+                                        headers=headers)
+        return status
+
+
+class LoginBurst(Workload):
+    """POST /api/v1/auth/login with random users, one in ten with a wrong password."""
+    name = 'login'
+
+    def step(self):
+        _, email = self.rng.choice(self.dataset.users)
+        password = self.dataset.password if self.rng.random() < 0.9 else 'wrong-password'
+        status, _ = self.client.request('POST', '/api/v1/auth/login', {'email': email, 'password': password})
+        return status
+
+
+class ReviewStorm(Workload):
+    """POST /api/v1/reviews/ as one logged-in user, on places it neither owns nor reviewed yet."""
+    name = 'reviews'
+
+    def __init__(self, dataset, client, rng):
+        super().__init__(dataset, client, rng)
+        self.user_id, email = rng.choice(dataset.users)
+        status, body = client.request('POST', '/api/v1/auth/login', {'email': email, 'password': dataset.password})
+        self.headers = {'Authorization': 'Bearer ' + json.loads(body)['access_token']} if status == 200 else {}
+        self.places = [place_id for place_id in dataset.place_ids
+                       if dataset.owners[place_id] != self.user_id and (self.user_id, place_id) not in dataset.reviewed]
+        rng.shuffle(self.places)
+
+    def step(self):
+        if not self.places:
+            raise Exhausted()
+        place_id = self.places.pop()
+        status, _ = self.client.request('POST', '/api/v1/reviews/', {
+            'place_id': place_id, 'rating': self.rng.randint(1, 5), 'text': 'Benchmark review'}, self.headers)
+        return status
+
+
+WORKLOADS = {workload.name: workload for workload in (Browse, PlaceDetail, LoginBurst, ReviewStorm)}
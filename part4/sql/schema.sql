@@ -23,9 +23,14 @@ CREATE TABLE IF NOT EXISTS places (
     latitude FLOAT NOT NULL,
     longitude FLOAT NOT NULL,
     owner_id VARCHAR(36) NOT NULL,
+    grid_cell INTEGER,
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-    FOREIGN KEY (owner_id) REFERENCES users(id) ON DELETE CASCADE
+    FOREIGN KEY (owner_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX ix_place_owner_id (owner_id),
+    INDEX ix_place_created_at_id (created_at, id),
+    INDEX ix_place_price_created_at_id (price, created_at, id),
+    INDEX ix_place_grid_cell (grid_cell)
 );
 
 -- Table amenities
@@ -36,6 +41,14 @@ CREATE TABLE IF NOT EXISTS amenities (
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
 );
 
+-- Table cities
+CREATE TABLE IF NOT EXISTS cities (
+    id VARCHAR(36) PRIMARY KEY,
+    name VARCHAR(128) NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
 -- Table reviews
 CREATE TABLE IF NOT EXISTS reviews (
     id VARCHAR(36) PRIMARY KEY,
@@ -46,7 +59,10 @@ CREATE TABLE IF NOT EXISTS reviews (
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (place_id) REFERENCES places(id) ON DELETE CASCADE,
-    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    UNIQUE KEY uq_user_place_review (user_id, place_id),
+    INDEX ix_review_place_id_rating (place_id, rating),
+    INDEX ix_review_place_id_created_at_id (place_id, created_at, id)
 );
 
 -- Table de relation place_amenity (Many-to-Many)
@@ -55,5 +71,19 @@ CREATE TABLE IF NOT EXISTS place_amenity (
     amenity_id VARCHAR(36) NOT NULL,
     PRIMARY KEY (place_id, amenity_id),
     FOREIGN KEY (place_id) REFERENCES places(id) ON DELETE CASCADE,
-    FOREIGN KEY (amenity_id) REFERENCES amenities(id) ON DELETE CASCADE
+    FOREIGN KEY (amenity_id) REFERENCES amenities(id) ON DELETE CASCADE,
+    INDEX ix_place_amenity_amenity_id (amenity_id, place_id)
+);
+
+-- Agrégats des notes par lieu (tenus à jour par l'application)
+CREATE TABLE IF NOT EXISTS place_rating_stats (
+    place_id VARCHAR(36) PRIMARY KEY,
+    review_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum INTEGER NOT NULL DEFAULT 0,
+    rating_1 INTEGER NOT NULL DEFAULT 0,
+    rating_2 INTEGER NOT NULL DEFAULT 0,
+    rating_3 INTEGER NOT NULL DEFAULT 0,
+    rating_4 INTEGER NOT NULL DEFAULT 0,
+    rating_5 INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (place_id) REFERENCES places(id) ON DELETE CASCADE
 ); 